@@ -1,3 +1,5 @@
+import argparse
+import os
 import wx
 from gui.SetupTap import SetupTap
 from gui.CalibrationTab import CalibrationTab
@@ -5,18 +7,22 @@ from gui.LiveViewTab import LiveViewTab
 from gui.AboutTab import AboutTab
 from logic.StreamHandler import StreamHandler
 from logic.ClassificationManager import ClassificationManager
+from logic.FeatureStore import FeatureStore, DEFAULT_DIRECTORY
 from logic.ConsoleStreamEventListener import ConsoleStreamEventListener
 
 
 class MainFrame(wx.Frame):
-    def __init__(self, *args, **kw):
+    def __init__(self, *args, options=None, **kw):
         super(MainFrame, self).__init__(*args, **kw)
         self.panel = wx.Panel(self)
         self.notebook = wx.Notebook(self.panel)
         self.locale = wx.Locale(wx.LANGUAGE_ENGLISH)
 
-        #initialize the streamhandler with a standard ClassificationManager
-        self.streamHandler = StreamHandler(ClassificationManager())
+        #initialize the streamhandler with a standard ClassificationManager, configured by the command line options (cf. parseOptions)
+        if options is None:
+            options = parseOptions([])
+        self.streamHandler = StreamHandler(ClassificationManager(incrementalPrediction=options.incremental_prediction, hopSize=options.hop_size, voteLength=options.vote_length, featureCacheDirectory=options.feature_cache))
+        self.streamHandler.useStreamingFilter = not options.no_streaming_filter
 
         #tabs
         self.setupTab = SetupTap(self.notebook, self.streamHandler)
@@ -47,9 +53,27 @@ class MainFrame(wx.Frame):
         self.Destroy()
 
 
+def parseOptions(arguments=None):
+    '''
+    command line options for live classification and live view (cf. ClassificationManager and StreamHandler)
+    '''
+    parser = argparse.ArgumentParser(description="EMBody Toolkit")
+    parser.add_argument('--incremental-prediction', action='store_true', help="classify only newly arrived samples during live classification instead of the whole window")
+    parser.add_argument('--hop-size', type=int, default=None, help="number of samples between two live predictions (default: window size)")
+    parser.add_argument('--vote-length', type=int, default=None, help="number of per-sample predictions a live prediction is voted from (default: 2 * window size + 1)")
+    parser.add_argument('--no-streaming-filter', action='store_true', help="re-filter the whole ringbuffer for the live view instead of using the causally filtered ringbuffer")
+    parser.add_argument('--feature-cache', nargs='?', const=DEFAULT_DIRECTORY, default=DEFAULT_DIRECTORY if os.path.isdir(DEFAULT_DIRECTORY) else None, metavar='DIRECTORY', help="cache training features on disk (default directory: " + DEFAULT_DIRECTORY + ", enabled by default if it exists)")
+    parser.add_argument('--no-feature-cache', dest='feature_cache', action='store_const', const=None, help="do not cache training features on disk")
+    parser.add_argument('--clear-feature-cache', action='store_true', help="remove all cached training features on start")
+    return parser.parse_args(arguments)
+
+
 if __name__ == '__main__':
+    options = parseOptions()
+    if options.clear_feature_cache:
+        FeatureStore(options.feature_cache or DEFAULT_DIRECTORY).clear()
     app = wx.App()
-    frame = MainFrame(None, title="EMBody Toolkit", size=(1000, 600))
+    frame = MainFrame(None, title="EMBody Toolkit", size=(1000, 600), options=options)
     frame.Show()
     frame.Centre()
     app.MainLoop()
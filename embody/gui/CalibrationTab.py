@@ -9,6 +9,7 @@ NULL_CLASS_LABEL = "NULL_CLASS"
 class CalibrationTab(StreamEventListener):
     def __init__(self, parent, streamHandler):
         StreamEventListener.__init__(self, parent, streamHandler)
+        self.calibrationDialog = None
         self.initUI()
 
     def initUI(self):
@@ -83,14 +84,34 @@ class CalibrationTab(StreamEventListener):
         btn_exportCalibration = wx.BitmapButton(self, bitmap=wx.ArtProvider.GetBitmap(wx.ART_FILE_SAVE, client=wx.ART_BUTTON))
         btn_exportCalibration.SetToolTip(wx.ToolTip("Export calibration data as csv"))
         btn_exportCalibration.Bind(wx.EVT_BUTTON, self.onExportCalibrationData)
+        btn_appendCalibrationSession = wx.BitmapButton(self, bitmap=wx.ArtProvider.GetBitmap(wx.ART_ADD_BOOKMARK, client=wx.ART_BUTTON))
+        btn_appendCalibrationSession.SetToolTip(wx.ToolTip("Add calibration data as a session to a dataset"))
+        btn_appendCalibrationSession.Bind(wx.EVT_BUTTON, self.onAppendCalibrationSession)
+        btn_loadCalibrationDataset = wx.BitmapButton(self, bitmap=wx.ArtProvider.GetBitmap(wx.ART_FOLDER_OPEN, client=wx.ART_BUTTON))
+        btn_loadCalibrationDataset.SetToolTip(wx.ToolTip("Load all sessions of a dataset as calibration data"))
+        btn_loadCalibrationDataset.Bind(wx.EVT_BUTTON, self.onLoadCalibrationDataset)
+        vbox3 = wx.BoxSizer(wx.VERTICAL)
+        vbox3.Add(btn_exportCalibration, flag=wx.BOTTOM, border=5)
+        vbox3.Add(btn_appendCalibrationSession, flag=wx.BOTTOM, border=5)
+        vbox3.Add(btn_loadCalibrationDataset, flag=wx.BOTTOM, border=5)
         hbox1 = wx.BoxSizer(wx.HORIZONTAL)
         hbox1.Add(self.grid, flag=wx.EXPAND|wx.ALL, border=5, proportion=1)
-        hbox1.Add(btn_exportCalibration, flag=wx.LEFT, border=5)
+        hbox1.Add(vbox3, flag=wx.LEFT, border=5)
         self.vbox2.Add(hbox1, flag=wx.EXPAND|wx.ALL, border=5, proportion=1)
         sb_conn = wx.StaticBox(self, label="Current Prediction Model")
         boxsizer = wx.StaticBoxSizer(sb_conn, wx.VERTICAL)
         self.st_classifierInfo = wx.StaticText(self, label="No Model trained.")
         boxsizer.Add(self.st_classifierInfo, flag=wx.ALL|wx.EXPAND, border=10)
+        btn_loadClassifierModel = wx.BitmapButton(self, bitmap=wx.ArtProvider.GetBitmap(wx.ART_FILE_OPEN, client=wx.ART_BUTTON))
+        btn_loadClassifierModel.SetToolTip(wx.ToolTip("Load trained model from file"))
+        btn_loadClassifierModel.Bind(wx.EVT_BUTTON, self.onLoadClassifierModel)
+        self.btn_saveClassifierModel = wx.BitmapButton(self, bitmap=wx.ArtProvider.GetBitmap(wx.ART_FILE_SAVE, client=wx.ART_BUTTON))
+        self.btn_saveClassifierModel.SetToolTip(wx.ToolTip("Save trained model to file"))
+        self.btn_saveClassifierModel.Bind(wx.EVT_BUTTON, self.onSaveClassifierModel)
+        hbox2 = wx.BoxSizer(wx.HORIZONTAL)
+        hbox2.Add(btn_loadClassifierModel, flag=wx.LEFT, border=5)
+        hbox2.Add(self.btn_saveClassifierModel, flag=wx.LEFT, border=5)
+        boxsizer.Add(hbox2, flag=wx.LEFT | wx.BOTTOM, border=5)
         self.vbox2.Add(boxsizer, flag= wx.LEFT | wx.BOTTOM, border=5)
 
         #live classification
@@ -104,6 +125,11 @@ class CalibrationTab(StreamEventListener):
         hbox1.Add(self.tc_port, proportion=.2)
         self.lsl_checkmark = wx.CheckBox(self, label="Use PyLSL")
         hbox1.Add(self.lsl_checkmark, flag=wx.ALL | wx.ALIGN_CENTER_VERTICAL, border=5)
+        self.btn_adaptClassifier = wx.Button(self, label="Adapt Model")
+        self.btn_adaptClassifier.SetToolTip("Record a short calibration and update the running model with it (Online Linear SVM only)")
+        self.btn_adaptClassifier.Bind(wx.EVT_BUTTON, self.onAdaptClassifier)
+        self.btn_adaptClassifier.Disable()
+        hbox1.Add(self.btn_adaptClassifier, flag=wx.LEFT | wx.BOTTOM, border=5)
         self.vbox2.Add(hbox1, flag= wx.LEFT | wx.BOTTOM, border=5)
         self.vbox2.Add(wx.StaticLine(self, -1), 0, wx.EXPAND | wx.TOP | wx.BOTTOM, 5)
         self.vbox2.Add((-1, 10))
@@ -117,6 +143,19 @@ class CalibrationTab(StreamEventListener):
         hbox1 = wx.BoxSizer(wx.HORIZONTAL)
         hbox1.Add(btn_startCalibration, border= 5)
         hbox1.Add(self.btn_trainClassifier, border= 5)
+        self.backends = list(self.streamHandler.getClassifierBackends().keys())
+        self.backendChoice = wx.Choice(self, choices=list(self.streamHandler.getClassifierBackends().values()))
+        self.backendChoice.SetSelection(0)
+        self.backendChoice.SetToolTip("Classifier to train; linear models and the kernel approximation predict faster on long calibrations")
+        hbox1.Add(self.backendChoice, flag=wx.LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
+        self.selectedFeatures = list(self.streamHandler.getTrainingFeatures())
+        btn_selectFeatures = wx.Button(self, label="Features...")
+        btn_selectFeatures.SetToolTip("Select the features calculated per window")
+        btn_selectFeatures.Bind(wx.EVT_BUTTON, self.onSelectFeatures)
+        hbox1.Add(btn_selectFeatures, flag=wx.LEFT | wx.ALIGN_CENTER_VERTICAL, border=5)
+        self.searchParameters_checkmark = wx.CheckBox(self, label="Search Parameters")
+        self.searchParameters_checkmark.SetToolTip("Search for the best window size and SVM parameters (C, gamma); uses all CPU cores and takes considerably longer")
+        hbox1.Add(self.searchParameters_checkmark, flag=wx.ALL | wx.ALIGN_CENTER_VERTICAL, border=5)
         self.vbox2.Add(hbox1, flag= wx.LEFT | wx.BOTTOM, border=5)
 
         #update the grid with actual calibration data values; also updates button states
@@ -157,22 +196,51 @@ class CalibrationTab(StreamEventListener):
     def updateClassifierInfo(self):
         if self.streamHandler.getClassifierInfo() is not None:
             self.st_classifierInfo.SetLabel("Classes: " + ", ".join(self.streamHandler.getClassifierInfo()['classes']) + "\n"
-                                            + "Accuracy (10-fold CV): " + "{:.1f}".format(self.streamHandler.getClassifierInfo()['accuracy']) + " %" + "\n"
-                                            + "# of Channels: " + str(self.streamHandler.getClassifierInfo()['num_channels']))
+                                            + self.getAccuracyLabel() + ": " + "{:.1f}".format(self.streamHandler.getClassifierInfo()['accuracy']) + " %" + "\n"
+                                            + "# of Channels: " + str(self.streamHandler.getClassifierInfo()['num_channels']) + "\n"
+                                            + "Model: " + self.streamHandler.getClassifierBackends()[self.streamHandler.getClassifierInfo()['backend']] + " " + str(self.streamHandler.getClassifierInfo()['parameters']) + ", Window Size: " + str(self.streamHandler.getClassifierInfo()['window_size']) + "\n"
+                                            + "Features: " + ", ".join(self.streamHandler.getFeatureNames()[feature] for feature in self.streamHandler.getClassifierInfo()['features']) + "\n"
+                                            + "Latency per window: " + "{:.2f}".format(self.streamHandler.getClassifierInfo()['latency_p50_ms']) + " ms (95th percentile: " + "{:.2f}".format(self.streamHandler.getClassifierInfo()['latency_p95_ms']) + " ms)"
+                                            + self.getExactSvmComparison())
             self.toggleLiveClassificationState(True)
+            self.btn_saveClassifierModel.Enable(True)
         else:
             self.st_classifierInfo.SetLabel("No Model trained.")
             self.toggleLiveClassificationState(False)
+            self.btn_saveClassifierModel.Enable(False)
         self.Layout()
 
+    def getAccuracyLabel(self):
+        '''
+        returns the label of the cross-validated accuracy; the accuracy of a model selected by a hyperparameter search is biased upwards by the selection
+        '''
+        if 'search_results' not in self.streamHandler.getClassifierInfo():
+            return "Accuracy (10-fold CV)"
+        return "Accuracy (10-fold CV, best of " + str(len(self.streamHandler.getClassifierInfo()['search_results'])) + " search candidates, optimistic)"
+
+    def getExactSvmComparison(self):
+        '''
+        returns a line comparing a kernel approximation to the exact SVM, or an empty string for other models
+        '''
+        if 'accuracy_delta' not in self.streamHandler.getClassifierInfo():
+            return ""
+        return ("\n" + "Compared to exact SVM: " + "{:+.1f}".format(self.streamHandler.getClassifierInfo()['accuracy_delta']) + " % accuracy, "
+                + "{:.2f}".format(self.streamHandler.getClassifierInfo()['exact_svm_latency_p95_ms']) + " ms latency (95th percentile)")
+
     def toggleLiveClassificationState(self, state):
         self.btn_toggleLiveClassification.Enable(state)
-        self.st_port.Enable(state)
-        self.tc_port.Enable(state)
-        self.lsl_checkmark.Enable(state)
+        #a new model may be swapped into a running live classification, whose output settings stay fixed
+        streaming = self.streamHandler.isStreamingClassification
+        self.st_port.Enable(state and not streaming)
+        self.tc_port.Enable(state and not streaming)
+        self.lsl_checkmark.Enable(state and not streaming)
+        self.btn_adaptClassifier.Enable(state and streaming and self.streamHandler.isClassifierAdaptable())
 
 
     def onExportCalibrationData(self, e):
+        if not self.streamHandler.hasCalibrationData():
+            self.showNoCalibrationDataDialog()
+            return
         with wx.FileDialog(self, "Export calibration data",
                            style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as fileDialog:
 
@@ -185,9 +253,71 @@ class CalibrationTab(StreamEventListener):
             except IOError:
                 wx.MessageDialog(None, "Cannot save file '%s'." % pathname,
                                  'Cannot save file', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+                return
         wx.MessageDialog(None, 'Calibration data successfully exported.', 'Export complete',
                          wx.ICON_INFORMATION | wx.OK | wx.CENTRE).ShowModal()
 
+    def onAppendCalibrationSession(self, e):
+        if not self.streamHandler.hasCalibrationData():
+            self.showNoCalibrationDataDialog()
+            return
+        with wx.DirDialog(self, "Add calibration data to dataset") as dirDialog:
+
+            if dirDialog.ShowModal() == wx.ID_CANCEL:
+                return
+
+            pathname = dirDialog.GetPath()
+            try:
+                self.streamHandler.appendCalibrationSession(pathname)
+            except IOError:
+                wx.MessageDialog(None, "Cannot write to '%s'." % pathname,
+                                 'Cannot save session', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+                return
+        wx.MessageDialog(None, 'Calibration data successfully added to dataset.', 'Session saved',
+                         wx.ICON_INFORMATION | wx.OK | wx.CENTRE).ShowModal()
+
+    def showNoCalibrationDataDialog(self):
+        wx.MessageDialog(None, 'No calibration data available. Please calibrate or load a calibration dataset first.', 'No calibration data',
+                         wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
+    def onLoadCalibrationDataset(self, e):
+        with wx.DirDialog(self, "Load calibration dataset", style=wx.DD_DIR_MUST_EXIST) as dirDialog:
+
+            if dirDialog.ShowModal() == wx.ID_CANCEL:
+                return
+
+            labels = self.streamHandler.loadCalibrationDataset(dirDialog.GetPath())
+            if labels is not None:
+                #make sure the loaded labels are not removed as unused labels (cf. updateGridLabels)
+                self.labelsInput.SetValue("\n".join([str(label) for label in labels if label != NULL_CLASS_LABEL]))
+                self.updateGridLabels()
+
+    def onSaveClassifierModel(self, e):
+        with wx.FileDialog(self, "Save trained model", wildcard="EMBody model (*.model)|*.model",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as fileDialog:
+
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+
+            pathname = fileDialog.GetPath()
+            try:
+                self.streamHandler.saveClassifierModel(pathname)
+            except IOError:
+                wx.MessageDialog(None, "Cannot save file '%s'." % pathname,
+                                 'Cannot save file', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+                return
+        wx.MessageDialog(None, 'Trained model successfully saved.', 'Save complete',
+                         wx.ICON_INFORMATION | wx.OK | wx.CENTRE).ShowModal()
+
+    def onLoadClassifierModel(self, e):
+        with wx.FileDialog(self, "Load trained model", wildcard="EMBody model (*.model)|*.model",
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
+
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+
+            self.streamHandler.loadClassifierModel(fileDialog.GetPath())
+
     def onLoadCalibrationLabels(self, e):
         with wx.FileDialog(self, "Load calibration labels",
                            style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
@@ -248,7 +378,20 @@ class CalibrationTab(StreamEventListener):
             self.streamHandler.stopLiveClassification()
 
 
+    def onAdaptClassifier(self, e):
+        dlg = wx.MessageDialog(None, 'Each class of the model will be recorded for 3 seconds following a 3 second period for preparation. '
+                                     'Live classification continues meanwhile and uses the updated model right after the recording.', 'Adapt model', wx.OK | wx.ICON_INFORMATION | wx.CANCEL | wx.CENTRE)
+        if dlg.ShowModal() == wx.ID_CANCEL:
+            return
+        self.btn_adaptClassifier.Disable()
+        self.streamHandler.startModelAdaptation()
+
+
     def onTrainClassifier(self, e):
+        if self.streamHandler.isTrainingClassifier():
+            self.streamHandler.cancelTrainingClassifier()
+            return
+
         if len(self.streamHandler.getCalibrationStatus().keys()) < 2:
             wx.MessageDialog(None, 'You need to provide at least two calibrated classes!', 'Not enough classes', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
             return
@@ -257,10 +400,53 @@ class CalibrationTab(StreamEventListener):
         if self.trainClassifierDialog.ShowModal() == wx.ID_CANCEL:
             return
         else:
-            self.streamHandler.startTrainingClassifier()
+            self.streamHandler.startTrainingClassifier(self.searchParameters_checkmark.GetValue(), self.backends[self.backendChoice.GetSelection()], self.selectedFeatures)
             self.GetTopLevelParent().statusbar.SetStatusText("Training classifier model...")
 
 
+    def onSelectFeatures(self, e):
+        features = list(self.streamHandler.getFeatureNames().keys())
+        dlg = wx.MultiChoiceDialog(self, "Features calculated per window and channel:", "Features", list(self.streamHandler.getFeatureNames().values()))
+        dlg.SetSelections([features.index(feature) for feature in self.selectedFeatures])
+        if dlg.ShowModal() == wx.ID_OK:
+            if dlg.GetSelections():
+                self.selectedFeatures = [features[index] for index in dlg.GetSelections()]
+            else:
+                wx.MessageDialog(None, 'You need to select at least one feature!', 'No features selected', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+        dlg.Destroy()
+
+
+    def updateTrainingProgress(self):
+        progress = self.streamHandler.getTrainingProgress()
+        if progress is not None:
+            self.GetTopLevelParent().statusbar.SetStatusText("Training classifier model... " + progress[0] + " ({:.0f} %)".format(progress[1] * 100.0))
+
+
+    def onTrainClassifierFailed(self):
+        if self.trainClassifierDialog is not None:
+            self.trainClassifierDialog.Destroy()
+        self.btn_trainClassifier.SetLabel("Train Classifier")
+        self.GetTopLevelParent().statusbar.SetStatusText("")
+        wx.MessageDialog(None, 'Training classification model failed. See console output for details.', 'Building model failed', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
+
+    def onModelAdaptationCompleted(self):
+        if self.calibrationDialog is not None:
+            self.calibrationDialog.Destroy()
+            self.calibrationDialog = None
+        self.GetTopLevelParent().statusbar.SetStatusText("Model adapted (" + str(self.streamHandler.getClassifierInfo()['adaptations']) + " adaptations).")
+        self.btn_adaptClassifier.Enable(self.streamHandler.isStreamingClassification)
+
+
+    def onModelAdaptationFailed(self):
+        if self.calibrationDialog is not None:
+            self.calibrationDialog.Destroy()
+            self.calibrationDialog = None
+        wx.MessageDialog(None, 'The model could not be adapted. Adapting requires a model trained as Online Linear SVM, a running live classification and recordings of the classes of the model.', 'Adapting model failed',
+                         wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+        self.btn_adaptClassifier.Enable(self.streamHandler.isStreamingClassification and self.streamHandler.isClassifierAdaptable())
+
+
     def onStartCalibration(self, e):
         dlg = wx.MessageDialog(None, 'During the calibration process you will be asked to perform '
                                      'gesture/motion input corresponding to the labels specified by you.\n\n'
@@ -281,6 +467,10 @@ class CalibrationTab(StreamEventListener):
         '''
         Handles StreamEvents for this class. Listens for calibration and classification related messages.
         '''
+        if not wx.IsMainThread():
+            #events of training, adapting and swapping models (e.g. stopping live classification on a mismatch) are fired from background threads, wx must only be used from the GUI thread
+            wx.CallAfter(self.onStreamEvent, streamEvent)
+            return
         if streamEvent == StreamEvent.CALIBRATION_FAILED_NO_CONNECTION:
             wx.MessageDialog(None, 'Please specify connection info before calibration.', 'No connection',
                              wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
@@ -318,17 +508,44 @@ class CalibrationTab(StreamEventListener):
         if streamEvent == StreamEvent.CALIBRATION_FAILED_ABORT:
             self.calibrationDialog.Destroy()
 
+        if streamEvent == StreamEvent.LIVE_CLASSIFICATION_MODEL_SWAPPED:
+            self.GetTopLevelParent().statusbar.SetStatusText("Streaming live classification... (switched to new model)")
+
+        if streamEvent == StreamEvent.MODEL_ADAPTATION_STARTED:
+            labels = [label for label in self.streamHandler.getClassifierInfo()['classes'] if label != NULL_CLASS_LABEL]
+            self.calibrationDialog = CompleteCalibrationDialog(self.streamHandler, labels, 3, 3, self.streamHandler.onModelAdaptationComplete)
+
+        if streamEvent == StreamEvent.MODEL_ADAPTATION_COMPLETED:
+            self.onModelAdaptationCompleted()
+
+        if streamEvent == StreamEvent.MODEL_ADAPTATION_FAILED:
+            self.onModelAdaptationFailed()
+
+        if streamEvent == StreamEvent.TRAIN_CLASSIFIER_STARTED:
+            self.btn_trainClassifier.SetLabel("Cancel Training")
+
+        if streamEvent == StreamEvent.TRAIN_CLASSIFIER_PROGRESS:
+            self.updateTrainingProgress()
+
         if streamEvent == StreamEvent.TRAIN_CLASSIFIER_CANCELLED:
             if self.trainClassifierDialog is not None:
                 self.trainClassifierDialog.Destroy()
+            self.btn_trainClassifier.SetLabel("Train Classifier")
             self.GetTopLevelParent().statusbar.SetStatusText("")
 
+        if streamEvent == StreamEvent.TRAIN_CLASSIFIER_FAILED:
+            self.onTrainClassifierFailed()
+
         if streamEvent == StreamEvent.TRAIN_CLASSIFIER_COMPLETED:
             if self.trainClassifierDialog is not None:
                 self.trainClassifierDialog.Destroy()
-            self.GetTopLevelParent().statusbar.SetStatusText("")
+            self.btn_trainClassifier.SetLabel("Train Classifier")
+            #training does not depend on the feature cache, failing to write it is only reported
+            featureCacheError = self.streamHandler.getClassifierInfo().get('feature_cache_error')
+            self.GetTopLevelParent().statusbar.SetStatusText("" if featureCacheError is None else "Could not write feature cache: " + featureCacheError)
             tmp = self.streamHandler.getClassifierInfo
-            wx.MessageDialog(None, 'Training classification model completed. Showing averaged metrics for 10-fold CV:\n'
+            wx.MessageDialog(None, 'Training classification model completed. Showing averaged metrics for 10-fold CV'
+                                   + (' of the best search candidate (optimistic, as the candidate was selected by these metrics)' if 'search_results' in self.streamHandler.getClassifierInfo() else '') + ':\n'
                                    'Accuracy: ' + "{:.1f}".format(self.streamHandler.getClassifierAccuracy()) + "%\n"
                                     "Balanced Acc.: " + "{:.1f}".format(self.streamHandler.getClassifierInfo()['balanced_accuracy']) + "%\n"
                                     "F1 weighted: " + "{:.1f}".format(self.streamHandler.getClassifierInfo()['f1_weighted']) + "%\n"
@@ -337,6 +554,28 @@ class CalibrationTab(StreamEventListener):
                              wx.ICON_INFORMATION | wx.OK | wx.CENTRE).ShowModal()
             self.updateClassifierInfo()
 
+        if streamEvent == StreamEvent.CALIBRATION_DATASET_LOADED:
+            self.GetTopLevelParent().statusbar.SetStatusText("Calibration dataset loaded.")
+
+        if streamEvent == StreamEvent.CALIBRATION_DATASET_LOAD_FAILED:
+            wx.MessageDialog(None, 'The selected directory does not contain a compatible calibration dataset.', 'Cannot load dataset', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
+        if streamEvent == StreamEvent.MODEL_LOADED:
+            self.GetTopLevelParent().statusbar.SetStatusText("Trained model loaded.")
+            self.updateClassifierInfo()
+
+        if streamEvent == StreamEvent.MODEL_LOAD_FAILED_INVALID_FILE:
+            wx.MessageDialog(None, 'The selected file is not a model saved by this version of EMBody.', 'Cannot load model', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
+        if streamEvent == StreamEvent.MODEL_LOAD_FAILED_INVALID_CHANNELS:
+            wx.MessageDialog(None, 'The channels stored with the selected model do not match the number of channels it was trained on.', 'Cannot load model', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
+        if streamEvent == StreamEvent.MODEL_LOAD_FAILED_INCOMPATIBLE:
+            wx.MessageDialog(None, 'The model was trained with different channels or a different sampling rate than the current connection provides.', 'Incompatible model', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
+        if streamEvent == StreamEvent.LIVE_CLASSIFICATION_SAMPLING_RATE_MISMATCH:
+            wx.MessageDialog(None, 'Sampling rate of the connection does not match learned classifier. Try re-calibrating and re-learning.', 'Sampling rate mismatch', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
+
         if streamEvent == StreamEvent.LIVE_CLASSIFICATION_NO_CLF:
             wx.MessageDialog(None, 'No Classifier available for prediction. Try re-calibrating and re-learning.', 'No Model available', wx.OK | wx.ICON_ERROR | wx.CENTRE).ShowModal()
 
@@ -352,30 +591,35 @@ class CalibrationTab(StreamEventListener):
             self.st_port.Enable(False)
             self.tc_port.Enable(False)
             self.lsl_checkmark.Enable(False)
+            self.btn_adaptClassifier.Enable(self.streamHandler.isClassifierAdaptable())
             self.GetParent().SetSelection(2)
 
         if streamEvent == StreamEvent.LIVE_CLASSIFICATION_STOPPED:
-            self.GetTopLevelParent().statusbar.SetStatusText("")
+            #report windows that were dropped or classified late (cf. InferenceWorker)
+            self.GetTopLevelParent().statusbar.SetStatusText(self.streamHandler.getLiveClassificationSummary() or "")
             self.btn_toggleLiveClassification.SetLabel("Start live classification")
             self.st_port.Enable(True)
             self.tc_port.Enable(True)
             self.lsl_checkmark.Enable(True)
+            self.btn_adaptClassifier.Disable()
 
 
 class CompleteCalibrationDialog(wx.Dialog):
     '''
     Wizard that guides the user through the calibration. Displays windows for calibration labels in turns and informs the StreamHandler about changes. Note that the StreamHandler takes care of data synchronization (set/getCurrentCalibrationLabel())
+    onComplete is called after all labels were recorded; defaults to StreamHandler.onCalibrationComplete.
     '''
-    def __init__(self, streamHandler, gestureLabels, preparationTime, recordingTime):
+    def __init__(self, streamHandler, gestureLabels, preparationTime, recordingTime, onComplete=None):
         wx.Dialog.__init__(self, None, style=wx.CAPTION)
         self.streamHandler = streamHandler
+        self.onComplete = onComplete if onComplete is not None else streamHandler.onCalibrationComplete
         self.gestureLabels = []
         nullClassGroupIndex = 0
         for label in gestureLabels:
             # add a NONE class in between every other label
             if label is not NULL_CLASS_LABEL:
-                self.gestureLabels.append((label, str(0)))
-                self.gestureLabels.append((NULL_CLASS_LABEL, str(nullClassGroupIndex)))
+                self.gestureLabels.append((label, 0))
+                self.gestureLabels.append((NULL_CLASS_LABEL, nullClassGroupIndex))
                 nullClassGroupIndex+=1
         self.labelIndex = 0
         self.preparationTime = preparationTime
@@ -428,7 +672,7 @@ class CompleteCalibrationDialog(wx.Dialog):
             self.Fit()
             wx.CallLater(1000, self.finishCalibration)
             return
-        self.streamHandler.onCalibrationComplete()
+        self.onComplete()
 
     def updateCountdown(self):
 
@@ -8,8 +8,10 @@ import matplotlib.animation as animation
 #standard layout for liveview
 nrow = 2
 ncol = 3
-view_modes = ["Raw Signal", "Filtered Signal", "RMS of Signal"]
-view_mode_axis = [(0, 4096), (-2000, 2000), (0, 2000)]
+view_modes = ["Raw Signal", "Filtered Signal", "RMS of Signal", "Spectrogram"]
+#range of the y-axis; for the spectrogram range of the colormap (power spectral density in dB)
+view_mode_axis = [(0, 4096), (-2000, 2000), (0, 2000), (-10, 50)]
+SPECTROGRAM_MODE = 3
 
 class LiveViewTab(StreamEventListener):
     def __init__(self, parent, streamHandler):
@@ -62,6 +64,9 @@ class LiveViewTab(StreamEventListener):
 
     def createGridConfiguration(self):
         self.axArray = self.figure.subplots(2, 3)
+        if self.currentViewMode == SPECTROGRAM_MODE:
+            self.createSpectrogramGridConfiguration()
+            return
         displayData = []
         if self.currentViewMode == 1: #filtered signal view
             displayData = self.streamHandler.getCurrentBuffer(filtered=True)
@@ -82,12 +87,45 @@ class LiveViewTab(StreamEventListener):
             [axis.set_xticks([]) for axis in self.axArray[i, :]]
             [self.rawData.append(axis.plot([], [])) for axis in self.axArray[i, :]]
 
+    def createSpectrogramGridConfiguration(self):
+        currentSpectrogram = self.streamHandler.getCurrentSpectrogram()
+        self.rawData = []
+        if currentSpectrogram is None:
+            #neither live view nor live classification is running (yet), nothing to show
+            for i in range(0, nrow):
+                for j in range(0, ncol):
+                    self.axArray[i, j].set_title(label="CH_" + str(i * ncol + j + 1))
+                    self.axArray[i, j].set_xticks([])
+                    self.rawData.append(None)
+            return
+        spectrogram, frequencies = currentSpectrogram
+        for i in range(0, nrow):
+            for j in range(0, ncol):
+                axis = self.axArray[i, j]
+                axis.set_title(label="CH_" + str(i * ncol + j + 1))
+                axis.set_xticks([])
+                if i * ncol + j not in self.streamHandler.getActiveChannels():
+                    axis.set_facecolor('.9')
+                    axis.axis([0, spectrogram.shape[2], frequencies[0], frequencies[-1]])
+                    self.rawData.append(None)
+                else:
+                    self.rawData.append([axis.imshow(spectrogram[i * ncol + j], aspect='auto', origin='lower', interpolation='nearest',
+                                                     extent=(0, spectrogram.shape[2], frequencies[0], frequencies[-1]),
+                                                     vmin=view_mode_axis[SPECTROGRAM_MODE][0], vmax=view_mode_axis[SPECTROGRAM_MODE][1])])
+
     def updatePlot(self, a):
         '''
         Animation function to update data for plots
         '''
         currentData = []
-        if self.currentViewMode == 1: #filtered signal view
+        if self.currentViewMode == SPECTROGRAM_MODE: #spectrogram view, only new samples are transformed
+            currentSpectrogram = self.streamHandler.getCurrentSpectrogram()
+            if currentSpectrogram is not None:
+                for i in range(0, 6):
+                    if self.rawData[i] is not None and i in self.streamHandler.getActiveChannels():
+                        self.rawData[i][0].set_data(currentSpectrogram[0][i])
+            currentData = None
+        elif self.currentViewMode == 1: #filtered signal view
             currentData = self.streamHandler.getCurrentBuffer(filtered=True)
         elif self.currentViewMode == 2: #RMS values view
             currentData = self.streamHandler.getCurrentBuffer(filtered=True, rms=True)
@@ -97,7 +135,7 @@ class LiveViewTab(StreamEventListener):
         if currentData is not None:
             for i in range(0, 6):
                 if i in self.streamHandler.getActiveChannels():
-                    self.rawData[i][0].set_data(range(len(currentData[i]) - 1, -1, -1), currentData[i])
+                    self.rawData[i][0].set_data(range(len(currentData[i])), currentData[i])
 
         # filteredData = self.streamHandler.getCurrentBuffer(filtered=True)
         # if filteredData is not None:
@@ -126,6 +164,10 @@ class LiveViewTab(StreamEventListener):
         '''
         Listen for StreamEvent for this class. Only interested in start/stop of liveview or live classification and whether the active channels have changed.
         '''
+        if not wx.IsMainThread():
+            #events of training, adapting and swapping models (e.g. stopping live classification on a mismatch) are fired from background threads, wx must only be used from the GUI thread
+            wx.CallAfter(self.onStreamEvent, streamEvent)
+            return
         if streamEvent == StreamEvent.LIVE_VIEW_STARTED or streamEvent == StreamEvent.LIVE_CLASSIFICATION_STARTED:
             self.updateView()
         if streamEvent == StreamEvent.LIVE_VIEW_STOPPED or streamEvent == StreamEvent.LIVE_CLASSIFICATION_STOPPED:
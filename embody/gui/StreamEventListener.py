@@ -42,4 +42,17 @@ class StreamEvent(Enum):
     LIVE_CLASSIFICATION_NUM_CHANNEL_MISMATCH = 22
     LIVE_CLASSIFICATION_STARTED = 23
     LIVE_CLASSIFICATION_STOPPED = 24
-    ACTIVE_CHANNELS_CHANGED = 25
\ No newline at end of file
+    ACTIVE_CHANNELS_CHANGED = 25
+    TRAIN_CLASSIFIER_PROGRESS = 26
+    TRAIN_CLASSIFIER_FAILED = 27
+    MODEL_LOADED = 28
+    MODEL_LOAD_FAILED_INVALID_FILE = 29
+    MODEL_LOAD_FAILED_INCOMPATIBLE = 30
+    LIVE_CLASSIFICATION_SAMPLING_RATE_MISMATCH = 31
+    CALIBRATION_DATASET_LOADED = 32
+    CALIBRATION_DATASET_LOAD_FAILED = 33
+    MODEL_ADAPTATION_STARTED = 34
+    MODEL_ADAPTATION_COMPLETED = 35
+    MODEL_ADAPTATION_FAILED = 36
+    LIVE_CLASSIFICATION_MODEL_SWAPPED = 37
+    MODEL_LOAD_FAILED_INVALID_CHANNELS = 38
\ No newline at end of file
@@ -0,0 +1,104 @@
+import socket
+import time
+import traceback
+from threading import Thread, Lock
+from logic.PacketDecoder import PacketDecoder
+from logic.RingBuffer import RingBuffer
+from logic.StreamingFilter import StreamingFilter
+from logic.IncrementalRMS import IncrementalRMS
+
+
+class StreamConsumer:
+    '''
+    Super class for every module that wants to receive samples from the AcquisitionEngine.
+    '''
+
+    def onSamples(self, batch):
+        '''
+        Called from the acquisition thread for every received batch. Should return quickly, as the acquisition thread is blocked in the meantime.
+        :param batch: 2D numpy array (samples x fields), the first column contains the timestamps (cf. PacketDecoder)
+        '''
+        pass
+
+
+class AcquisitionEngine(Thread):
+    '''
+    Long-lived background thread that owns the UDP socket and the ringbuffer for a connection. It receives data from the hardware prototype, populates the ringbuffer (once configured, cf. configure) and passes every batch to the attached consumers (cf. StreamConsumer).
+    Alongside the raw ringbuffer, a causally filtered ringbuffer (cf. StreamingFilter) and a ringbuffer of its sliding RMS (cf. IncrementalRMS) are maintained, which only require processing newly arrived samples.
+    Consumers (e.g. connection test, calibration recording, live classification) can be added and removed at any time without rebinding the socket.
+    '''
+    def __init__(self, connectionInfo, timeout=0.5, rmsWindowSize=20):
+        Thread.__init__(self)
+        self.daemon = True
+        self.running = False
+        self.connectionInfo = connectionInfo
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
+        #short timeout, so that stopping the engine does not block
+        self.sock.settimeout(timeout)
+        self.sock.bind((self.connectionInfo.udpIP, self.connectionInfo.udpPort))
+        self.decoder = PacketDecoder()
+        self.ringBuffer = None
+        self.filteredRingBuffer = None
+        self.streamingFilter = None
+        self.rmsRingBuffer = None
+        self.incrementalRMS = None
+        self.rmsWindowSize = rmsWindowSize
+        self.consumers = []
+        self.dispatchLock = Lock()
+        self.totalSamples = 0
+        self.lastPacketTime = None
+
+    def configure(self, numberOfChannels, samplingRate, bufferDuration=10.0):
+        '''
+        (re-)creates the ringbuffers, the streaming filter and the incremental RMS once the properties of the stream are known (cf. TestConnectionConsumer)
+        :param numberOfChannels: number of EMG channels in the stream
+        :param samplingRate: estimated sampling rate
+        :param bufferDuration: length of the ringbuffers in seconds
+        '''
+        with self.dispatchLock:
+            self.ringBuffer = RingBuffer(numberOfChannels, int(samplingRate * bufferDuration))
+            self.filteredRingBuffer = RingBuffer(numberOfChannels, int(samplingRate * bufferDuration))
+            self.streamingFilter = StreamingFilter(numberOfChannels, samplingRate)
+            self.rmsRingBuffer = RingBuffer(numberOfChannels, int(samplingRate * bufferDuration))
+            self.incrementalRMS = IncrementalRMS(numberOfChannels, self.rmsWindowSize)
+
+    def addConsumer(self, consumer):
+        self.consumers = self.consumers + [consumer]
+
+    def removeConsumer(self, consumer):
+        '''
+        detaches the given consumer; once this returns the consumer does not receive any further samples
+        '''
+        self.consumers = [c for c in self.consumers if c is not consumer]
+        #wait for a batch that is currently dispatched
+        with self.dispatchLock:
+            pass
+
+    def run(self):
+        self.running = True
+        while self.running:
+            try:
+                batch = self.decoder.receive(self.sock)
+            except socket.timeout:
+                continue
+            self.lastPacketTime = time.time()
+            self.totalSamples += len(batch)
+            with self.dispatchLock:
+                if self.ringBuffer is not None:
+                    # assuming one timestamp channel
+                    samples = batch[:, 1:self.ringBuffer.numberOfChannels + 1].T
+                    self.ringBuffer.extend(samples)
+                    filteredSamples = self.streamingFilter.process(samples)
+                    self.filteredRingBuffer.extend(filteredSamples)
+                    self.rmsRingBuffer.extend(self.incrementalRMS.update(filteredSamples))
+                for consumer in self.consumers:
+                    try:
+                        consumer.onSamples(batch)
+                    except Exception:
+                        traceback.print_exc()
+        self.sock.close()
+
+    def stop(self):
+        self.running = False
+        self.join()
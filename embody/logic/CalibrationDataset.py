@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pandas as pd
+
+#columns of calibrationData, cf. ClassificationManager
+CLASS_LABEL = "class_label"
+GROUP_INDEX = "group_index"
+SESSION_PREFIX = "session_"
+SESSION_EXTENSION = ".npz"
+
+
+class CalibrationDataset:
+    '''
+    Directory of calibration sessions in a binary format: one compressed npz file per session, holding the preprocessed EMG channels as a float32 matrix (channels x samples) and the class labels and groups as run-length encoded segments.
+    Group indices are stored as integers if all groups of a session are integers (as recorded by the calibration), otherwise as strings.
+    Sessions are only ever added (cf. appendSession), so growing a dataset never rewrites existing data. Loading (cf. load) merges all sessions into one calibrationData DataFrame (cf. ClassificationManager.preprocessData).
+    '''
+    def __init__(self, directory):
+        self.directory = directory
+
+    def getSessions(self):
+        '''
+        :return: sorted list of paths of all sessions in the dataset
+        '''
+        if not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, name) for name in sorted(os.listdir(self.directory)) if name.startswith(SESSION_PREFIX) and name.endswith(SESSION_EXTENSION)]
+
+    def appendSession(self, calibrationData, samplingRate, channels=None):
+        '''
+        adds the given calibration data as a new session
+        :param calibrationData: pandas DataFrame with EMG columns ("EMG_X"), "class_label" and "group_index"
+        :param samplingRate: sampling rate of calibrationData
+        :param channels: channels of the device the data was recorded from
+        :return: path of the new session
+        '''
+        if calibrationData.empty:
+            raise EmptyDatasetError()
+        os.makedirs(self.directory, exist_ok=True)
+        emgColumns = [column for column in calibrationData.columns if column.startswith("EMG")]
+        labels = calibrationData[CLASS_LABEL].to_numpy(dtype=object)
+        groups = calibrationData[GROUP_INDEX].to_numpy(dtype=object)
+        #run-length encoding of (label, group); compared via codes, as missing labels are None or NaN
+        labelCodes = pd.factorize(labels)[0]
+        groupCodes = pd.factorize(groups)[0]
+        changes = np.flatnonzero((labelCodes[1:] != labelCodes[:-1]) | (groupCodes[1:] != groupCodes[:-1])) + 1
+        segmentStarts = np.concatenate([[0], changes]) if len(labels) > 0 else np.empty(0, dtype=np.int64)
+        segmentLengths = np.diff(segmentStarts, append=len(labels))
+        segmentLabels = labels[segmentStarts]
+        segmentGroups = groups[segmentStarts]
+        #samples without label (e.g. between calibration runs) are stored as empty strings and masked
+        labelled = (labelCodes[segmentStarts] >= 0) & (groupCodes[segmentStarts] >= 0)
+        if all(isinstance(group, (int, float, np.number)) and float(group).is_integer() for group in segmentGroups[labelled]):
+            #integral floats occur if pandas converted a column of integers and missing values
+            segmentGroups = np.array([int(group) if valid else -1 for group, valid in zip(segmentGroups, labelled)], dtype=np.int64)
+        else:
+            segmentGroups = np.array([str(group) if valid else "" for group, valid in zip(segmentGroups, labelled)], dtype=str)
+
+        sessions = self.getSessions()
+        index = int(os.path.basename(sessions[-1])[len(SESSION_PREFIX):-len(SESSION_EXTENSION)]) + 1 if sessions else 0
+        path = os.path.join(self.directory, SESSION_PREFIX + "{:04d}".format(index) + SESSION_EXTENSION)
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as file:
+            np.savez_compressed(file,
+                                emg=calibrationData[emgColumns].to_numpy(dtype=np.float32).T,
+                                segment_labels=np.array([str(label) if valid else "" for label, valid in zip(segmentLabels, labelled)], dtype=str),
+                                segment_groups=segmentGroups,
+                                segment_lengths=segmentLengths.astype(np.int64),
+                                segment_labelled=labelled,
+                                sampling_rate=np.float64(samplingRate),
+                                channels=np.array(channels if channels is not None else [], dtype=np.int64))
+        os.replace(temporaryPath, path)
+        return path
+
+    @staticmethod
+    def readSession(path, groupPrefix=""):
+        '''
+        :param groupPrefix: prefix added to every group
+        :return: calibrationData DataFrame, sampling rate and channels (None if unknown) of the given session
+        '''
+        with np.load(path, allow_pickle=False) as session:
+            emg = session['emg']
+            lengths = session['segment_lengths']
+            labelled = np.repeat(session['segment_labelled'], lengths)
+            labels = np.repeat(session['segment_labels'].astype(object), lengths)
+            groups = session['segment_groups']
+            if groupPrefix:
+                groups = np.char.add(groupPrefix, groups.astype(str))
+            #integer groups are restored as python ints
+            groups = np.repeat(np.array(groups.tolist(), dtype=object), lengths)
+            samplingRate = float(session['sampling_rate'])
+            channels = session['channels'].tolist() or None
+        labels[~labelled] = None
+        groups[~labelled] = None
+        df = pd.DataFrame(emg.T.astype(np.float64), columns=['EMG_' + str(i) for i in range(emg.shape[0])])
+        df[CLASS_LABEL] = labels
+        df[GROUP_INDEX] = groups
+        return df, samplingRate, channels
+
+    def load(self):
+        '''
+        merges all sessions of the dataset; groups are prefixed with the session name if there is more than one session, so that groups of different sessions are not mixed up
+        :return: calibrationData DataFrame, sampling rate and channels (None if unknown)
+        '''
+        sessions = self.getSessions()
+        if not sessions:
+            raise EmptyDatasetError()
+        frames = []
+        samplingRate = None
+        channels = None
+        for path in sessions:
+            groupPrefix = os.path.basename(path)[:-len(SESSION_EXTENSION)] + "/" if len(sessions) > 1 else ""
+            df, sessionSamplingRate, sessionChannels = self.readSession(path, groupPrefix)
+            if samplingRate is None:
+                samplingRate = sessionSamplingRate
+                channels = sessionChannels
+                numberOfColumns = len(df.columns)
+            elif abs(sessionSamplingRate - samplingRate) > 0.1 * samplingRate or len(df.columns) != numberOfColumns or sessionChannels != channels:
+                raise IncompatibleSessionsError()
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True), samplingRate, channels
+
+
+class EmptyDatasetError(Exception):
+    pass
+
+
+class IncompatibleSessionsError(Exception):
+    pass
@@ -1,27 +1,87 @@
 from logic.helpers import *
+from logic.CalibrationDataset import CalibrationDataset
+from logic.FeatureBank import FeatureBank, DEFAULT_FEATURES
+from logic.FeatureStore import FeatureStore
+from logic.FilterBank import getFilterBank
+from logic.InferencePipeline import InferencePipeline, PredictionStream
+import copy
+import itertools
+import os
+import pickle
+import time
+import joblib
 import pandas as pd
+from joblib import Parallel, delayed
+from threading import Lock
 from sklearn import svm, preprocessing
-from scipy.stats import mode
-from sklearn.model_selection import cross_validate
+from sklearn.base import clone
+from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv
 
 CLASS_LABEL = "class_label"
 TIMESTAMP = "timestamp"
 GROUP_INDEX = "group_index"
+SCORING = ['accuracy', 'balanced_accuracy', 'f1_weighted', 'precision_weighted', 'recall_weighted']
+MODEL_FILE_EXTENSION = ".model"
+#version 2 adds the feature configuration ("features"); version 1 models use rms and rms_ratios
+MODEL_FORMAT_VERSION = 2
+#identifies the implementation of extractFeatures (cf. FeatureStore), in addition to the selected features; to be changed whenever feature extraction changes
+FEATURE_SET = "feature_bank_v3"
+#classifier backends (cf. createClassifier) and the hyperparameters each of them supports
+CLASSIFIER_BACKENDS = {'svm': "RBF SVM", 'lda': "LDA", 'linear_svm': "Linear SVM", 'logistic_regression': "Logistic Regression", 'nystroem_linear_svm': "Nystroem + Linear SVM", 'random_features_linear_svm': "Random Features + Linear SVM", 'online_linear_svm': "Online Linear SVM (adaptable)"}
+BACKEND_PARAMETERS = {'svm': ('C', 'gamma'), 'lda': (), 'linear_svm': ('C',), 'logistic_regression': ('C',), 'nystroem_linear_svm': ('C', 'gamma'), 'random_features_linear_svm': ('C', 'gamma'), 'online_linear_svm': ('alpha',)}
+#backends approximating the RBF kernel of "svm" with a fixed number of components, i.e. a fixed prediction cost; their accuracy is compared to the exact SVM (cf. trainClassifierModel)
+KERNEL_APPROXIMATIONS = ('nystroem_linear_svm', 'random_features_linear_svm')
+KERNEL_APPROXIMATION_COMPONENTS = 300
+DEFAULT_PARAMETERS = {'C': 1.0, 'gamma': 'scale', 'alpha': 0.0001}
+#candidates evaluated by the hyperparameter search (cf. trainClassifierModel); all window sizes are supported by live classification (cf. FilterBank.filtfilt)
+SEARCH_GRID = {'windowSize': [10, 20, 40], 'C': [0.1, 1.0, 10.0, 100.0], 'gamma': ['scale', 0.01, 0.1, 1.0], 'alpha': [0.00001, 0.0001, 0.001, 0.01]}
+#passes over the samples of an adaptation recording (cf. adaptClassifierModel)
+ADAPTATION_EPOCHS = 5
+#number of live windows the inference latency is measured on (cf. measureInferenceLatency)
+LATENCY_REPETITIONS = 200
 
 class ClassificationManager:
-    def __init__(self, windowSize=20):
+    def __init__(self, windowSize=20, incrementalPrediction=False, hopSize=None, voteLength=None, hyperparameterSearch=False, nJobs=-1, featureCacheDirectory=None, backend='svm', features=DEFAULT_FEATURES, samplingRate=None):
         self.calibrationData = pd.DataFrame()
+        #number of samples per class label and group in calibrationData (cf. setCalibrationData)
+        self.calibrationIndex = {}
         self.calibrationLabels = []
-        self.mlData = None
         self.clf = None
         self.scaler = None
         self.clf_stats = None
-        self.currentSamplingRate = None
+        self.inferencePipeline = None
+        #sampling rate of the calibration data; given when training in a different process (cf. getTrainingOptions)
+        self.currentSamplingRate = samplingRate
+        #channels of the device the calibration data is based on
+        self.calibrationChannels = None
+        #sampling rate and channels the current model was trained with (cf. setClassifierModel), kept when other calibration data is loaded afterwards
+        self.modelSamplingRate = None
+        self.modelChannels = None
+        #guards replacing the model (cf. setClassifierModel) against compiling its inference pipeline concurrently (cf. getInferencePipeline)
+        self.modelLock = Lock()
         self.windowSize = windowSize
+        #features calculated per window, cf. FeatureBank
+        self.features = tuple(features)
+        #live classification: predict every hopSize samples, voting over the last voteLength per-sample predictions (cf. getHopSize, getVoteLength)
+        self.incrementalPrediction = incrementalPrediction
+        self.hopSize = hopSize
+        self.voteLength = voteLength
+        #training: search C, gamma and windowSize (cf. SEARCH_GRID) instead of using the defaults; folds are distributed over nJobs processes (-1: all cores)
+        self.hyperparameterSearch = hyperparameterSearch
+        self.nJobs = nJobs
+        #classifier trained by trainClassifierModel, cf. CLASSIFIER_BACKENDS
+        self.backend = backend
+        #features are cached on disk only if a directory is given (cf. FeatureStore)
+        self.featureStore = FeatureStore(featureCacheDirectory)
         self.currentPrediction = None
 
 
-    def makePrediction(self, data):
+    def makePrediction(self, data, inferencePipeline=None):
         """
         Uses the internally trained model (cf. trainClassifierModel) to predict classes for the given data. Return 'None' is not classifier is present.
         Executes a prediction for each EMG data sample (i.e. each row in data) and returns both a list of predictions and a voted (mode-based) final prediction.
@@ -31,55 +91,224 @@ class ClassificationManager:
 
         Parameters:
         data: 2D-array containing recorded EMG data samples (rows) per channel (columns).
+        inferencePipeline: pipeline to predict with (e.g. the one a live classification currently uses); defaults to the pipeline of the internally trained model (cf. getInferencePipeline)
+
+        Runs on NumPy arrays only (cf. InferencePipeline), which is compiled from the trained model on the first call.
 
         returns:
         currentPrediction: voted (mode-based) prediction for the given data
         prediction: list of predictions for valid window configurations; length = len(data) - windowsize
         """
 
-        if self.clf is None:
-            return 'None'
+        if inferencePipeline is None:
+            if self.clf is None:
+                return 'None'
+            inferencePipeline = self.getInferencePipeline()
 
-        df = pd.DataFrame(data)
-        df = df.transpose()
+        try:
+            voted_prediction, prediction = inferencePipeline.predict(data)
+            self.currentPrediction = str(voted_prediction)
+            return self.currentPrediction, prediction
+        except ValueError:
+            self.currentPrediction = None
+            return None, []
 
-        apply_bandpass_filter(df, 2.0, self.currentSamplingRate / 2.0 - 1.0, self.currentSamplingRate)
-        apply_bandstop_filter(df, 49.0, 51.0, self.currentSamplingRate)
+    def getInferencePipeline(self):
+        '''
+        Returns the InferencePipeline of the internally trained model; compiled on the first call after the model changed.
+        The pipeline holds everything needed for prediction (filter bank, window size, scaler, classifier), so replacing it is a single reference assignment (cf. StreamHandler.swapClassifierModel).
+        '''
+        #the model may be replaced concurrently (cf. setClassifierModel, adaptClassifierModel)
+        inferencePipeline = self.inferencePipeline
+        if inferencePipeline is None:
+            with self.modelLock:
+                if self.inferencePipeline is None:
+                    self.inferencePipeline = self.createInferencePipeline(self.scaler, self.clf, self.windowSize, self.features, self.modelSamplingRate)
+                inferencePipeline = self.inferencePipeline
+        return inferencePipeline
+
+    def createInferencePipeline(self, scaler, clf, windowSize, features, samplingRate, filterBank=None):
+        '''
+        Compiles an InferencePipeline for the given model; the filter bank defaults to the preprocessing filter bank of the given sampling rate (cf. getPreprocessingFilterBank).
+        '''
+        if filterBank is None:
+            filterBank = self.getPreprocessingFilterBank(samplingRate)
+        return InferencePipeline(filterBank, FeatureBank(features, windowSize, samplingRate), scaler, clf)
+
+    def createPredictionStream(self, numberOfChannels, inferencePipeline=None):
+        '''
+        Creates a PredictionStream for incremental live classification (cf. makeIncrementalPrediction) based on the given pipeline, defaulting to the internally trained model.
+        '''
+        if inferencePipeline is None:
+            inferencePipeline = self.getInferencePipeline()
+        return PredictionStream(inferencePipeline, numberOfChannels, self.getVoteLength(inferencePipeline.windowSize))
+
+    def makeIncrementalPrediction(self, predictionStream, data):
+        """
+        Incremental variant of makePrediction: filter state and, for RMS-based features, RMS sums of the given PredictionStream carry over between calls, hence only the given new samples are filtered, featurized and classified.
 
-        X = pd.DataFrame()
-        for column in df.columns:
-            X['rms' + str(column)] = rms_convolution(df[column], self.windowSize)
-        addPairwiseRatios(X)
+        Parameters:
+        predictionStream: PredictionStream created via createPredictionStream
+        data: 2D-array containing EMG data samples that arrived since the last call (columns) per channel (rows).
 
+        returns:
+        currentPrediction: voted (mode-based) prediction over the last voteLength predictions
+        prediction: list of predictions for the new samples
+        """
         try:
-            X = self.scaler.transform(X[X.columns])
-            prediction = self.clf.predict(X)
-            voted_prediction = mode(prediction)[0][0]
-            self.currentPrediction = str(voted_prediction)
+            voted_prediction, prediction = predictionStream.update(data)
+            self.currentPrediction = None if voted_prediction is None else str(voted_prediction)
             return self.currentPrediction, prediction
         except ValueError:
             self.currentPrediction = None
             return None, []
 
+    def getHopSize(self, windowSize=None):
+        '''
+        number of samples between two live predictions; defaults to windowSize (of the internally trained model, unless given)
+        '''
+        if windowSize is None:
+            windowSize = self.windowSize
+        return self.hopSize if self.hopSize is not None else windowSize
+
+    def getVoteLength(self, windowSize=None):
+        '''
+        number of per-sample predictions a live prediction is voted from; defaults to 2*windowSize+1 (i.e. windowSize*3 samples of data)
+        '''
+        if windowSize is None:
+            windowSize = self.windowSize
+        return self.voteLength if self.voteLength is not None else 2 * windowSize + 1
+
+    def getPreprocessingFilterBank(self, samplingRate=None):
+        '''
+        Returns the filter bank used for preprocessing and prediction (bandpass from 2 Hz to nyquist frequency - 1 Hz and bandstop from 49 to 51 Hz, cf. FilterBank). The filter bank is only designed once per sampling rate.
+        '''
+        if samplingRate is None:
+            samplingRate = self.currentSamplingRate
+        return getFilterBank(samplingRate, (2.0, samplingRate / 2.0 - 1.0), (49.0, 51.0))
+
+    def saveClassifierModel(self, pathname):
+        """
+        Exports the trained model, including everything needed for live classification: filter configuration, sampling rate, window size, channels, scaler, classifier and its statistics (clf_stats).
+        The file is written by joblib without compression, so that large arrays (e.g. support vectors) can be memory-mapped when loading (cf. readClassifierModel).
+
+        Parameters:
+        pathname: path of the exported file; MODEL_FILE_EXTENSION is appended if missing
+        """
+        if not pathname.endswith(MODEL_FILE_EXTENSION):
+            pathname += MODEL_FILE_EXTENSION
+        filterBank = self.getPreprocessingFilterBank(self.modelSamplingRate)
+        model = {'format_version': MODEL_FORMAT_VERSION,
+                 'sampling_rate': self.modelSamplingRate,
+                 'filter': {'bandpass': filterBank.bandpass, 'bandstop': filterBank.bandstop, 'order': filterBank.order},
+                 'window_size': self.windowSize,
+                 'features': self.features,
+                 'channels': self.modelChannels,
+                 'scaler': self.scaler,
+                 'clf': self.clf,
+                 'clf_stats': self.clf_stats}
+        #the file is replaced at once, a model loaded from it may still be memory-mapped (cf. readClassifierModel)
+        temporaryPathname = pathname + ".tmp"
+        joblib.dump(model, temporaryPathname)
+        os.replace(temporaryPathname, pathname)
+
+    @staticmethod
+    def readClassifierModel(pathname):
+        """
+        Reads a model exported via saveClassifierModel; large arrays are memory-mapped (read-only). Note that model files are pickled, hence only files from trusted sources should be loaded.
+
+        returns:
+        model: python dict, cf. saveClassifierModel; can be installed via setClassifierModelFromFile
+        """
+        try:
+            model = joblib.load(pathname, mmap_mode='r')
+        except (OSError, EOFError, ValueError, KeyError, AttributeError, ImportError, pickle.UnpicklingError):
+            raise InvalidModelFileError()
+        if not isinstance(model, dict) or model.get('format_version') not in (1, MODEL_FORMAT_VERSION):
+            raise InvalidModelFileError()
+        return model
+
+    def setClassifierModelFromFile(self, model):
+        """
+        Replaces the internally trained model with a model read via readClassifierModel. The inference pipeline is compiled right away, so that live classification can start immediately.
+        The calibration data (and its sampling rate and channels) is kept.
+        """
+        clf_stats = dict(model['clf_stats'])
+        #version 1 models always use rms and rms_ratios
+        clf_stats['features'] = tuple(model.get('features', ('rms', 'rms_ratios')))
+        clf_stats['window_size'] = model['window_size']
+        filterBank = getFilterBank(model['sampling_rate'], tuple(model['filter']['bandpass']), tuple(model['filter']['bandstop']), model['filter']['order'])
+        inferencePipeline = self.createInferencePipeline(model['scaler'], model['clf'], model['window_size'], clf_stats['features'], model['sampling_rate'], filterBank)
+        self.setClassifierModel(model['clf'], model['scaler'], clf_stats, model['sampling_rate'], model['channels'], inferencePipeline)
+
     def saveCalibrationData(self, pathname):
         if self.calibrationData is None:
-            self.calibrationData = pd.DataFrame()
+            self.setCalibrationData(pd.DataFrame())
         self.calibrationData.to_csv(pathname + ".csv", index=False, na_rep="None")
 
+    def appendCalibrationSession(self, directory):
+        """
+        Adds the current calibration data as a new session to the binary calibration dataset in the given directory (cf. CalibrationDataset).
+        """
+        CalibrationDataset(directory).appendSession(self.calibrationData, self.currentSamplingRate, self.calibrationChannels)
+
+    def loadCalibrationDataset(self, directory):
+        """
+        Replaces the calibration data with all sessions of the binary calibration dataset in the given directory (cf. CalibrationDataset), e.g. to train on several sessions at once.
+
+        returns:
+        labels: list of class labels in the loaded calibration data
+        """
+        calibrationData, self.currentSamplingRate, self.calibrationChannels = CalibrationDataset(directory).load()
+        self.setCalibrationData(calibrationData)
+        return list(self.calibrationData[CLASS_LABEL].dropna().unique())
+
+    def setCalibrationData(self, calibrationData):
+        '''
+        Replaces the calibration data and rebuilds the index of samples per class label and group (cf. getCalibrationStatus).
+        '''
+        self.calibrationData = calibrationData
+        self.calibrationIndex = {}
+        self.updateCalibrationIndex(calibrationData)
+
+    def appendCalibrationData(self, calibrationData):
+        '''
+        Appends the given preprocessed calibration data (e.g. the recording of a model adaptation); only the samples of the appended data are added to the index.
+        '''
+        if self.calibrationData.empty:
+            self.calibrationData = calibrationData
+        else:
+            self.calibrationData = pd.concat([self.calibrationData, calibrationData], ignore_index=True)
+        self.updateCalibrationIndex(calibrationData)
+
+    def updateCalibrationIndex(self, calibrationData):
+        '''
+        adds the number of samples per class label and group of the given calibration data to the index
+        '''
+        if not calibrationData.empty:
+            for (label, group), count in calibrationData.groupby([CLASS_LABEL, GROUP_INDEX]).size().items():
+                groups = self.calibrationIndex.setdefault(label, {})
+                groups[group] = groups.get(group, 0) + count
+
     def getCalibrationStatus(self, deleteCalibrationForUnusedLabels = True):
+        '''
+        Returns the calibrated duration (in seconds) per calibration label, None for labels without calibration data. Based on the index of setCalibrationData, hence independent of the amount of calibration data.
+        If deleteCalibrationForUnusedLabels is set, calibration data of labels that are not calibration labels anymore is deleted.
+        '''
         calibrationStatus = {}
         for label in self.calibrationLabels:
             calibrationStatus[label] = None
-        if not self.calibrationData.empty:
-            toBeDeleted = []
-            for name, group in self.calibrationData.groupby(CLASS_LABEL):
-                if name in self.calibrationLabels:
-                    calibrationStatus[name] = len(group.index)/self.currentSamplingRate
-                else:
-                    toBeDeleted.append(name)
+        toBeDeleted = []
+        for label, groups in self.calibrationIndex.items():
+            if label in self.calibrationLabels:
+                calibrationStatus[label] = sum(groups.values())/self.currentSamplingRate
+            else:
+                toBeDeleted.append(label)
 
-            if deleteCalibrationForUnusedLabels:
-                self.calibrationData = self.calibrationData[self.calibrationData[CLASS_LABEL].map(lambda x: x not in toBeDeleted)]
+        if deleteCalibrationForUnusedLabels and toBeDeleted:
+            self.calibrationData = self.calibrationData[~self.calibrationData[CLASS_LABEL].isin(toBeDeleted)]
+            for label in toBeDeleted:
+                del self.calibrationIndex[label]
 
         return calibrationStatus
 
@@ -87,79 +316,365 @@ class ClassificationManager:
     def onCalibrationInitialized(self, calibrationLabels):
         self.calibrationLabels = calibrationLabels
 
-    def onRawCalibrationDataAvailable(self, rawTimestamps, rawData, synchronizedLabels, totalCalibrationDuration):
+    def onRawCalibrationDataAvailable(self, rawTimestamps, rawData, labelSegments, totalCalibrationDuration, activeChannels=None):
         """
         Populates an internal data structure that can be used for training a classification model.
 
         Parameters:
-        rawTimestamps: list of timestamps of the recorded EMG data (same length of column axis as rawData)
-        rawData: 2D-array containing recorded EMG data samples (rows) per channel (columns).
-        synchronizedLabels: list of calibration labels; each entry corresponds to the respective entry in rawData (same length of column axis as rawData)
+        rawTimestamps: array-like of timestamps of the recorded EMG data (same length of column axis as rawData)
+        rawData: 2D-array (e.g. a numpy view) containing recorded EMG data samples (columns) per channel (rows).
+        labelSegments: list of calibration label changes (timestamp, (label, group)) in chronological order, cf. assignCalibrationLabels
         totalCalibrationDuration: time spent during calibration; used to check amount of sample recevied
+        activeChannels: channels of the device rawData was recorded from (stored with exported models, cf. saveClassifierModel)
 
         """
-        if len(rawData[0]) == len(rawTimestamps) and len(rawTimestamps) == len(synchronizedLabels):
+        if len(rawData[0]) == len(rawTimestamps):
             samplingRate = getAvgSamplingRateFromTimestamps(rawTimestamps)
             self.currentSamplingRate = samplingRate
             expectedSamples = self.currentSamplingRate*totalCalibrationDuration
             if len(rawData[0]) >= 0.9*expectedSamples and len(rawData[0]) <= 1.1*expectedSamples:
                 #expected samples is within 10% deviation; given samplingRate
-                self.calibrationData = self.preprocessData(rawTimestamps, rawData, samplingRate, synchronizedLabels)
+                classLabels, groupIndices = self.assignCalibrationLabels(rawTimestamps, labelSegments)
+                self.setCalibrationData(self.preprocessData(rawTimestamps, rawData, samplingRate, classLabels, groupIndices))
+                self.calibrationChannels = activeChannels
             else:
                 raise InsufficientDataRecordedError()
         else:
             raise DataNotSynchronizedError()
 
+    @staticmethod
+    def assignCalibrationLabels(rawTimestamps, labelSegments):
+        """
+        Assigns calibration labels to samples: a label change applies to all samples with a timestamp after the timestamp of the change, until the next change.
+
+        Parameters:
+        rawTimestamps: array-like of increasing timestamps of the recorded EMG data
+        labelSegments: list of calibration label changes (timestamp, (label, group)) in chronological order
+
+        returns:
+        classLabels, groupIndices: numpy arrays containing label and group per sample (None for samples before the first change)
+        """
+        segmentTimestamps = np.array([segment[0] for segment in labelSegments], dtype=np.float64)
+        #index -1 (samples before the first change) refers to the trailing None
+        classLabels = np.array([segment[1][0] for segment in labelSegments] + [None], dtype=object)
+        groupIndices = np.array([segment[1][1] for segment in labelSegments] + [None], dtype=object)
+        segmentIndices = np.searchsorted(segmentTimestamps, np.asarray(rawTimestamps, dtype=np.float64), side='right') - 1
+        return classLabels[segmentIndices], groupIndices[segmentIndices]
+
+
+    def extractFeatures(self, windowSize, calibrationData=None, samplingRate=None):
+        """
+        Generates the selected features (cf. features and FeatureBank) for every valid window of the calibration data (or the given preprocessed data recorded at samplingRate, cf. preprocessData), per class label and group.
+        All groups are written into one preallocated feature matrix, hence time and memory are linear in the length of the calibration data.
+
+        returns:
+        X: 2D numpy array (windows x features); same order as InferencePipeline (cf. FeatureBank.computeFeatures)
+        y: numpy array containing the class label per window
+        numChannels: number of EMG channels
+        """
+        if calibrationData is None:
+            calibrationData = self.calibrationData
+        if samplingRate is None:
+            samplingRate = self.currentSamplingRate
+        channels = [column for column in calibrationData.columns if column.startswith("EMG")]
+        numChannels = len(channels)
+        #order samples by class label and group (as groupby), so that each group is a contiguous block; samples without label/group are skipped
+        groupIds = calibrationData.groupby([CLASS_LABEL, GROUP_INDEX]).ngroup().to_numpy()
+        valid = np.flatnonzero(groupIds >= 0)
+        order = valid[np.argsort(groupIds[valid], kind='stable')]
+        groupIds = groupIds[order]
+        data = calibrationData[channels].to_numpy(dtype=np.float64)[order]
+        groupStarts = np.flatnonzero(np.diff(groupIds, prepend=-1))
+        groupLengths = np.diff(groupStarts, append=len(groupIds))
+
+        featureBank = FeatureBank(self.features, windowSize, samplingRate)
+        numberOfWindows = np.maximum(groupLengths - windowSize + 1, 0)
+        windowOffsets = np.concatenate([[0], np.cumsum(numberOfWindows)])
+        X = np.empty((windowOffsets[-1], featureBank.getNumberOfFeatures(numChannels)))
+        for groupStart, groupLength, windowOffset, windows in zip(groupStarts, groupLengths, windowOffsets, numberOfWindows):
+            if windows > 0:
+                featureBank.computeFeatures(data[groupStart:groupStart + groupLength], out=X[windowOffset:windowOffset + windows])
+        y = np.repeat(calibrationData[CLASS_LABEL].to_numpy()[order][groupStarts], numberOfWindows)
+        return X, y, numChannels
+
+    def getFeatures(self, windowSize):
+        """
+        Returns the features of the calibration data (cf. extractFeatures). Features are only extracted if the same calibration data has not been used with the same feature configuration before (cf. FeatureStore).
+
+        returns:
+        X: 2D numpy array (windows x features)
+        y: numpy array containing the class label per window
+        numChannels: number of EMG channels
+        """
+        key = FeatureStore.createKey(self.calibrationData, windowSize=windowSize, featureSet=FEATURE_SET, features=self.features, samplingRate=self.currentSamplingRate)
+        features = self.featureStore.get(key)
+        if features is None:
+            X, y, numChannels = self.extractFeatures(windowSize)
+            features = self.featureStore.put(key, (X, y, np.array(numChannels)))
+        return features[0], features[1], int(features[2])
+
+    def getTrainingOptions(self, **overrides):
+        """
+        Returns the constructor arguments that determine how a model is trained (e.g. for training in a different process, cf. TrainingProcess), updated with the given overrides.
+        """
+        options = {'windowSize': self.windowSize, 'incrementalPrediction': self.incrementalPrediction, 'hopSize': self.hopSize, 'voteLength': self.voteLength, 'hyperparameterSearch': self.hyperparameterSearch, 'nJobs': self.nJobs, 'backend': self.backend, 'features': self.features, 'samplingRate': self.currentSamplingRate, 'featureCacheDirectory': self.featureStore.directory}
+        options.update(overrides)
+        return options
+
+    @staticmethod
+    def createClassifier(backend, C=DEFAULT_PARAMETERS['C'], gamma=DEFAULT_PARAMETERS['gamma'], alpha=DEFAULT_PARAMETERS['alpha']):
+        """
+        Creates an unfitted classifier of the given backend (cf. CLASSIFIER_BACKENDS). Hyperparameters not supported by the backend (cf. BACKEND_PARAMETERS) are ignored.
+        Linear backends and the Nystroem approximation of the RBF kernel have a prediction cost independent of the amount of calibration data, in contrast to the number of support vectors of "svm".
+        "online_linear_svm" is trained by stochastic gradient descent and can be updated with additional data later on (cf. adaptClassifierModel).
+        """
+        if backend == 'svm':
+            return svm.SVC(C=C, gamma=gamma)
+        if backend == 'lda':
+            return LinearDiscriminantAnalysis()
+        if backend == 'linear_svm':
+            return svm.LinearSVC(C=C)
+        if backend == 'logistic_regression':
+            return LogisticRegression(C=C, max_iter=1000)
+        if backend == 'nystroem_linear_svm':
+            #gamma=None corresponds to 'scale' for standardized features
+            return make_pipeline(Nystroem(gamma=None if gamma == 'scale' else gamma, n_components=KERNEL_APPROXIMATION_COMPONENTS, random_state=0), svm.LinearSVC(C=C))
+        if backend == 'random_features_linear_svm':
+            return make_pipeline(RBFSampler(gamma=gamma, n_components=KERNEL_APPROXIMATION_COMPONENTS, random_state=0), svm.LinearSVC(C=C))
+        if backend == 'online_linear_svm':
+            return SGDClassifier(loss='hinge', alpha=alpha, random_state=0)
+        raise ValueError("Unknown classifier backend: " + str(backend))
+
+    def measureInferenceLatency(self, inferencePipeline):
+        """
+        Measures the time a live prediction with the given pipeline takes, including filtering, feature extraction, scaling and classification: InferencePipeline.predict on random windows of the calibration data of live length (windowSize + voteLength - 1 samples, cf. LiveClassifier.configureWindows), or PredictionStream.update on consecutive hops of hopSize samples in incremental mode.
 
-    def trainClassifierModel(self):
+        returns:
+        dict containing the 50th, 95th and 99th percentile of the latency in milliseconds ("latency_p50_ms", "latency_p95_ms", "latency_p99_ms")
+        """
+        channels = [column for column in self.calibrationData.columns if column.startswith("EMG")]
+        data = self.calibrationData[channels].to_numpy(dtype=np.float64).T
+        windowSize = inferencePipeline.windowSize
+        latencies = np.empty(LATENCY_REPETITIONS)
+        if self.incrementalPrediction:
+            hopSize = self.getHopSize(windowSize)
+            predictionStream = self.createPredictionStream(len(channels), inferencePipeline)
+            #fill the first window, so that every measured hop is classified
+            predictionStream.update(data[:, :windowSize])
+            hops = max(1, (data.shape[1] - windowSize) // hopSize)
+            for i in range(LATENCY_REPETITIONS):
+                start = windowSize + (i % hops) * hopSize
+                hop = data[:, start:start + hopSize]
+                startTime = time.perf_counter()
+                predictionStream.update(hop)
+                latencies[i] = (time.perf_counter() - startTime) * 1000.0
+        else:
+            dataLength = min(data.shape[1], windowSize + self.getVoteLength(windowSize) - 1)
+            starts = np.random.default_rng(0).integers(0, data.shape[1] - dataLength + 1, LATENCY_REPETITIONS)
+            for i, start in enumerate(starts):
+                window = data[:, start:start + dataLength]
+                startTime = time.perf_counter()
+                inferencePipeline.predict(window)
+                latencies[i] = (time.perf_counter() - startTime) * 1000.0
+        return {'latency_p' + str(percentile) + '_ms': np.percentile(latencies, percentile) for percentile in (50, 95, 99)}
+
+    def trainClassifierModel(self, progressCallback=None):
         """
-        Generates RMS (root mean square) features and their channel-wise pair-wise ratios and trains an SVM model.
+        Generates features (RMS (root mean square) and their channel-wise pair-wise ratios by default, cf. features) and trains a classification model (an SVM by default, cf. backend).
         Note that onRawCalibrationDataAvailable populates the internal data structure used by this method.
 
-        RMS features are calculated using a convolution approach and a window size specified by this class (defaults to 20).
+        Features are calculated using cumulative sums (cf. FeatureBank) and a window size specified by this class (defaults to 20).
+
+        Implements a support vector classification using standard parameters from sklearn; other classifiers can be selected via backend (cf. createClassifier). Includes a standard scaler (unit variance, zero mean).
+        Evaluates the trained model after training (10-fold CV) and measures its inference latency per live window (cf. measureInferenceLatency).
+        Backends approximating the RBF kernel (cf. KERNEL_APPROXIMATIONS) are additionally compared to the exact SVM with the same parameters on the same folds.
+
+        If hyperparameterSearch is set, all combinations of windowSize and the hyperparameters of the backend (C, gamma) in SEARCH_GRID are evaluated instead and the model with the highest CV accuracy is kept; windowSize is updated accordingly.
+        Features are extracted once per window size and shared by all candidates (and cached for later training runs, cf. getFeatures); folds of all candidates are evaluated in parallel (cf. nJobs).
 
-        Implements a support vector classification using standard parameters from sklearn. Includes a standard scaler (unit variance, zero mean).
-        Evaluates the trained model after training (10-fold CV).
+        Parameters:
+        progressCallback: optional function(description, progress) that is called after each stage and cross-validation fold; progress is between 0 and 1
 
         returns:
-        clf_stats: python dict reporting on the trained model, including "accuracy", "classes" and "num_channels".
-        Additionally provides sklearn prediction results, such as "test_score" per fold.
-
-        """
-        self.mlData = pd.DataFrame()
-        grouped = self.calibrationData.groupby([CLASS_LABEL, GROUP_INDEX])
-        for name, group in grouped:
-            featuresForGroup = pd.DataFrame()
-            numChannels = 0
-            for column in list(group):
-                if column.startswith("EMG"):
-                    featuresForGroup['rms' + str(column)] = rms_convolution(group[column], self.windowSize)
-                    numChannels+=1
-            addPairwiseRatios(featuresForGroup)
-            featuresForGroup[CLASS_LABEL] = name[0] #add class label
-            self.mlData = self.mlData.append(featuresForGroup, ignore_index=True)
-
-        self.clf = svm.SVC(gamma='scale')
-        X = self.mlData.loc[:, self.mlData.columns != CLASS_LABEL]
-        self.scaler = preprocessing.StandardScaler(copy=False)
-        X = self.scaler.fit_transform(X)
-        y = self.mlData[CLASS_LABEL]
-        self.clf.fit(X,y)
-        self.clf_stats = cross_validate(self.clf, X, y, cv=10, scoring=['accuracy', 'balanced_accuracy', 'f1_weighted', 'precision_weighted', 'recall_weighted'])
-        self.clf_stats['accuracy'] = self.clf_stats['test_accuracy'].mean()*100.0
-        self.clf_stats['balanced_accuracy'] = self.clf_stats['test_balanced_accuracy'].mean()*100.0
-        self.clf_stats['f1_weighted'] = self.clf_stats['test_f1_weighted'].mean()*100.0
-        self.clf_stats['precision_weighted'] = self.clf_stats['test_precision_weighted'].mean()*100.0
-        self.clf_stats['recall_weighted'] = self.clf_stats['test_recall_weighted'].mean()*100.0
-
-        self.clf_stats['classes'] = y.unique()
-        self.clf_stats['num_channels'] = numChannels
+        clf_stats: python dict reporting on the trained model, including "accuracy", "classes", "num_channels", "window_size", "features", "backend", "parameters" (hyperparameters of the backend) and latency percentiles (cf. measureInferenceLatency).
+        Additionally provides sklearn prediction results, such as "test_score" per fold, and "search_results" (parameters and accuracy per candidate) if hyperparameterSearch is set.
+        With hyperparameterSearch, the reported metrics are the cross-validation scores of the selected candidate, which are biased upwards by the selection.
+        "feature_cache_error" describes why features could not be cached (cf. FeatureStore.writeError), if so.
+        For kernel approximations, "exact_svm_accuracy", "accuracy_delta" (accuracy of the approximation minus accuracy of the exact SVM, in percentage points) and "exact_svm_latency_p95_ms" are included.
+
+        """
+        if progressCallback is None:
+            progressCallback = lambda description, progress: None
 
+        parameterNames = BACKEND_PARAMETERS[self.backend]
+        if self.hyperparameterSearch:
+            windowSizes = SEARCH_GRID['windowSize']
+            parameters = [dict(zip(parameterNames, values)) for values in itertools.product(*[SEARCH_GRID[name] for name in parameterNames])]
+        else:
+            windowSizes = [self.windowSize]
+            parameters = [{name: DEFAULT_PARAMETERS[name] for name in parameterNames}]
+
+        progressCallback("Extracting features", 0.0)
+        self.featureStore.writeError = None
+        features = {}
+        for windowSize in windowSizes:
+            X, y, numChannels = self.getFeatures(windowSize)
+            #scaling creates a copy, so that cached features stay unchanged
+            scaler = preprocessing.StandardScaler()
+            features[windowSize] = (scaler, scaler.fit_transform(X), y)
+
+        compareWithExactSvm = self.backend in KERNEL_APPROXIMATIONS
+        searchProgress = 0.7 if compareWithExactSvm else 0.8
+        candidates = [(windowSize, candidateParameters) for windowSize in windowSizes for candidateParameters in parameters]
+        results = self.crossValidate([(self.createClassifier(self.backend, **candidateParameters), features[windowSize][1], features[windowSize][2]) for windowSize, candidateParameters in candidates], 10,
+                                     lambda fold, folds: progressCallback("Cross-validation fold " + str(fold) + "/" + str(folds), 0.1 + searchProgress * fold / folds))
+        best = max(range(len(candidates)), key=lambda i: results[i]['test_accuracy'].mean())
+        windowSize, bestParameters = candidates[best]
+        if compareWithExactSvm:
+            exactSvm = self.createClassifier('svm', **bestParameters)
+            exactSvmResults = self.crossValidate([(exactSvm, features[windowSize][1], features[windowSize][2])], 10,
+                                                 lambda fold, folds: progressCallback("Cross-validation of exact SVM fold " + str(fold) + "/" + str(folds), 0.8 + 0.1 * fold / folds))[0]
+
+        progressCallback("Fitting classifier", 0.9)
+        scaler, X, y = features[windowSize]
+        clf = self.createClassifier(self.backend, **bestParameters)
+        clf.fit(X,y)
+        progressCallback("Measuring inference latency", 0.95)
+        clf_stats = results[best]
+        clf_stats['accuracy'] = clf_stats['test_accuracy'].mean()*100.0
+        clf_stats['balanced_accuracy'] = clf_stats['test_balanced_accuracy'].mean()*100.0
+        clf_stats['f1_weighted'] = clf_stats['test_f1_weighted'].mean()*100.0
+        clf_stats['precision_weighted'] = clf_stats['test_precision_weighted'].mean()*100.0
+        clf_stats['recall_weighted'] = clf_stats['test_recall_weighted'].mean()*100.0
+
+        clf_stats['classes'] = pd.unique(y)
+        clf_stats['num_channels'] = numChannels
+        clf_stats['window_size'] = windowSize
+        clf_stats['features'] = self.features
+        clf_stats['backend'] = self.backend
+        clf_stats['parameters'] = bestParameters
+        if self.featureStore.writeError is not None:
+            clf_stats['feature_cache_error'] = str(self.featureStore.writeError)
+        if compareWithExactSvm:
+            clf_stats['exact_svm_accuracy'] = exactSvmResults['test_accuracy'].mean()*100.0
+            clf_stats['accuracy_delta'] = clf_stats['accuracy'] - clf_stats['exact_svm_accuracy']
+            exactSvm.fit(X, y)
+            clf_stats['exact_svm_latency_p95_ms'] = self.measureInferenceLatency(self.createInferencePipeline(scaler, exactSvm, windowSize, self.features, self.currentSamplingRate))['latency_p95_ms']
+        if self.hyperparameterSearch:
+            clf_stats['search_results'] = [{'window_size': candidate[0], 'parameters': candidate[1], 'accuracy': result['test_accuracy'].mean()*100.0} for candidate, result in zip(candidates, results)]
+        inferencePipeline = self.createInferencePipeline(scaler, clf, windowSize, self.features, self.currentSamplingRate)
+        clf_stats.update(self.measureInferenceLatency(inferencePipeline))
+
+        self.setClassifierModel(clf, scaler, clf_stats, self.currentSamplingRate, self.calibrationChannels, inferencePipeline)
         return self.clf_stats
 
+    def crossValidate(self, candidates, cv, foldCallback):
+        """
+        Stratified k-fold cross-validation (equivalent to sklearn's cross_validate) of one or more candidate models.
+        The folds of all candidates are evaluated in parallel (cf. nJobs); large feature matrices are memory-mapped by joblib, so that candidates sharing the same features do not copy them per fold.
 
+        Parameters:
+        candidates: list of (clf, X, y) tuples; clf is an unfitted or fitted sklearn classifier, which is cloned for every fold
+        cv: number of folds
+        foldCallback: function(fold, folds) called after each completed fold; folds is the total number of folds of all candidates
 
-    def preprocessData(self, rawTimestamps, rawData, samplingRate, synchronizedLabels):
+        returns:
+        list containing a dict per candidate with "fit_time", "score_time" and "test_<metric>" arrays with one entry per fold
+        """
+        tasks = []
+        for index, (clf, X, y) in enumerate(candidates):
+            splitter = check_cv(cv, y, classifier=True)
+            tasks += [(index, clf, X, y, train, test) for train, test in splitter.split(X, y)]
+
+        results = []
+        for index in range(len(candidates)):
+            results.append({'fit_time': [], 'score_time': []})
+            results[index].update({'test_' + metric: [] for metric in SCORING})
+        #generator output keeps the order of the tasks but is available as soon as each fold is completed
+        parallel = Parallel(n_jobs=self.nJobs, return_as='generator')
+        folds = parallel(delayed(fitAndScoreFold)(clf, X, y, train, test) for index, clf, X, y, train, test in tasks)
+        for fold, (task, (fitTime, scoreTime, scores)) in enumerate(zip(tasks, folds)):
+            results[task[0]]['fit_time'].append(fitTime)
+            results[task[0]]['score_time'].append(scoreTime)
+            for metric, score in scores.items():
+                results[task[0]]['test_' + metric].append(score)
+            foldCallback(fold + 1, len(tasks))
+        return [{key: np.array(value) for key, value in result.items()} for result in results]
+
+    def setClassifierModel(self, clf, scaler, clf_stats, samplingRate, channels, inferencePipeline=None):
+        """
+        Replaces the internally trained model, e.g. with a model trained in a different process (cf. TrainingProcess). Adopts the window size (cf. hyperparameterSearch) and features the model was trained with.
+        samplingRate and channels are those of the calibration data the model was trained on (cf. modelSamplingRate, modelChannels); the current calibration data is not affected.
+        May be called from a background thread: the inference pipeline (unless given) is compiled first, then the model is replaced at once (cf. modelLock), so that getInferencePipeline never combines parts of the old and the new model.
+        A running live classification keeps its pipeline until the new model is handed over (cf. StreamHandler.swapClassifierModel).
+        """
+        windowSize = clf_stats.get('window_size', self.windowSize)
+        features = tuple(clf_stats.get('features', self.features))
+        if inferencePipeline is None and samplingRate is not None:
+            inferencePipeline = self.createInferencePipeline(scaler, clf, windowSize, features, samplingRate)
+        with self.modelLock:
+            self.windowSize, self.features = windowSize, features
+            self.clf, self.scaler, self.clf_stats = clf, scaler, clf_stats
+            self.modelSamplingRate, self.modelChannels = samplingRate, channels
+            self.inferencePipeline = inferencePipeline
+
+    def isClassifierAdaptable(self):
+        """
+        Returns whether the current model can be updated incrementally (cf. adaptClassifierModel), i.e. whether its classifier supports partial_fit.
+        """
+        return self.clf is not None and hasattr(self.clf, 'partial_fit')
+
+    def adaptClassifierModel(self, rawTimestamps, rawData, labelSegments):
+        """
+        Updates the current model with a short additional calibration recording (e.g. to compensate electrode drift during a session) instead of training it from scratch.
+        The running statistics of the scaler and the classifier are updated via partial_fit on copies, which then replace the model and its inference pipeline at once, so that a running live classification continues with the adapted model.
+        The recorded data is appended to the calibration data (groups are prefixed with "adaptation_<n>/") if that has the sampling rate and channels of the model, so that the next full training includes it. Accuracies in clf_stats refer to the original training.
+
+        Parameters:
+        rawTimestamps, rawData, labelSegments: recording of the additional calibration, cf. onRawCalibrationDataAvailable
+
+        returns:
+        clf_stats: clf_stats of the adapted model, including the number of "adaptations" and "adaptation_windows" used so far
+        """
+        if not self.isClassifierAdaptable():
+            raise ModelNotAdaptableError()
+        if len(rawData[0]) != len(rawTimestamps):
+            raise DataNotSynchronizedError()
+        classLabels, groupIndices = self.assignCalibrationLabels(rawTimestamps, labelSegments)
+        adaptations = self.clf_stats.get('adaptations', 0) + 1
+        groupIndices = np.array([None if group is None else "adaptation_" + str(adaptations) + "/" + str(group) for group in groupIndices], dtype=object)
+        adaptationData = self.preprocessData(rawTimestamps, rawData, self.modelSamplingRate, classLabels, groupIndices)
+        X, y, numChannels = self.extractFeatures(self.windowSize, adaptationData, self.modelSamplingRate)
+        #partial_fit does not accept classes the model was not trained on
+        known = np.isin(y, self.clf.classes_)
+        X, y = X[known], y[known]
+        if numChannels != self.clf_stats['num_channels'] or len(y) == 0:
+            raise InsufficientDataRecordedError()
+
+        scaler = copy.deepcopy(self.scaler)
+        scaler.partial_fit(X)
+        X = scaler.transform(X)
+        clf = copy.deepcopy(self.clf)
+        random = np.random.default_rng(adaptations)
+        for epoch in range(ADAPTATION_EPOCHS):
+            order = random.permutation(len(y))
+            clf.partial_fit(X[order], y[order])
+        clf_stats = dict(self.clf_stats)
+        clf_stats['adaptations'] = adaptations
+        clf_stats['adaptation_windows'] = clf_stats.get('adaptation_windows', 0) + len(y)
+
+        inferencePipeline = self.createInferencePipeline(scaler, clf, self.windowSize, self.features, self.modelSamplingRate)
+        with self.modelLock:
+            self.clf, self.scaler, self.clf_stats = clf, scaler, clf_stats
+            self.inferencePipeline = inferencePipeline
+        #the recording is only added to calibration data of the same sampling rate and channels
+        if self.calibrationData.empty:
+            self.currentSamplingRate, self.calibrationChannels = self.modelSamplingRate, self.modelChannels
+        if self.currentSamplingRate == self.modelSamplingRate and np.array_equal(self.calibrationChannels, self.modelChannels):
+            self.appendCalibrationData(adaptationData)
+        return clf_stats
+
+    def preprocessData(self, rawTimestamps, rawData, samplingRate, classLabels, groupIndices):
         """
         Applies filter steps on raw collected EMG data samples, syncs class labels and groups.
 
@@ -167,24 +682,21 @@ class ClassificationManager:
         rawTimestamps: list of timestamps of the recorded EMG data (same length of column axis as rawData); not used
         rawData: 2D-array containing recorded EMG data samples (rows) per channel (columns).
         samplingRate: estimated sampling rate based on rawTimestamps
-        synchronizedLabels: list of calibration labels; each entry corresponds to the respective entry in rawData (same length of column axis as rawData)
+        classLabels, groupIndices: calibration label and group per sample (cf. assignCalibrationLabels)
 
         Returns:
         df: pandas DataFrame containing filterd data per channel (columns "EMG_X") and associated "class_label" and "group_index"
 
         """
-        df = pd.DataFrame(rawData).transpose()
-        df.columns = ['EMG_' + str(i) for i in range(len(df.columns))]
-
         if samplingRate >= 103.0:
             #normal filtering
-            apply_bandpass_filter(df, 2.0, samplingRate/2.0-1.0, samplingRate)
-            apply_bandstop_filter(df, 49.0, 51.0, samplingRate)
+            df = pd.DataFrame(self.getPreprocessingFilterBank(samplingRate).filtfilt(np.asarray(rawData, dtype=np.float64), axis=1).T)
         else:
             raise SamplingRateTooLowError()
+        df.columns = ['EMG_' + str(i) for i in range(len(df.columns))]
 
-        df[CLASS_LABEL] = [x[0] for x in synchronizedLabels]
-        df[GROUP_INDEX] = [x[1] for x in synchronizedLabels]
+        df[CLASS_LABEL] = classLabels
+        df[GROUP_INDEX] = groupIndices
 
 
         #drop roughly the first two second to account for filter delays
@@ -194,6 +706,21 @@ class ClassificationManager:
         return df
 
 
+def fitAndScoreFold(clf, X, y, train, test):
+    """
+    Fits a clone of the given classifier on the training samples and scores it on the test samples of one cross-validation fold (cf. ClassificationManager.crossValidate).
+
+    returns:
+    fitTime, scoreTime, dict containing the score per metric in SCORING
+    """
+    startTime = time.time()
+    estimator = clone(clf).fit(X[train], y[train])
+    fitTime = time.time() - startTime
+    startTime = time.time()
+    scores = {metric: get_scorer(metric)(estimator, X[test], y[test]) for metric in SCORING}
+    return fitTime, time.time() - startTime, scores
+
+
 class SamplingRateTooLowError(Exception):
     pass
 
@@ -204,3 +731,11 @@ class DataNotSynchronizedError(Exception):
 
 class InsufficientDataRecordedError(Exception):
     pass
+
+
+class InvalidModelFileError(Exception):
+    pass
+
+
+class ModelNotAdaptableError(Exception):
+    pass
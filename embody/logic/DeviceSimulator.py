@@ -0,0 +1,71 @@
+import argparse
+import socket
+import time
+import numpy as np
+from threading import Thread
+from logic.PacketDecoder import encodeBinaryFrame
+
+
+class DeviceSimulator(Thread):
+    '''
+    Stand-in for the EMBody hardware prototype for testing purposes. Sends synthetic EMG data via UDP, either as text packets (one sample per datagram, as sent by the firmware) or as binary frames (samplesPerFrame samples per datagram, cf. PacketDecoder).
+    '''
+    def __init__(self, udpIP, udpPort, samplingRate=250, numberOfChannels=6, binary=False, samplesPerFrame=25):
+        Thread.__init__(self)
+        self.daemon = True
+        self.running = False
+        self.address = (udpIP, udpPort)
+        self.samplingRate = samplingRate
+        self.numberOfChannels = numberOfChannels
+        self.binary = binary
+        self.samplesPerFrame = samplesPerFrame if binary else 1
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, True)
+
+    def generateSamples(self, sampleIndex):
+        '''
+        generates noise around the ADC midpoint; channels are periodically activated one after another to mimic muscle activity
+        :return: 2D numpy array (samples x channels)
+        '''
+        t = (sampleIndex + np.arange(self.samplesPerFrame)) / self.samplingRate
+        activeChannel = (t // 2).astype(int) % (self.numberOfChannels + 1)
+        amplitude = np.where(activeChannel[:, None] == np.arange(self.numberOfChannels), 800.0, 50.0)
+        samples = 2048.0 + amplitude * np.random.standard_normal((self.samplesPerFrame, self.numberOfChannels))
+        return np.clip(samples, 0, 4095).astype(int)
+
+    def run(self):
+        self.running = True
+        startTime = time.time()
+        sampleIndex = 0
+        sequenceNumber = 0
+        while self.running:
+            samples = self.generateSamples(sampleIndex)
+            timestamp = int(sampleIndex * 1e3 / self.samplingRate)
+            if self.binary:
+                self.sock.sendto(encodeBinaryFrame(sequenceNumber, timestamp, 1e6 / self.samplingRate, samples), self.address)
+            else:
+                self.sock.sendto(bytes(str(timestamp) + ";" + ";".join(str(value) for value in samples[0]), "utf-8"), self.address)
+            sequenceNumber += 1
+            sampleIndex += self.samplesPerFrame
+            delay = startTime + sampleIndex / self.samplingRate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        self.sock.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sends synthetic EMG data to EMBody.")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3333)
+    parser.add_argument("--rate", type=float, default=250)
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--binary", action="store_true", help="send binary multi-sample frames instead of text packets")
+    parser.add_argument("--samples-per-frame", type=int, default=25)
+    args = parser.parse_args()
+    simulator = DeviceSimulator(args.ip, args.port, args.rate, args.channels, args.binary, args.samples_per_frame)
+    simulator.start()
+    try:
+        while simulator.is_alive():
+            simulator.join(1)
+    except KeyboardInterrupt:
+        simulator.running = False
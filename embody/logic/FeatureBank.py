@@ -0,0 +1,185 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+#features per channel (in the order of the feature matrix) and the pair-wise ratios of the RMS of all channels
+FEATURES = ('rms', 'mav', 'wl', 'zc', 'ssc', 'mnf', 'mdf', 'rms_ratios')
+FEATURE_NAMES = {'rms': "Root Mean Square", 'mav': "Mean Absolute Value", 'wl': "Waveform Length", 'zc': "Zero Crossings", 'ssc': "Slope Sign Changes", 'mnf': "Mean Frequency", 'mdf': "Median Frequency", 'rms_ratios': "Pair-wise RMS Ratios"}
+DEFAULT_FEATURES = ('rms', 'rms_ratios')
+#features that only depend on the RMS of a window, cf. FeatureBank.computeFeaturesFromRMS
+RMS_FEATURES = ('rms', 'rms_ratios')
+#features calculated from the power spectrum of a window, cf. FeatureBank.computeSpectralFeatures
+SPECTRAL_FEATURES = ('mnf', 'mdf')
+#number of windows whose spectra are calculated at once; bounds the memory of the segment spectra
+SPECTRUM_CHUNK_SIZE = 4096
+
+
+class FeatureBank:
+    '''
+    EMG features of sliding windows: root mean square (rms), mean absolute value (mav), waveform length (wl), zero crossings (zc), slope sign changes (ssc), mean and median frequency (mnf, mdf) and the pair-wise RMS ratios between channels (rms_ratios).
+    All time-domain features are sums over the window of a per-sample term, hence they are calculated for all channels and windows at once from cumulative sums, i.e. linear in the number of samples independent of the window size.
+    The frequency features are based on the Welch power spectrum of each window, calculated with batched FFTs over strided views of the data (cf. computeSpectralFeatures).
+    The same FeatureBank is used for training (cf. ClassificationManager.extractFeatures) and live prediction (cf. InferencePipeline).
+    '''
+    def __init__(self, features=DEFAULT_FEATURES, windowSize=20, samplingRate=None, segmentLength=None, zeroCrossingThreshold=0.0, slopeSignChangeThreshold=0.0):
+        '''
+        :param features: selection of FEATURES; the feature matrix always follows the order of FEATURES
+        :param windowSize: number of samples per window
+        :param samplingRate: sampling rate of the data; required for the frequency features (cf. SPECTRAL_FEATURES)
+        :param segmentLength: length of the Welch segments (overlapping by half) the power spectrum of a window is averaged from; defaults to half the window size, i.e. three segments per window
+        :param zeroCrossingThreshold: minimum absolute difference between two samples for a sign change to count as zero crossing
+        :param slopeSignChangeThreshold: minimum product of the differences to both neighbours for a slope sign change
+        '''
+        unknown = set(features) - set(FEATURES)
+        if unknown or not features:
+            raise ValueError("Unknown or no features: " + str(sorted(unknown)))
+        self.features = tuple(feature for feature in FEATURES if feature in features)
+        if samplingRate is None and set(self.features) & set(SPECTRAL_FEATURES):
+            raise ValueError("The frequency features require the sampling rate")
+        self.windowSize = windowSize
+        self.samplingRate = samplingRate
+        self.segmentLength = max(2, windowSize // 2) if segmentLength is None else min(segmentLength, windowSize)
+        self.zeroCrossingThreshold = zeroCrossingThreshold
+        self.slopeSignChangeThreshold = slopeSignChangeThreshold
+        self.pairs = {}
+
+    def getNumberOfFeatures(self, numberOfChannels):
+        perChannel = sum(1 for feature in self.features if feature != 'rms_ratios')
+        ratios = numberOfChannels * (numberOfChannels - 1) // 2 if 'rms_ratios' in self.features else 0
+        return perChannel * numberOfChannels + ratios
+
+    def getNumberOfWindows(self, numberOfSamples):
+        return max(0, numberOfSamples - self.windowSize + 1)
+
+    def computeFeatures(self, data, out=None):
+        '''
+        calculates the features of every window that lies completely within data
+        :param data: 2D numpy array (samples x channels), e.g. a transposed view of (channels x samples)
+        :param out: optional preallocated array (windows x features) the features are written to
+        :return: 2D numpy array (windows x features); blocks of one column per channel for each feature, ratios of channel pairs (i, j), i < j, in the order of numpy.triu_indices
+        '''
+        data = np.asarray(data, dtype=np.float64)
+        numberOfSamples, numberOfChannels = data.shape
+        numberOfWindows = self.getNumberOfWindows(numberOfSamples)
+        if out is None:
+            out = np.empty((numberOfWindows, self.getNumberOfFeatures(numberOfChannels)))
+        if numberOfWindows == 0:
+            return out
+
+        column = 0
+        rms = None
+        if 'rms' in self.features or 'rms_ratios' in self.features:
+            rms = np.sqrt(np.maximum(self.windowSums(np.square(data), self.windowSize), 0.0) / self.windowSize)
+        if 'rms' in self.features:
+            out[:, column:column + numberOfChannels] = rms
+            column += numberOfChannels
+        if 'mav' in self.features:
+            out[:, column:column + numberOfChannels] = self.windowSums(np.abs(data), self.windowSize) / self.windowSize
+            column += numberOfChannels
+        if 'wl' in self.features or 'zc' in self.features or 'ssc' in self.features:
+            #differences between consecutive samples; a window of windowSize samples contains windowSize-1 of them
+            differences = np.diff(data, axis=0)
+        if 'wl' in self.features:
+            out[:, column:column + numberOfChannels] = self.windowSums(np.abs(differences), self.windowSize - 1)
+            column += numberOfChannels
+        if 'zc' in self.features:
+            crossings = (data[1:] * data[:-1] < 0.0) & (np.abs(differences) >= self.zeroCrossingThreshold)
+            out[:, column:column + numberOfChannels] = self.windowSums(crossings, self.windowSize - 1)
+            column += numberOfChannels
+        if 'ssc' in self.features:
+            #slope sign change at every sample but the first and last of a window
+            changes = -differences[1:] * differences[:-1] > self.slopeSignChangeThreshold
+            out[:, column:column + numberOfChannels] = self.windowSums(changes, self.windowSize - 2)
+            column += numberOfChannels
+        if 'mnf' in self.features or 'mdf' in self.features:
+            meanFrequency, medianFrequency = self.computeSpectralFeatures(data)
+        if 'mnf' in self.features:
+            out[:, column:column + numberOfChannels] = meanFrequency
+            column += numberOfChannels
+        if 'mdf' in self.features:
+            out[:, column:column + numberOfChannels] = medianFrequency
+            column += numberOfChannels
+        if 'rms_ratios' in self.features:
+            self.computeRatios(rms, out[:, column:])
+        return out
+
+    def hasOnlyRMSFeatures(self):
+        '''
+        :return: whether all features can be calculated from the RMS of the windows (cf. computeFeaturesFromRMS)
+        '''
+        return set(self.features) <= set(RMS_FEATURES)
+
+    def computeFeaturesFromRMS(self, rms, out=None):
+        '''
+        calculates the features from the RMS of every window (e.g. of an IncrementalRMS); only if hasOnlyRMSFeatures
+        :param rms: 2D numpy array (windows x channels)
+        :param out: optional preallocated array (windows x features) the features are written to
+        :return: 2D numpy array (windows x features), cf. computeFeatures
+        '''
+        numberOfWindows, numberOfChannels = rms.shape
+        if out is None:
+            out = np.empty((numberOfWindows, self.getNumberOfFeatures(numberOfChannels)))
+        column = 0
+        if 'rms' in self.features:
+            out[:, :numberOfChannels] = rms
+            column = numberOfChannels
+        if 'rms_ratios' in self.features:
+            self.computeRatios(rms, out[:, column:])
+        return out
+
+    def computeRatios(self, rms, out):
+        '''
+        pair-wise ratios of the RMS of all channels (i, j), i < j, in the order of numpy.triu_indices
+        '''
+        numberOfChannels = rms.shape[1]
+        if numberOfChannels not in self.pairs:
+            self.pairs[numberOfChannels] = np.triu_indices(numberOfChannels, 1)
+        numerators, denominators = self.pairs[numberOfChannels]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(rms[:, numerators], rms[:, denominators], out=out)
+
+    def computeSpectralFeatures(self, data):
+        '''
+        calculates the mean and median frequency of the one-sided power spectrum of every window (as scipy.signal.welch without detrending). The spectrum of a window is the sum of the Hann-windowed periodograms of its segments (cf. segmentLength), which are calculated once per segment and shared by all overlapping windows.
+        Windows are processed in chunks (cf. SPECTRUM_CHUNK_SIZE), each with a single FFT over a strided view of the data. Windows without power have a mean and median frequency of 0.
+        :param data: 2D numpy array (samples x channels)
+        :return: two 2D numpy arrays (windows x channels), mean and median frequency in Hz
+        '''
+        numberOfWindows = self.getNumberOfWindows(len(data))
+        #same overlap as scipy.signal.welch
+        step = self.segmentLength - self.segmentLength // 2
+        segmentsPerWindow = (self.windowSize - self.segmentLength) // step + 1
+        taper = np.hanning(self.segmentLength)
+        frequencies = np.fft.rfftfreq(self.segmentLength, 1.0 / self.samplingRate)
+        #one-sided spectrum: the power of negative frequencies is added to all bins but DC and (for even lengths) Nyquist
+        oneSided = np.full(len(frequencies), 2.0)
+        oneSided[0] = 1.0
+        if self.segmentLength % 2 == 0:
+            oneSided[-1] = 1.0
+        meanFrequency = np.empty((numberOfWindows, data.shape[1]))
+        medianFrequency = np.empty((numberOfWindows, data.shape[1]))
+        for start in range(0, numberOfWindows, SPECTRUM_CHUNK_SIZE):
+            windows = min(SPECTRUM_CHUNK_SIZE, numberOfWindows - start)
+            #segments starting at every sample of the chunk (segments x channels x segmentLength)
+            segments = sliding_window_view(data[start:start + windows + (segmentsPerWindow - 1) * step + self.segmentLength - 1], self.segmentLength, axis=0)
+            periodograms = np.abs(np.fft.rfft(segments * taper, axis=2)) ** 2 * oneSided
+            spectra = periodograms[:windows].copy()
+            for segment in range(1, segmentsPerWindow):
+                spectra += periodograms[segment * step:segment * step + windows]
+            totalPower = spectra.sum(axis=2)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                meanFrequency[start:start + windows] = np.where(totalPower > 0.0, spectra @ frequencies / totalPower, 0.0)
+            #first frequency at which the cumulative power reaches half of the total power
+            halfReached = np.cumsum(spectra, axis=2) >= 0.5 * totalPower[:, :, None]
+            medianFrequency[start:start + windows] = frequencies[np.argmax(halfReached, axis=2)]
+        return meanFrequency, medianFrequency
+
+    @staticmethod
+    def windowSums(values, length):
+        '''
+        :param values: 2D array (samples x channels)
+        :param length: number of consecutive samples per sum; 0 yields zeros
+        :return: 2D numpy array (samples - length + 1 x channels), sums of all windows of length consecutive samples
+        '''
+        cumulativeSum = np.zeros((values.shape[0] + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=cumulativeSum[1:])
+        return cumulativeSum[length:] - cumulativeSum[:len(cumulativeSum) - length]
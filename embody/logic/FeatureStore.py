@@ -0,0 +1,114 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+#suggested location of the cache (cf. Main.py); the cache is disabled unless a directory is given
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser("~"), ".embody", "features")
+
+
+class FeatureStore:
+    '''
+    Disk cache for feature matrices (cf. ClassificationManager.extractFeatures). Entries are keyed by a content hash of the preprocessed calibration data and the feature configuration (cf. createKey),
+    so that retraining with different classifier settings or after reloading a session does not repeat feature extraction. As training runs in a new process every time (cf. TrainingProcess), features are only cached on disk.
+    The least recently used entries are evicted once the cache exceeds its size limit. The cache is opt-in: without a directory, nothing is cached.
+    '''
+    def __init__(self, directory=None, maxDiskBytes=2 * 1024 ** 3):
+        '''
+        :param directory: directory of the cache (e.g. DEFAULT_DIRECTORY); None disables the cache
+        :param maxDiskBytes: size limit of the cache
+        '''
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+        #last error writing the cache (cf. put), e.g. a full disk; features are still returned, so training is not affected
+        self.writeError = None
+
+    @staticmethod
+    def createKey(calibrationData, **featureConfiguration):
+        '''
+        :param calibrationData: pandas DataFrame of preprocessed calibration data
+        :param featureConfiguration: parameters the features depend on, e.g. windowSize and feature set
+        :return: hex digest identifying the content of calibrationData and the feature configuration
+        '''
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(repr(sorted(featureConfiguration.items())).encode())
+        for column in calibrationData.columns:
+            digest.update(str(column).encode())
+            values = calibrationData[column]
+            if values.dtype.kind not in 'biufc':
+                #strings and other objects are hashed by value
+                values = pd.util.hash_pandas_object(values, index=False)
+            digest.update(np.ascontiguousarray(values.to_numpy()).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        '''
+        :return: cached tuple of arrays for the given key, or None
+        '''
+        path = self.getPath(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                arrays = tuple(entry['arr_' + str(i)] for i in range(len(entry.files)))
+            #mark as recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        #strings are stored as fixed-width unicode arrays
+        return tuple(array.astype(object) if array.dtype.kind == 'U' else array for array in arrays)
+
+    def put(self, key, arrays):
+        '''
+        adds the given tuple of arrays to the cache; object arrays must only contain strings. Errors are not raised but kept in writeError
+        :return: the given arrays
+        '''
+        arrays = tuple(np.asarray(array) for array in arrays)
+        path = self.getPath(key)
+        if path is not None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                temporaryPath = path + "." + str(os.getpid()) + ".tmp"
+                with open(temporaryPath, "wb") as file:
+                    np.savez(file, *[array.astype(str) if array.dtype == object else array for array in arrays])
+                os.replace(temporaryPath, path)
+                self.evictFromDisk()
+            except OSError as e:
+                self.writeError = e
+        return arrays
+
+    def evictFromDisk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                status = os.stat(os.path.join(self.directory, name))
+                entries.append((status.st_mtime, status.st_size, name))
+        entries.sort()
+        totalBytes = sum(entry[1] for entry in entries)
+        #keep at least the newest entry
+        for mtime, size, name in entries[:-1]:
+            if totalBytes <= self.maxDiskBytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            totalBytes -= size
+
+    def getPath(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key + ".npz")
+
+    def clear(self):
+        '''
+        removes all entries of the cache
+        '''
+        if self.directory is None or not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,68 @@
+import numpy as np
+import scipy.signal as signal
+from functools import lru_cache
+
+
+class FilterBank:
+    '''
+    Multi-channel Butterworth filter bank: a bandpass followed by a bandstop filter, each as cascade of second-order sections.
+    Designed once per configuration (cf. getFilterBank) and applied to all channels in one call along the time axis.
+    Forward-backward filtering applies both filters one after the other (as preprocessing always did), so that the padding of each filter stays short enough for live windows; causal filtering uses the merged cascade, which is equivalent.
+    '''
+    def __init__(self, samplingRate, bandpass, bandstop, order=3):
+        nyq_freq = samplingRate * 0.5
+        bandpassSos = signal.butter(order, [bandpass[0] / nyq_freq, bandpass[1] / nyq_freq], btype='bandpass', output='sos')
+        bandstopSos = signal.butter(order, [bandstop[0] / nyq_freq, bandstop[1] / nyq_freq], btype='bandstop', output='sos')
+        self.bandpassSos = bandpassSos
+        self.bandstopSos = bandstopSos
+        self.sos = np.vstack([bandpassSos, bandstopSos])
+        self.samplingRate = samplingRate
+        self.bandpass = bandpass
+        self.bandstop = bandstop
+        self.order = order
+
+    def filtfilt(self, data, axis=-1):
+        '''
+        applies the bandpass and then the bandstop filter forward and backward (zero phase). The padding of each filter (cf. scipy.signal.sosfiltfilt) is limited to the length of data, so that short windows can be filtered as well.
+        :param data: array-like, e.g. 2D (channels x samples)
+        :param axis: time axis of data
+        :return: numpy array of filtered data
+        '''
+        data = np.asarray(data, dtype=np.float64)
+        for sos in (self.bandpassSos, self.bandstopSos):
+            data = signal.sosfiltfilt(sos, data, axis=axis, padlen=min(self.getPadLength(sos), data.shape[axis] - 1))
+        return data
+
+    @staticmethod
+    def getPadLength(sos):
+        '''
+        default padding of scipy.signal.sosfiltfilt for the given second-order sections
+        '''
+        return 3 * (2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum()))
+
+    def initialState(self, firstSample):
+        '''
+        filter state (cf. scipy.signal.sosfilt) in steady state for the given sample of each channel
+        :param firstSample: array-like with one value per channel
+        :return: numpy array (sections x channels x 2)
+        '''
+        return signal.sosfilt_zi(self.sos)[:, None, :] * np.asarray(firstSample, dtype=np.float64)[None, :, None]
+
+    def filter(self, data, zi, axis=-1):
+        '''
+        applies the filter bank causally, continuing from the given filter state
+        :return: filtered data, new filter state
+        '''
+        return signal.sosfilt(self.sos, data, axis=axis, zi=zi)
+
+
+@lru_cache(maxsize=16)
+def getFilterBank(samplingRate, bandpass, bandstop, order=3):
+    '''
+    returns a cached FilterBank for the given configuration (filter design only happens once per configuration)
+    :param samplingRate: sampling rate of the signal
+    :param bandpass: tuple of low and high cut-off frequency of the bandpass filter
+    :param bandstop: tuple of low and high cut-off frequency of the bandstop filter
+    :param order: order of both butterworth filters
+    '''
+    return FilterBank(samplingRate, bandpass, bandstop, order)
@@ -0,0 +1,74 @@
+import tempfile
+import numpy as np
+
+
+class GrowableArray:
+    '''
+    Append-only typed array, e.g. for recording samples x channels. The capacity grows geometrically, so appending is amortized O(1) per row and no Python objects are created per sample.
+    Once the array would exceed memoryLimit bytes, it is moved to a memory-mapped temporary file (spilled to disk), which is grown in place from then on.
+    '''
+    def __init__(self, rowShape=(), dtype=np.int32, initialCapacity=4096, memoryLimit=256 * 1024 ** 2, spillDirectory=None):
+        '''
+        :param rowShape: shape of a single row, e.g. (numberOfChannels,); () for a 1D array
+        :param dtype: dtype of the array; appended values are cast to it
+        :param initialCapacity: number of rows allocated initially
+        :param memoryLimit: maximum size in bytes that is kept in memory
+        :param spillDirectory: directory of the temporary file; None for the default temporary directory
+        '''
+        self.rowShape = tuple(rowShape)
+        self.dtype = np.dtype(dtype)
+        self.memoryLimit = memoryLimit
+        self.spillDirectory = spillDirectory
+        self.spillFile = None
+        self.rowBytes = int(np.prod(self.rowShape)) * self.dtype.itemsize
+        self.data = np.empty((initialCapacity,) + self.rowShape, dtype=self.dtype)
+        self.length = 0
+
+    def extend(self, rows):
+        '''
+        appends the given rows
+        :param rows: array-like of shape (rows,) + rowShape
+        '''
+        rows = np.asarray(rows)
+        numberOfRows = len(rows)
+        if self.length + numberOfRows > len(self.data):
+            self.grow(self.length + numberOfRows)
+        self.data[self.length:self.length + numberOfRows] = rows
+        self.length += numberOfRows
+
+    def grow(self, minimumCapacity):
+        capacity = max(minimumCapacity, 2 * len(self.data))
+        shape = (capacity,) + self.rowShape
+        if self.spillFile is not None:
+            #numpy extends the file to the new size; the data already written stays in place
+            self.data.flush()
+            self.data = np.memmap(self.spillFile, dtype=self.dtype, mode='r+', shape=shape)
+        elif capacity * self.rowBytes > self.memoryLimit:
+            self.spillFile = tempfile.TemporaryFile(prefix="embody_", dir=self.spillDirectory)
+            data = np.memmap(self.spillFile, dtype=self.dtype, mode='w+', shape=shape)
+            data[:self.length] = self.data[:self.length]
+            self.data = data
+        else:
+            data = np.empty(shape, dtype=self.dtype)
+            data[:self.length] = self.data[:self.length]
+            self.data = data
+
+    def view(self):
+        '''
+        :return: numpy array (view) of all rows appended so far; remains valid after close
+        '''
+        return self.data[:self.length]
+
+    def isSpilled(self):
+        return self.spillFile is not None
+
+    def close(self):
+        '''
+        releases the temporary file; memory-mapped views keep the data accessible until they are released
+        '''
+        if self.spillFile is not None:
+            self.spillFile.close()
+            self.spillFile = None
+
+    def __len__(self):
+        return self.length
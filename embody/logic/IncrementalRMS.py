@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class IncrementalRMS:
+    '''
+    Sliding-window RMS (cf. rms_cumsum) for streamed multi-channel data. Keeps a running sum of squares per channel, so that every new sample is processed in O(1) independent of the window size.
+    The running sums are re-calculated from the samples in the window every resumInterval samples to bound floating point drift.
+    '''
+    def __init__(self, numberOfChannels, windowSize, resumInterval=10000):
+        self.numberOfChannels = numberOfChannels
+        self.windowSize = windowSize
+        self.resumInterval = resumInterval
+        #squared samples of the current window in chronological order
+        self.history = np.zeros((numberOfChannels, windowSize))
+        self.sumOfSquares = np.zeros(numberOfChannels)
+        self.samplesSinceResum = 0
+        self.totalSamples = 0
+
+    def update(self, samples):
+        '''
+        adds a block of new samples
+        :param samples: 2D array-like (channels x samples)
+        :return: 2D numpy array (channels x samples), the RMS of the window ending at each new sample (windows are zero-padded until windowSize samples have been added)
+        '''
+        squares = np.square(np.asarray(samples, dtype=np.float64))
+        numberOfSamples = squares.shape[1]
+        if numberOfSamples == 0:
+            return squares
+        combined = np.concatenate([self.history, squares], axis=1)
+        #every new sample pushes the oldest sample out of the window
+        sums = self.sumOfSquares[:, None] + np.cumsum(squares - combined[:, :numberOfSamples], axis=1)
+        self.history = combined[:, -self.windowSize:]
+        self.totalSamples += numberOfSamples
+        self.samplesSinceResum += numberOfSamples
+        if self.samplesSinceResum >= self.resumInterval:
+            self.sumOfSquares = self.history.sum(axis=1)
+            self.samplesSinceResum = 0
+        else:
+            self.sumOfSquares = sums[:, -1]
+        return np.sqrt(np.maximum(sums, 0.0) / self.windowSize)
+
+    def resize(self, windowSize):
+        '''
+        changes the window size, keeping the most recent samples; if the window grows, it is valid again once windowSize samples are available (cf. isValid)
+        '''
+        keptSamples = min(windowSize, self.windowSize)
+        history = np.zeros((self.numberOfChannels, windowSize))
+        history[:, windowSize - keptSamples:] = self.history[:, self.windowSize - keptSamples:]
+        self.history = history
+        self.windowSize = windowSize
+        self.sumOfSquares = history.sum(axis=1)
+        self.samplesSinceResum = 0
+        self.totalSamples = min(self.totalSamples, keptSamples)
+
+    def isValid(self):
+        '''
+        :return: whether the window has been filled completely
+        '''
+        return self.totalSamples >= self.windowSize
+
+    def reset(self):
+        self.history[:] = 0.0
+        self.sumOfSquares[:] = 0.0
+        self.samplesSinceResum = 0
+        self.totalSamples = 0
@@ -0,0 +1,148 @@
+import numpy as np
+from collections import deque
+from logic.IncrementalRMS import IncrementalRMS
+
+
+class InferencePipeline:
+    '''
+    Compiled inference pipeline of a trained model (cf. ClassificationManager.trainClassifierModel): filter -> features (cf. FeatureBank) -> scaler -> classifier -> vote.
+    Runs entirely on NumPy arrays; the feature matrix is preallocated and reused for inputs of the same length, so no DataFrames are constructed per prediction.
+    '''
+    def __init__(self, filterBank, featureBank, scaler, clf):
+        self.filterBank = filterBank
+        self.featureBank = featureBank
+        self.windowSize = featureBank.windowSize
+        self.clf = clf
+        self.mean = scaler.mean_
+        self.scale = scaler.scale_
+        self.features = None
+
+    def computeFeatures(self, data):
+        '''
+        calculates scaled features (same features and order as during training) for every valid window
+        :param data: 2D array-like (channels x samples)
+        :return: 2D numpy array (windows x features); only valid until the next call
+        '''
+        filtered = self.filterBank.filtfilt(np.asarray(data, dtype=np.float64), axis=1)
+        return self.computeFeaturesFromFiltered(filtered)
+
+    def computeFeaturesFromFiltered(self, filtered):
+        '''
+        calculates scaled features (same features and order as during training) for every valid window of already filtered data
+        :param filtered: 2D numpy array (channels x samples)
+        :return: 2D numpy array (windows x features); only valid until the next call
+        '''
+        numberOfChannels, numberOfSamples = filtered.shape
+        self.featureBank.computeFeatures(filtered.T, out=self.getFeatureMatrix(self.featureBank.getNumberOfWindows(numberOfSamples), numberOfChannels))
+        return self.scaleFeatures()
+
+    def computeFeaturesFromRMS(self, rms):
+        '''
+        calculates scaled features from the RMS of every window, if the model only uses RMS-based features (cf. FeatureBank.hasOnlyRMSFeatures)
+        :param rms: 2D numpy array (channels x windows), e.g. of an IncrementalRMS
+        :return: 2D numpy array (windows x features); only valid until the next call
+        '''
+        numberOfChannels, numberOfWindows = rms.shape
+        self.featureBank.computeFeaturesFromRMS(rms.T, out=self.getFeatureMatrix(numberOfWindows, numberOfChannels))
+        return self.scaleFeatures()
+
+    def getFeatureMatrix(self, numberOfWindows, numberOfChannels):
+        shape = (numberOfWindows, self.featureBank.getNumberOfFeatures(numberOfChannels))
+        if self.features is None or self.features.shape != shape:
+            self.features = np.empty(shape)
+        return self.features
+
+    def scaleFeatures(self):
+        self.features -= self.mean
+        self.features /= self.scale
+        return self.features
+
+    def predict(self, data):
+        '''
+        predicts a class for every valid window of the given data
+        :param data: 2D array-like (channels x samples)
+        :return: voted (mode-based) prediction, numpy array of predictions per window
+        '''
+        prediction = self.clf.predict(self.computeFeatures(data))
+        return self.vote(prediction), prediction
+
+    @staticmethod
+    def vote(prediction):
+        '''
+        mode of the given predictions; ties are resolved in favor of the smallest class (as scipy.stats.mode)
+        '''
+        classes, counts = np.unique(prediction, return_counts=True)
+        return classes[np.argmax(counts)]
+
+
+class PredictionStream:
+    '''
+    Incremental live classification based on an InferencePipeline. The filter state carries over between calls, so that only features for newly arrived samples are calculated and classified.
+    For models with only RMS-based features (the default, cf. FeatureBank.hasOnlyRMSFeatures), the RMS sums carry over as well (cf. IncrementalRMS); for other features, the last windowSize-1 filtered samples are kept to complete the windows of the next samples.
+    The voted prediction covers the last voteLength per-sample predictions. Note that filtering is causal here, whereas the model was trained on forward-backward filtered data.
+    '''
+    def __init__(self, pipeline, numberOfChannels, voteLength):
+        self.pipeline = pipeline
+        self.numberOfChannels = numberOfChannels
+        self.zi = None
+        self.incrementalRMS = IncrementalRMS(numberOfChannels, pipeline.windowSize) if pipeline.featureBank.hasOnlyRMSFeatures() else None
+        #filtered samples preceding the next update, completing the windows of its first samples (only without incrementalRMS)
+        self.context = np.empty((numberOfChannels, 0))
+        self.predictions = deque(maxlen=voteLength)
+
+    def update(self, samples):
+        '''
+        classifies the given new samples
+        :param samples: 2D array-like (channels x samples) of samples that arrived since the last call
+        :return: voted prediction over the last voteLength predictions (None if no valid window was available so far; after a swap to a larger window, the previous predictions are voted until it is filled), numpy array of predictions for the new samples
+        '''
+        samples = np.asarray(samples, dtype=np.float64)
+        if self.zi is None:
+            self.zi = self.pipeline.filterBank.initialState(samples[:, 0])
+        filtered, self.zi = self.pipeline.filterBank.filter(samples, self.zi, axis=1)
+        features = self.computeFeatures(filtered)
+        if features is None:
+            #e.g. after swapping to a larger window: keep voting over the previous predictions until the window is filled
+            return (InferencePipeline.vote(np.asarray(self.predictions)) if self.predictions else None), np.empty(0)
+        prediction = self.pipeline.clf.predict(features)
+        self.predictions.extend(prediction)
+        return InferencePipeline.vote(np.asarray(self.predictions)), prediction
+
+    def computeFeatures(self, filtered):
+        '''
+        :return: scaled features of the windows ending at the given new filtered samples; windows that are not filled completely yet are skipped (None if there are none)
+        '''
+        if self.incrementalRMS is not None:
+            rms = self.incrementalRMS.update(filtered)
+            numberOfInvalidWindows = max(0, self.pipeline.windowSize - 1 - (self.incrementalRMS.totalSamples - filtered.shape[1]))
+            if numberOfInvalidWindows >= rms.shape[1]:
+                return None
+            return self.pipeline.computeFeaturesFromRMS(rms[:, numberOfInvalidWindows:])
+        combined = np.concatenate([self.context, filtered], axis=1)
+        self.context = combined[:, combined.shape[1] - min(combined.shape[1], self.pipeline.windowSize - 1):]
+        if combined.shape[1] < self.pipeline.windowSize:
+            return None
+        return self.pipeline.computeFeaturesFromFiltered(combined)
+
+    def setPipeline(self, pipeline, voteLength):
+        '''
+        continues with the given pipeline (e.g. of a newly trained model) from the next update on. The most recent filtered samples (or RMS sums) are kept and previous predictions stay part of the vote, so that there is no gap in predictions.
+        The filter state is kept if the filter bank is the same (i.e. the sampling rate did not change).
+        '''
+        if pipeline.filterBank is not self.pipeline.filterBank:
+            self.zi = None
+        if pipeline.featureBank.hasOnlyRMSFeatures():
+            if self.incrementalRMS is None:
+                #continue the RMS sums from the kept samples
+                self.incrementalRMS = IncrementalRMS(self.numberOfChannels, pipeline.windowSize)
+                self.incrementalRMS.update(self.context)
+                self.context = np.empty((self.numberOfChannels, 0))
+            elif pipeline.windowSize != self.incrementalRMS.windowSize:
+                self.incrementalRMS.resize(pipeline.windowSize)
+        else:
+            #without incrementalRMS, a larger window is completed by the next samples, meanwhile the previous predictions are voted (cf. update)
+            self.incrementalRMS = None
+            self.context = self.context[:, self.context.shape[1] - min(self.context.shape[1], pipeline.windowSize - 1):]
+        if voteLength != self.predictions.maxlen:
+            self.predictions = deque(self.predictions, maxlen=voteLength)
+        self.pipeline = pipeline
@@ -0,0 +1,167 @@
+import numpy as np
+import struct
+
+#binary frame: magic, version, number of channels, number of samples, sequence number, device timestamp of the first sample (ms), sample period (us)
+BINARY_FRAME_MAGIC = b'EB'
+BINARY_FRAME_VERSION = 1
+BINARY_FRAME_HEADER = struct.Struct('<2sBBHIII')
+#largest payload of a UDP datagram (IPv4); frames may use the full size
+MAX_DATAGRAM_SIZE = 65507
+
+
+def encodeBinaryFrame(sequenceNumber, timestamp, samplePeriod, samples):
+    '''
+    encodes samples as a binary frame (cf. PacketDecoder); counterpart of the firmware for testing purposes
+    :param sequenceNumber: running number of the frame
+    :param timestamp: device timestamp of the first sample in ms
+    :param samplePeriod: time between two samples in us
+    :param samples: 2D array-like (samples x channels) of values in int16 range
+    :return: the frame as bytes
+    '''
+    samples = np.asarray(samples, dtype='<i2')
+    header = BINARY_FRAME_HEADER.pack(BINARY_FRAME_MAGIC, BINARY_FRAME_VERSION, samples.shape[1], samples.shape[0], sequenceNumber & 0xFFFFFFFF, int(timestamp) & 0xFFFFFFFF, int(samplePeriod))
+    return header + samples.tobytes()
+
+
+class PacketDecoder:
+    '''
+    Receives and decodes EMG packets in batches. The format is detected per packet:
+    - text packets contain one sample ("timestamp;v1;...;vN"), as sent by the EMBody firmware
+    - binary frames contain many samples (header, cf. BINARY_FRAME_HEADER, followed by samples x channels little-endian int16 values)
+    Datagrams are received into a preallocated buffer (recv_into) and all pending datagrams are drained per wakeup. Consecutive text packets of a batch are parsed into a NumPy array in one vectorized step; samples are returned in the order of arrival.
+    '''
+    def __init__(self, maxPacketSize=MAX_DATAGRAM_SIZE, maxBatchSize=256, bufferSize=4 * (MAX_DATAGRAM_SIZE + 1)):
+        '''
+        :param maxPacketSize: size of the largest datagram; larger datagrams are truncated by the socket
+        :param maxBatchSize: maximum number of datagrams received per call of receive
+        :param bufferSize: size of the receive buffer; pending text packets are decoded whenever there is no room for another datagram
+        '''
+        self.maxPacketSize = maxPacketSize
+        self.maxBatchSize = maxBatchSize
+        #one additional byte per packet for the field separator appended after every datagram
+        self.buffer = bytearray(max(bufferSize, maxPacketSize + 1))
+        self.view = memoryview(self.buffer)
+        self.packetEnds = [0] * maxBatchSize
+        self.numberOfFields = None
+        self.transmissionErrors = 0
+        self.lastSequenceNumber = None
+        self.lostFrames = 0
+
+    def receive(self, sock):
+        '''
+        Blocks until a datagram is available (subject to the timeout of the socket), then receives all other pending datagrams without blocking.
+        Raises socket.timeout if no datagram arrived in time.
+        :param sock: bound UDP socket
+        :return: 2D numpy array (samples x fields), the first column contains the timestamps; malformed packets are dropped (cf. transmissionErrors)
+        '''
+        numberOfDatagrams = 0
+        numberOfPackets = 0
+        offset = 0
+        frames = []
+        timeout = sock.gettimeout()
+        try:
+            while numberOfDatagrams < self.maxBatchSize:
+                try:
+                    n = sock.recv_into(self.view[offset:offset + self.maxPacketSize], self.maxPacketSize)
+                except BlockingIOError:
+                    break
+                if numberOfDatagrams == 0:
+                    #drain the remaining datagrams without blocking
+                    sock.setblocking(False)
+                numberOfDatagrams += 1
+                if self.buffer[offset:offset + 2] == BINARY_FRAME_MAGIC:
+                    #text packets received before are decoded first, so that samples stay in the order of arrival
+                    if numberOfPackets > 0:
+                        frames.append(self.decode(numberOfPackets))
+                        numberOfPackets = 0
+                    #binary frames are decoded right away, the next datagram reuses the buffer
+                    frame = self.decodeBinaryFrame(offset, n)
+                    if frame is not None:
+                        frames.append(frame)
+                    offset = 0
+                    continue
+                self.buffer[offset + n] = ord(';')
+                offset += n + 1
+                self.packetEnds[numberOfPackets] = offset
+                numberOfPackets += 1
+                if offset + self.maxPacketSize + 1 > len(self.buffer):
+                    #no room for another datagram, the buffer is reused after decoding the pending text packets
+                    frames.append(self.decode(numberOfPackets))
+                    numberOfPackets = 0
+                    offset = 0
+        finally:
+            if numberOfDatagrams > 0:
+                sock.settimeout(timeout)
+        if numberOfPackets > 0:
+            frames.append(self.decode(numberOfPackets))
+        if len(frames) == 1:
+            return frames[0]
+        if not frames:
+            return np.empty((0, self.numberOfFields or 0))
+        return np.concatenate(frames)
+
+    def decodeBinaryFrame(self, offset, size):
+        '''
+        parses a binary frame held in the receive buffer
+        :param offset: start of the frame in the receive buffer
+        :param size: size of the frame in bytes
+        :return: 2D numpy array (samples x fields) or None if the frame is malformed
+        '''
+        if size < BINARY_FRAME_HEADER.size:
+            self.transmissionErrors += 1
+            return None
+        _, version, numberOfChannels, numberOfSamples, sequenceNumber, timestamp, samplePeriod = BINARY_FRAME_HEADER.unpack_from(self.buffer, offset)
+        if version != BINARY_FRAME_VERSION or size != BINARY_FRAME_HEADER.size + 2 * numberOfSamples * numberOfChannels:
+            self.transmissionErrors += 1
+            return None
+        if self.numberOfFields is None:
+            self.numberOfFields = numberOfChannels + 1
+        elif self.numberOfFields != numberOfChannels + 1:
+            self.transmissionErrors += 1
+            return None
+        if self.lastSequenceNumber is not None:
+            self.lostFrames += (sequenceNumber - self.lastSequenceNumber - 1) & 0xFFFFFFFF
+        self.lastSequenceNumber = sequenceNumber
+
+        frame = np.empty((numberOfSamples, self.numberOfFields))
+        frame[:, 0] = timestamp + np.arange(numberOfSamples) * (samplePeriod / 1e3)
+        frame[:, 1:] = np.frombuffer(self.buffer, dtype='<i2', count=numberOfSamples * numberOfChannels, offset=offset + BINARY_FRAME_HEADER.size).reshape(numberOfSamples, numberOfChannels)
+        return frame
+
+    def decode(self, numberOfPackets):
+        '''
+        parses the text packets currently held in the receive buffer
+        :param numberOfPackets: number of text packets in the receive buffer (cf. receive)
+        :return: 2D numpy array (samples x fields)
+        '''
+        end = self.packetEnds[numberOfPackets - 1]
+        if self.numberOfFields is None:
+            self.numberOfFields = self.buffer.count(b';', 0, self.packetEnds[0])
+        data = bytes(self.view[:end])
+        #every packet has to contain exactly numberOfFields values
+        separators = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord(';'))
+        fieldsPerPacket = np.diff(np.searchsorted(separators, self.packetEnds[:numberOfPackets]), prepend=0)
+        if (fieldsPerPacket == self.numberOfFields).all():
+            values = np.fromstring(data, dtype=np.float64, sep=';')
+            if values.size == numberOfPackets * self.numberOfFields:
+                return values.reshape(numberOfPackets, self.numberOfFields)
+        return self.decodeEach(numberOfPackets)
+
+    def decodeEach(self, numberOfPackets):
+        '''
+        slow path for batches containing malformed packets; parses every packet on its own and drops the malformed ones
+        '''
+        samples = []
+        start = 0
+        for i in range(numberOfPackets):
+            end = self.packetEnds[i]
+            try:
+                sample = [float(value) for value in bytes(self.view[start:end - 1]).split(b';')]
+                if len(sample) == self.numberOfFields:
+                    samples.append(sample)
+                else:
+                    self.transmissionErrors += 1
+            except ValueError:
+                self.transmissionErrors += 1
+            start = end
+        return np.array(samples, dtype=np.float64).reshape(len(samples), self.numberOfFields)
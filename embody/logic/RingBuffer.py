@@ -0,0 +1,90 @@
+import numpy as np
+from threading import Lock
+
+
+class RingBuffer:
+    '''
+    Preallocated multi-channel ring buffer for EMG samples (first dimension corresponds to channels).
+    Every sample is written twice (at its slot and at slot + capacity), so the most recent samples are always available as one contiguous, chronologically ordered slice of the underlying array.
+    This allows consumers to read the buffer without copying (cf. getLatest) or with a single copy (cf. getSnapshot).
+    '''
+    def __init__(self, numberOfChannels, capacity, dtype=np.float64):
+        self.numberOfChannels = numberOfChannels
+        self.capacity = capacity
+        self.buffer = np.zeros((numberOfChannels, 2 * capacity), dtype=dtype)
+        self.writeIndex = 0
+        self.totalSamples = 0
+        self.lock = Lock()
+
+    def append(self, sample):
+        '''
+        adds a single sample for all channels
+        :param sample: array-like of length numberOfChannels
+        '''
+        with self.lock:
+            self.buffer[:, self.writeIndex] = sample
+            self.buffer[:, self.writeIndex + self.capacity] = sample
+            self.writeIndex = (self.writeIndex + 1) % self.capacity
+            self.totalSamples += 1
+
+    def extend(self, samples):
+        '''
+        adds a block of samples for all channels; only the last capacity samples are kept if the block is larger than the buffer
+        :param samples: 2D array-like (channels x samples)
+        '''
+        samples = np.asarray(samples)
+        numberOfSamples = samples.shape[1]
+        if numberOfSamples == 0:
+            return
+        with self.lock:
+            self.totalSamples += numberOfSamples
+            if numberOfSamples >= self.capacity:
+                samples = samples[:, -self.capacity:]
+                self.buffer[:, :self.capacity] = samples
+                self.buffer[:, self.capacity:] = samples
+                self.writeIndex = 0
+                return
+            start = self.writeIndex
+            end = start + numberOfSamples
+            if end <= self.capacity:
+                self.buffer[:, start:end] = samples
+                self.buffer[:, start + self.capacity:end + self.capacity] = samples
+            else:
+                split = self.capacity - start
+                self.buffer[:, start:self.capacity] = samples[:, :split]
+                self.buffer[:, start + self.capacity:] = samples[:, :split]
+                self.buffer[:, :end - self.capacity] = samples[:, split:]
+                self.buffer[:, self.capacity:end] = samples[:, split:]
+            self.writeIndex = end % self.capacity
+
+    def getLatest(self, numberOfSamples=None):
+        '''
+        returns a view (no copy) of the most recent samples in chronological order (oldest first). Note that the view may be overwritten by subsequent writes.
+        :param numberOfSamples: number of samples to return; defaults to the full capacity
+        :return: 2D numpy array (channels x samples)
+        '''
+        if numberOfSamples is None or numberOfSamples > self.capacity:
+            numberOfSamples = self.capacity
+        end = self.writeIndex + self.capacity
+        return self.buffer[:, end - numberOfSamples:end]
+
+    def getSnapshot(self, numberOfSamples=None):
+        '''
+        returns a consistent copy of the most recent samples in chronological order (oldest first)
+        :param numberOfSamples: number of samples to return; defaults to the full capacity
+        :return: 2D numpy array (channels x samples)
+        '''
+        with self.lock:
+            return self.getLatest(numberOfSamples).copy()
+
+    def getSince(self, totalSamples):
+        '''
+        returns a consistent copy of the samples added after the given number of samples had been added in total (e.g. to process only newly arrived samples)
+        :param totalSamples: value of totalSamples at the previous call
+        :return: tuple of a 2D numpy array (channels x samples; at most the full capacity, i.e. older samples may have been overwritten) and the current value of totalSamples
+        '''
+        with self.lock:
+            return self.getLatest(max(0, self.totalSamples - totalSamples)).copy(), self.totalSamples
+
+    def __len__(self):
+        return self.capacity
@@ -1,38 +1,64 @@
 from logic.ConnectionInfo import ConnectionInfo
+import numpy as np
+import queue
 import socket
 import time
 from threading import Thread
 from gui.StreamEventListener import StreamEvent
-from collections import deque
-from logic.ClassificationManager import DataNotSynchronizedError, SamplingRateTooLowError, InsufficientDataRecordedError
+from logic.ClassificationManager import ClassificationManager, CLASSIFIER_BACKENDS, DataNotSynchronizedError, SamplingRateTooLowError, InsufficientDataRecordedError, InvalidModelFileError, ModelNotAdaptableError
 from logic.StreamEventCreator import StreamEventCreator
-import itertools
+from logic.AcquisitionEngine import AcquisitionEngine, StreamConsumer
+from logic.CalibrationDataset import EmptyDatasetError, IncompatibleSessionsError
+from logic.FeatureBank import FEATURE_NAMES
+from logic.GrowableArray import GrowableArray
+from logic.StreamingSpectrogram import StreamingSpectrogram
+from logic.TrainingProcess import TrainingProcess
 from logic.helpers import filterRingBuffer
 from pylsl import StreamInfo, StreamOutlet
 from random import randint
 
+#maximum relative deviation between the sampling rate of the stream and the sampling rate a model was trained with
+SAMPLING_RATE_TOLERANCE = 0.1
+
 
 class StreamHandler(StreamEventCreator):
     '''
-    Handles stream connections for EMBody. Most of the work is outsourced to custom Threads.
+    Handles stream connections for EMBody. A single AcquisitionEngine owns the connection; connection test, calibration and live classification are attached to it as consumers.
     '''
     def __init__(self, classificationManager):
         StreamEventCreator.__init__(self)
         self.connectionInfo = None
-        self.connectionTestThread = None
-        self.liveViewThread = None
+        self.acquisitionEngine = None
+        self.connectionTest = None
         self.isStreamingClassification = False
-        self.liveClassificationThread = None
-        self.calibrationThread = None
+        self.liveClassifier = None
+        #statistics of the last live classification (cf. getLiveClassificationStatistics)
+        self.liveClassificationStatistics = None
+        self.calibrationRecorder = None
         self.trainClassifierThread = None
         self.isLiveViewActive = False
+        #calibration recordings exceeding this size (in bytes) are moved to a temporary file (cf. GrowableArray)
+        self.calibrationMemoryLimit = 256 * 1024 ** 2
+        #use the causally filtered (and RMS) ringbuffers of the acquisition engine for live view instead of re-filtering the whole ringbuffer
+        self.useStreamingFilter = True
+        #spectrogram of the filtered ringbuffer for live view, updated with newly arrived samples only (cf. getCurrentSpectrogram)
+        self.spectrogram = None
+        self.spectrogramSource = None
         self.classificationManager = classificationManager
         self.currentCalibrationLabel = (None, None)
         self.currentPrediction = None
         self.lsl_rand_int = str(randint(0,1000))
 
     def initializeStream(self, udpIP, udpPort):
+        self.closeStream()
         self.connectionInfo = ConnectionInfo(udpIP, udpPort)
+        self.acquisitionEngine = AcquisitionEngine(self.connectionInfo)
+        self.acquisitionEngine.start()
+
+    def closeStream(self):
+        if self.acquisitionEngine is not None:
+            self.acquisitionEngine.stop()
+            self.acquisitionEngine = None
 
     def updateConnectionInfo(self, connectionInfo):
         self.connectionInfo = connectionInfo
@@ -51,7 +77,7 @@ class StreamHandler(StreamEventCreator):
         return self.connectionInfo.activeChannels
 
     def getCurrentCalibrationLabel(self):
-        if self.calibrationThread:
+        if self.calibrationRecorder:
             return self.currentCalibrationLabel
         else:
             return None
@@ -65,27 +91,157 @@ class StreamHandler(StreamEventCreator):
     def getClassifierInfo(self):
         return self.classificationManager.clf_stats
 
+    def getClassifierBackends(self):
+        '''
+        returns a dict of the available classifier backends and their display names
+        '''
+        return CLASSIFIER_BACKENDS
+
+    def getFeatureNames(self):
+        '''
+        returns a dict of the available features (cf. FeatureBank) and their display names
+        '''
+        return FEATURE_NAMES
+
+    def getTrainingFeatures(self):
+        '''
+        returns the features the next model is trained with (by default those of the current model)
+        '''
+        return self.classificationManager.features
+
+    def isClassifierAdaptable(self):
+        return self.classificationManager.isClassifierAdaptable()
+
     def getCurrentPrediction(self):
         return self.classificationManager.currentPrediction
 
+    def getLiveClassificationStatistics(self):
+        '''
+        returns the number of submitted, processed, dropped and late windows (cf. InferenceWorker.getStatistics) of the running or, once stopped, the last live classification
+        '''
+        if self.liveClassifier is not None:
+            return self.liveClassifier.getStatistics()
+        else:
+            return self.liveClassificationStatistics
+
+    def getLiveClassificationSummary(self):
+        '''
+        returns a one line summary of getLiveClassificationStatistics (e.g. for the console or the status bar) or None if live classification was not used so far
+        '''
+        statistics = self.getLiveClassificationStatistics()
+        if statistics is None:
+            return None
+        return "Live classification: {submitted} windows submitted, {processed} processed, {dropped} dropped, {late} late".format(**statistics)
+
     def setCurrentCalibrationLabel(self, calibrationLabel):
         self.currentCalibrationLabel = calibrationLabel
+        calibrationRecorder = self.calibrationRecorder
+        if calibrationRecorder is not None:
+            calibrationRecorder.onCalibrationLabelChanged(calibrationLabel)
+
+    def hasCalibrationData(self):
+        return not self.classificationManager.calibrationData.empty
 
     def saveCalibrationData(self, pathname):
         self.classificationManager.saveCalibrationData(pathname)
 
-    def startLiveClassificationThread(self, udp_port, usePyLSL):
+    def appendCalibrationSession(self, directory):
+        self.classificationManager.appendCalibrationSession(directory)
+
+    def loadCalibrationDataset(self, directory):
+        '''
+        Replaces the calibration data with a binary calibration dataset (cf. CalibrationDataset)
+        returns the list of class labels in the dataset, or None if loading failed
+        '''
+        try:
+            labels = self.classificationManager.loadCalibrationDataset(directory)
+        except (OSError, ValueError, KeyError, EmptyDatasetError, IncompatibleSessionsError):
+            self.fireStreamEvent(StreamEvent.CALIBRATION_DATASET_LOAD_FAILED)
+            return None
+        self.fireStreamEvent(StreamEvent.CALIBRATION_DATASET_LOADED)
+        return labels
+
+    def saveClassifierModel(self, pathname):
+        self.classificationManager.saveClassifierModel(pathname)
+
+    def loadClassifierModel(self, pathname):
+        '''
+        Loads a model exported via saveClassifierModel, so that live classification can be started without calibration and training.
+        If a connection is available, the model's channels and sampling rate have to match the stream; the active channels are set to the channels the model was trained on.
+        Models without channel information (e.g. trained on calibration data without it) keep the active channels; only their number of channels has to fit the device (it is checked against the active channels when live classification starts).
+        '''
+        try:
+            model = ClassificationManager.readClassifierModel(pathname)
+        except InvalidModelFileError:
+            self.fireStreamEvent(StreamEvent.MODEL_LOAD_FAILED_INVALID_FILE)
+            return
+        channels = model['channels']
+        numberOfChannels = model['clf_stats']['num_channels']
+        if channels is not None and len(channels) != numberOfChannels:
+            #e.g. an empty list of channels
+            self.fireStreamEvent(StreamEvent.MODEL_LOAD_FAILED_INVALID_CHANNELS)
+            return
+        if self.connectionInfo is not None and self.connectionInfo.numberOfChannels is not None:
+            if channels is None:
+                fitsDevice = numberOfChannels <= self.connectionInfo.numberOfChannels
+            else:
+                fitsDevice = max(channels) < self.connectionInfo.numberOfChannels
+            if not fitsDevice or not self.matchesSamplingRate(model['sampling_rate']):
+                self.fireStreamEvent(StreamEvent.MODEL_LOAD_FAILED_INCOMPATIBLE)
+                return
+
+        #a running live classification continues with the loaded model if it uses the same channels
+        if channels is None:
+            swapModel = self.liveClassifier is not None and numberOfChannels == len(self.connectionInfo.activeChannels)
+        else:
+            swapModel = self.liveClassifier is not None and list(channels) == list(self.connectionInfo.activeChannels)
+        if not swapModel:
+            self.stopLiveClassification()
+        self.classificationManager.setClassifierModelFromFile(model)
+        if self.connectionInfo is not None and channels is not None:
+            self.setActiveChannels(list(channels))
+        self.fireStreamEvent(StreamEvent.MODEL_LOADED)
+        if swapModel:
+            self.swapClassifierModel()
+
+    def swapClassifierModel(self):
+        '''
+        Hands the current model of the ClassificationManager (e.g. newly trained, loaded or adapted) over to a running live classification, which continues with it from the next window on (cf. LiveClassifier.swapPipeline).
+        The stream, ringbuffer and output socket are kept, hence there is no gap in predictions. If the model does not match the active channels or the sampling rate, live classification is stopped instead.
+        returns whether a running live classification continues with the model
+        '''
+        liveClassifier = self.liveClassifier
+        if liveClassifier is None:
+            return False
+        if len(self.connectionInfo.activeChannels) != self.classificationManager.clf_stats['num_channels']:
+            self.stopLiveClassification()
+            self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_NUM_CHANNEL_MISMATCH)
+            return False
+        if self.classificationManager.modelSamplingRate is not None and not self.matchesSamplingRate(self.classificationManager.modelSamplingRate):
+            self.stopLiveClassification()
+            self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_SAMPLING_RATE_MISMATCH)
+            return False
+        liveClassifier.swapPipeline(self.classificationManager.getInferencePipeline())
+        self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_MODEL_SWAPPED)
+        return True
+
+    def matchesSamplingRate(self, samplingRate):
+        '''
+        returns whether the given sampling rate (e.g. of a trained model) matches the estimated sampling rate of the stream (cf. SAMPLING_RATE_TOLERANCE)
+        '''
+        return abs(self.connectionInfo.estimatedSamplingRate - samplingRate) <= SAMPLING_RATE_TOLERANCE * samplingRate
+
+    def startLiveClassifier(self, udp_port, usePyLSL):
         self.stopAllLiveViewConnections()
         self.isStreamingClassification = True
-        self.liveClassificationThread = LiveClassificationThread(self.connectionInfo, self.classificationManager, udp_port, usePyLSL, self.lsl_rand_int)
-        self.liveClassificationThread.start()
+        self.liveClassifier = LiveClassifier(self.connectionInfo, self.acquisitionEngine.ringBuffer, self.classificationManager, udp_port, usePyLSL, self.lsl_rand_int)
+        self.acquisitionEngine.addConsumer(self.liveClassifier)
         self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_STARTED)
 
     def startLiveView(self):
         self.stopAllLiveViewConnections()
+        #the ringbuffer is populated by the acquisition engine anyway
         self.isLiveViewActive = True
-        self.liveViewThread = LiveViewThread(self.connectionInfo)
-        self.liveViewThread.start()
         self.fireStreamEvent(StreamEvent.LIVE_VIEW_STARTED)
 
 
@@ -94,19 +250,17 @@ class StreamHandler(StreamEventCreator):
         self.stopLiveClassification()
 
     def stopLiveClassification(self):
-        if self.liveClassificationThread is not None:
-            self.liveClassificationThread.running = False
-            self.liveClassificationThread.join()
+        if self.liveClassifier is not None:
+            self.acquisitionEngine.removeConsumer(self.liveClassifier)
+            self.liveClassifier.close()
+            self.liveClassificationStatistics = self.liveClassifier.getStatistics()
             self.isStreamingClassification = False
-            self.liveClassificationThread = None
+            self.liveClassifier = None
             self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_STOPPED)
 
     def stopLiveView(self):
-        if self.liveViewThread is not None:
-            self.liveViewThread.running = False
-            self.liveViewThread.join()
+        if self.isLiveViewActive:
             self.isLiveViewActive = False
-            self.liveViewThread = None
             self.fireStreamEvent(StreamEvent.LIVE_VIEW_STOPPED)
 
     def testConnection(self, udpIP, udpPort):
@@ -116,49 +270,77 @@ class StreamHandler(StreamEventCreator):
 
         try:
             self.initializeStream(udpIP, udpPort)
-            self.connectionTestThread = TestConnectionThread(self.connectionInfo)
         except OSError:
-            self.connectionTestThread = None
+            self.acquisitionEngine = None
             self.connectionInfo = None
             self.fireStreamEvent(StreamEvent.TEST_CONNECTION_INIT_FAILED_SERVER_UNREACHABLE)
             return
 
-        self.connectionTestThread.start()
+        self.connectionTest = TestConnectionConsumer(self.acquisitionEngine)
+        self.acquisitionEngine.addConsumer(self.connectionTest)
         self.fireStreamEvent(StreamEvent.TEST_CONNECTION_STARTED)
 
     def onTestConnectionTimeout(self):
-        self.connectionTestThread.running = False
-        self.connectionTestThread.join()
-        self.updateConnectionInfo(self.connectionTestThread.connectionInfo)
-        self.connectionTestThread = None
-        if self.connectionInfo == None:
+        if self.connectionTest is None:
+            #connection test was aborted in the meantime
+            return
+        self.acquisitionEngine.removeConsumer(self.connectionTest)
+        estimatedSamplingRate, numberOfChannels = self.connectionTest.getResult()
+        self.connectionTest = None
+        if estimatedSamplingRate is None:
+            self.closeStream()
+            self.connectionInfo = None
             self.fireStreamEvent(StreamEvent.TEST_CONNECTION_FAILED_SERVER_UNRESPONSIVE)
         else:
+            self.connectionInfo.setEstimatedSamplingRate(estimatedSamplingRate)
+            self.connectionInfo.setNumberOfChannels(numberOfChannels)
+            self.acquisitionEngine.configure(numberOfChannels, estimatedSamplingRate)
             self.fireStreamEvent(StreamEvent.TEST_CONNECTION_COMPLETE)
 
     def getCurrentBuffer(self, filtered=False, rms=False):
-        if self.liveViewThread is not None:
-            return filterRingBuffer(self.liveViewThread.ringBuffer, self.getActiveChannels(), self.connectionInfo.estimatedSamplingRate, filtered, rms)
-        if self.liveClassificationThread is not None:
-            return filterRingBuffer(self.liveClassificationThread.ringBuffer, self.getActiveChannels(), self.connectionInfo.estimatedSamplingRate, filtered, rms)
+        if (self.isLiveViewActive or self.isStreamingClassification) and self.acquisitionEngine.ringBuffer is not None:
+            processedBuffer = None
+            if filtered and self.useStreamingFilter:
+                if rms:
+                    processedBuffer = self.acquisitionEngine.rmsRingBuffer.getSnapshot()
+                else:
+                    processedBuffer = self.acquisitionEngine.filteredRingBuffer.getSnapshot()
+            return filterRingBuffer(self.acquisitionEngine.ringBuffer.getSnapshot(), self.getActiveChannels(), self.connectionInfo.estimatedSamplingRate, filtered, rms, processedBuffer)
+        else:
+            return None
+
+    def getCurrentSpectrogram(self):
+        '''
+        returns the spectrogram of the filtered signal (cf. StreamingSpectrogram.getSpectrogram) and its frequencies; only the samples that arrived since the last call are transformed
+        '''
+        if (self.isLiveViewActive or self.isStreamingClassification) and self.acquisitionEngine.filteredRingBuffer is not None:
+            filteredRingBuffer = self.acquisitionEngine.filteredRingBuffer
+            #the ringbuffers are recreated whenever the stream is (re-)configured
+            if self.spectrogramSource is not filteredRingBuffer:
+                self.spectrogram = StreamingSpectrogram(filteredRingBuffer.numberOfChannels, self.connectionInfo.estimatedSamplingRate)
+                self.spectrogramSource = filteredRingBuffer
+            self.spectrogram.updateFromRingBuffer(filteredRingBuffer)
+            return self.spectrogram.getSpectrogram(), self.spectrogram.frequencies
         else:
             return None
 
     def closeAll(self):
-        if self.connectionTestThread is not None:
-            self.connectionTestThread.running = False
-            self.connectionTestThread.join()
-            self.connectionTestThread = None
+        if self.connectionTest is not None:
+            self.acquisitionEngine.removeConsumer(self.connectionTest)
+            self.connectionTest = None
             self.fireStreamEvent(StreamEvent.TEST_CONNECTION_FAILED_ABORT)
 
         self.stopAllLiveViewConnections()
 
-        if self.calibrationThread is not None:
-            self.calibrationThread.running = False
-            self.calibrationThread.join()
-            self.calibrationThread = None
+        if self.calibrationRecorder is not None:
+            self.acquisitionEngine.removeConsumer(self.calibrationRecorder)
+            self.calibrationRecorder.close()
+            self.calibrationRecorder = None
             self.fireStreamEvent(StreamEvent.CALIBRATION_FAILED_ABORT)
 
+        self.cancelTrainingClassifier()
+        self.closeStream()
+
     def updateCalibrationLabel(self, labels):
         self.classificationManager.onCalibrationInitialized(labels)
 
@@ -167,10 +349,10 @@ class StreamHandler(StreamEventCreator):
 
 
     def onCalibrationComplete(self):
-        self.calibrationThread.running = False
-        self.calibrationThread.join()
+        self.acquisitionEngine.removeConsumer(self.calibrationRecorder)
+        self.calibrationRecorder.stop()
         try:
-            self.classificationManager.onRawCalibrationDataAvailable(self.calibrationThread.rawTimestamps, self.calibrationThread.rawData, self.calibrationThread.rawLabelData, self.calibrationThread.totalCalibrationDuration)
+            self.classificationManager.onRawCalibrationDataAvailable(self.calibrationRecorder.getRawTimestamps(), self.calibrationRecorder.getRawData(), self.calibrationRecorder.labelSegments, self.calibrationRecorder.totalCalibrationDuration, self.calibrationRecorder.activeChannels)
             self.fireStreamEvent(StreamEvent.CALIBRATION_COMPLETED)
         except DataNotSynchronizedError:
             self.fireStreamEvent(StreamEvent.CALIBRATION_FAILED_DATA_NOT_IN_SYNC)
@@ -182,26 +364,69 @@ class StreamHandler(StreamEventCreator):
             self.fireStreamEvent(StreamEvent.CALIBRATION_FAILED_INSUFFICIENT_DATA)
             return
         finally:
-            self.calibrationThread = None
+            self.calibrationRecorder.close()
+            self.calibrationRecorder = None
 
     def startCalibration(self):
         self.stopAllLiveViewConnections()
 
         if self.connectionInfo is not None:
             if self.connectionInfo.activeChannels:
-                self.calibrationThread = CalibrationThread(self.connectionInfo, self)
-                self.calibrationThread.start()
+                self.calibrationRecorder = CalibrationRecorder(self.connectionInfo, self, self.calibrationMemoryLimit)
+                self.acquisitionEngine.addConsumer(self.calibrationRecorder)
                 self.fireStreamEvent(StreamEvent.CALIBRATION_STARTED)
             else:
                 self.fireStreamEvent(StreamEvent.CALIBRATION_FAILED_NO_ACTIVE_CHANNELS)
         else:
             self.fireStreamEvent(StreamEvent.CALIBRATION_FAILED_NO_CONNECTION)
 
-    def startTrainingClassifier(self):
-        self.trainClassifierThread = TrainClassifierThread(self)
+    def startModelAdaptation(self):
+        '''
+        Records a short additional calibration while live classification keeps running (labels are set via setCurrentCalibrationLabel as during calibration); cf. onModelAdaptationComplete.
+        '''
+        if self.liveClassifier is None or not self.classificationManager.isClassifierAdaptable():
+            self.fireStreamEvent(StreamEvent.MODEL_ADAPTATION_FAILED)
+            return
+        self.calibrationRecorder = CalibrationRecorder(self.connectionInfo, self, self.calibrationMemoryLimit)
+        self.acquisitionEngine.addConsumer(self.calibrationRecorder)
+        self.fireStreamEvent(StreamEvent.MODEL_ADAPTATION_STARTED)
+
+    def onModelAdaptationComplete(self):
+        '''
+        Updates the model with the recording of startModelAdaptation in a background thread (cf. ModelAdaptationThread), which hands the adapted model over to the running live classification.
+        '''
+        self.acquisitionEngine.removeConsumer(self.calibrationRecorder)
+        calibrationRecorder = self.calibrationRecorder
+        self.calibrationRecorder = None
+        ModelAdaptationThread(self, calibrationRecorder).start()
+
+    def startTrainingClassifier(self, hyperparameterSearch=False, backend='svm', features=None):
+        trainingOptions = self.classificationManager.getTrainingOptions(hyperparameterSearch=hyperparameterSearch, backend=backend)
+        if features is not None:
+            trainingOptions['features'] = tuple(features)
+        self.trainClassifierThread = TrainClassifierThread(self, trainingOptions)
         self.trainClassifierThread.start()
         self.fireStreamEvent(StreamEvent.TRAIN_CLASSIFIER_STARTED)
 
+    def cancelTrainingClassifier(self):
+        trainClassifierThread = self.trainClassifierThread
+        if trainClassifierThread is not None:
+            trainClassifierThread.cancel()
+            self.trainClassifierThread = None
+            self.fireStreamEvent(StreamEvent.TRAIN_CLASSIFIER_CANCELLED)
+
+    def isTrainingClassifier(self):
+        return self.trainClassifierThread is not None
+
+    def getTrainingProgress(self):
+        '''
+        returns a tuple of the description of the current training stage and the overall progress (0 to 1); None if no classifier is trained currently
+        '''
+        if self.trainClassifierThread is not None:
+            return self.trainClassifierThread.progress
+        else:
+            return None
+
     def startLiveClassification(self, udp_port, usePyLSL = False):
 
         if self.classificationManager.clf is None:
@@ -214,112 +439,222 @@ class StreamHandler(StreamEventCreator):
             #this is just a sanity check -> actual id of channels is not checked!
             self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_NUM_CHANNEL_MISMATCH)
             return
+        if self.classificationManager.modelSamplingRate is not None and not self.matchesSamplingRate(self.classificationManager.modelSamplingRate):
+            self.fireStreamEvent(StreamEvent.LIVE_CLASSIFICATION_SAMPLING_RATE_MISMATCH)
+            return
 
         self.stopAllLiveViewConnections()
-        self.startLiveClassificationThread(udp_port, usePyLSL)
+        self.startLiveClassifier(udp_port, usePyLSL)
 
 
 class TrainClassifierThread(Thread):
     '''
-    Background thread that performs calculations to train a classifier model. Fires TRAIN_CLASSIFIER_COMPLETED after completion.
+    Background thread that trains a classifier model in a worker process (cf. TrainingProcess) and relays its progress. Fires TRAIN_CLASSIFIER_PROGRESS per stage or cross-validation fold, and TRAIN_CLASSIFIER_COMPLETED after completion.
+    Cancelling (cf. cancel) terminates the worker process and fires TRAIN_CLASSIFIER_CANCELLED.
     '''
-    def __init__(self, streamHandler):
+    def __init__(self, streamHandler, trainingOptions):
         Thread.__init__(self)
+        self.daemon = True
         self.streamHandler = streamHandler
+        self.cancelled = False
+        self.progress = ("Starting", 0.0)
+        #the calibration data may be replaced during training
+        self.samplingRate = self.streamHandler.classificationManager.currentSamplingRate
+        self.channels = self.streamHandler.classificationManager.calibrationChannels
+        self.trainingProcess = TrainingProcess(self.streamHandler.classificationManager.calibrationData, trainingOptions)
 
     def run(self):
-        self.streamHandler.classificationManager.trainClassifierModel()
-        self.onTrainClassifierCompleted()
+        self.trainingProcess.start()
+        while not self.cancelled:
+            message = self.trainingProcess.getMessage()
+            if message is None or self.cancelled:
+                continue
+            if message[0] == "progress":
+                self.progress = message[1:]
+                self.streamHandler.fireStreamEvent(StreamEvent.TRAIN_CLASSIFIER_PROGRESS)
+            elif message[0] == "completed":
+                self.streamHandler.classificationManager.setClassifierModel(*message[1:], self.samplingRate, self.channels)
+                self.streamHandler.swapClassifierModel()
+                self.onTrainClassifierCompleted()
+                return
+            else:
+                print(message[1])
+                self.trainingProcess.cancel()
+                self.streamHandler.trainClassifierThread = None
+                self.streamHandler.fireStreamEvent(StreamEvent.TRAIN_CLASSIFIER_FAILED)
+                return
+
+    def cancel(self):
+        self.cancelled = True
+        self.trainingProcess.cancel()
+        self.join()
 
     def onTrainClassifierCompleted(self):
+        self.trainingProcess.cancel()
+        self.streamHandler.trainClassifierThread = None
         self.streamHandler.fireStreamEvent(StreamEvent.TRAIN_CLASSIFIER_COMPLETED)
 
 
-class CalibrationThread(Thread):
+class ModelAdaptationThread(Thread):
     '''
-    Background thread that is active during calibration. Synchronized provided labels from CalibrationTab with received data. Is stopped via onCalibrationCompleted(), which is called from CalibrationTab, after it iterated through all calibration labels.
+    Background thread that updates the model with an additional calibration recording (cf. ClassificationManager.adaptClassifierModel) and hands the adapted model over to the running live classification (cf. StreamHandler.swapClassifierModel).
+    Fires MODEL_ADAPTATION_COMPLETED after completion or MODEL_ADAPTATION_FAILED.
     '''
-    def __init__(self, connectionInfo, streamHandler):
+    def __init__(self, streamHandler, calibrationRecorder):
         Thread.__init__(self)
+        self.daemon = True
         self.streamHandler = streamHandler
-        self.running = False
-        self.totalCalibrationDuration = 0.0
-        self.connectionInfo = connectionInfo
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
-        self.sock.settimeout(5)
-        self.sock.bind((self.connectionInfo.udpIP, self.connectionInfo.udpPort))
-        self.rawData = []
-        [self.rawData.append([]) for channel in self.connectionInfo.activeChannels]
-        self.rawTimestamps = []
-        self.rawLabelData = []
-        self.errorCodes = []
+        self.calibrationRecorder = calibrationRecorder
 
     def run(self):
-        self.running = True
-        startTime = time.time()
-        while self.running:
-            try:
-                data, addr = self.sock.recvfrom(1024)
-                data = str(data.decode('utf-8')).split(';')
-                self.rawTimestamps.append(int(data[0])) #assuming one timestamp channel
-                #collect only data for active channels
-                for i in range(0, len(self.connectionInfo.activeChannels)):
-                    self.rawData[i].append(int(data[self.connectionInfo.activeChannels[i]+1]))
-                #synchronized with current calibration label
-                self.rawLabelData.append(self.streamHandler.getCurrentCalibrationLabel())
-            except ValueError:
-                self.errorCodes.append("Transmission Error")
-            except socket.timeout:
-                self.running = False
-                self.errorCodes.append("Server Timeout")
-        self.totalCalibrationDuration = time.time() - startTime
-        self.sock.close()
-
-
-class LiveViewThread(Thread):
+        try:
+            self.streamHandler.classificationManager.adaptClassifierModel(self.calibrationRecorder.getRawTimestamps(), self.calibrationRecorder.getRawData(), self.calibrationRecorder.labelSegments)
+        except (DataNotSynchronizedError, SamplingRateTooLowError, InsufficientDataRecordedError, ModelNotAdaptableError, ValueError):
+            self.streamHandler.fireStreamEvent(StreamEvent.MODEL_ADAPTATION_FAILED)
+            return
+        finally:
+            self.calibrationRecorder.close()
+        self.streamHandler.swapClassifierModel()
+        self.streamHandler.fireStreamEvent(StreamEvent.MODEL_ADAPTATION_COMPLETED)
+
+
+class CalibrationRecorder(StreamConsumer):
     '''
-    Background thread that is active during liveview. Receives data from the hardware prototype and populates a ringbuffer. LiveviewTab reads this buffer when active.
+    Consumer that is attached during calibration. Synchronizes provided labels from CalibrationTab with received data. Is stopped via onCalibrationCompleted(), which is called from CalibrationTab, after it iterated through all calibration labels.
+    Label changes are recorded as segments, i.e. together with the timestamp of the last sample received before the change (cf. ClassificationManager.assignCalibrationLabels), instead of a label per sample.
+    Samples are recorded into typed arrays (int32 per active channel, float64 timestamps), which are moved to a temporary file once they exceed memoryLimit bytes (cf. GrowableArray).
     '''
-    def __init__(self, connectionInfo):
-        Thread.__init__(self)
-        self.running=False
+    def __init__(self, connectionInfo, streamHandler, memoryLimit=256 * 1024 ** 2):
+        self.streamHandler = streamHandler
+        self.totalCalibrationDuration = 0.0
+        self.connectionInfo = connectionInfo
+        self.activeChannels = list(self.connectionInfo.activeChannels)
+        #assuming one timestamp channel
+        self.activeColumns = np.array(self.activeChannels, dtype=np.intp) + 1
+        self.rawData = GrowableArray((len(self.activeChannels),), np.int32, memoryLimit=memoryLimit)
+        self.rawTimestamps = GrowableArray((), np.float64, memoryLimit=memoryLimit // 2)
+        #the label at the start of calibration applies to all samples until the first change
+        self.labelSegments = [(-np.inf, streamHandler.currentCalibrationLabel)]
+        self.lastTimestamp = -np.inf
+        self.startTime = time.time()
+
+    def onSamples(self, batch):
+        self.rawTimestamps.extend(batch[:, 0])
+        #collect only data for active channels
+        self.rawData.extend(batch[:, self.activeColumns])
+        if len(batch) > 0:
+            self.lastTimestamp = batch[-1, 0]
+
+    def onCalibrationLabelChanged(self, calibrationLabel):
+        self.labelSegments.append((self.lastTimestamp, calibrationLabel))
+
+    def getRawTimestamps(self):
+        return self.rawTimestamps.view()
+
+    def getRawData(self):
+        '''
+        returns a view (channels x samples) of the recorded samples of the active channels
+        '''
+        return self.rawData.view().T
+
+    def stop(self):
+        self.totalCalibrationDuration = time.time() - self.startTime
+
+    def close(self):
+        self.rawData.close()
+        self.rawTimestamps.close()
+
+
+class LiveClassifier(StreamConsumer):
+    '''
+    Consumer that is attached during live classification (acquisition stage). Every hopSize samples it hands a window over to an InferenceWorker, which implements live classification via ClassificationManager and sends out prediction via UDP.
+    Either passes the latest samples of the ringbuffer of the AcquisitionEngine (makePrediction) or, in incremental mode, only the samples that arrived since the last window (makeIncrementalPrediction).
+    The model can be swapped while running (cf. swapPipeline); the new pipeline is used from the next window boundary on.
+    '''
+    def __init__(self, connectionInfo, ringBuffer, classificationManager, udp_port, usePyLSL, lsl_rand_int):
         self.connectionInfo = connectionInfo
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
-        self.sock.settimeout(5)
-        self.sock.bind((self.connectionInfo.udpIP, self.connectionInfo.udpPort))
-        self.ringBuffer = [deque(int(self.connectionInfo.estimatedSamplingRate*10) * [0]) for i in range(0, self.connectionInfo.numberOfChannels)]
+        self.ringBuffer = ringBuffer
+        self.classificationManager = classificationManager
+        self.classificationTimer = 0
+        self.incrementalPrediction = self.classificationManager.incrementalPrediction
+        self.inferencePipeline = self.classificationManager.getInferencePipeline()
+        self.pendingPipeline = self.inferencePipeline
+        self.configureWindows()
+        predictionStream = None
+        if self.incrementalPrediction:
+            predictionStream = self.classificationManager.createPredictionStream(len(self.connectionInfo.activeChannels), self.inferencePipeline)
+            self.pendingSamples = []
+            self.initializationTimer = 0
+        else:
+            #wait for buffer to fill; samples received before the classifier was attached count as well
+            self.initializationTimer = max(0, self.dataLength - self.ringBuffer.totalSamples)
+        self.inferenceWorker = InferenceWorker(classificationManager, predictionStream, self.inferencePipeline, self.connectionInfo.estimatedSamplingRate, udp_port, usePyLSL, lsl_rand_int)
+        self.inferenceWorker.start()
+
+    def configureWindows(self):
+        windowSize = self.inferencePipeline.windowSize
+        self.hopSize = self.classificationManager.getHopSize(windowSize)
+        #number of samples required for voteLength predictions
+        self.dataLength = windowSize + self.classificationManager.getVoteLength(windowSize) - 1
+
+    def swapPipeline(self, inferencePipeline):
+        '''
+        replaces the model used for classification at the next window boundary; may be called from any thread
+        '''
+        self.pendingPipeline = inferencePipeline
+
+    def onSamples(self, batch):
+        if self.incrementalPrediction:
+            # assuming one timestamp channel
+            self.pendingSamples.append(batch[:, [channel + 1 for channel in self.connectionInfo.activeChannels]].T)
+        if self.initializationTimer > 0:
+            self.initializationTimer -= len(batch)
+            return
 
-    def run(self):
-        self.running = True
-        while self.running:
-            try:
-                self.receiveData()
-            except ValueError:
-                print("TransmissionError")
-            except socket.timeout:
-                self.running = False
-        self.sock.close()
+        self.classificationTimer += len(batch)
+        #predict every hopSize samples
+        if self.classificationTimer >= self.hopSize:
+            #window boundary: adopt a swapped model (cf. swapPipeline), which may change window, hop and vote length
+            pendingPipeline = self.pendingPipeline
+            if pendingPipeline is not self.inferencePipeline:
+                self.inferencePipeline = pendingPipeline
+                self.configureWindows()
+            if self.incrementalPrediction:
+                #only classify samples that arrived since the last window
+                window = np.concatenate(self.pendingSamples, axis=1)
+                self.pendingSamples = []
+            else:
+                window = self.ringBuffer.getLatest(self.dataLength)[self.connectionInfo.activeChannels]
+            self.inferenceWorker.submit(window, self.inferencePipeline)
+            self.classificationTimer = 0
 
-    def receiveData(self):
-        data, addr = self.sock.recvfrom(1024)
-        data = str(data.decode('utf-8')).split(';')
-        # assuming one timestamp channel
-        [self.addSample(int(data[i + 1]), self.ringBuffer[i]) for i in range(0, self.connectionInfo.numberOfChannels)]
+    def getStatistics(self):
+        return self.inferenceWorker.getStatistics()
 
-    def addSample(self, sample, data):
-        data.pop()
-        data.appendleft(sample)
+    def close(self):
+        self.inferenceWorker.stop()
+        self.classificationManager.currentPrediction = None
 
 
-class LiveClassificationThread(LiveViewThread):
+class InferenceWorker(Thread):
     '''
-    Background thread that is active during live classification. Extends LiveViewThread making used of its ringBuffer and receivce methods. Additionally implements live classification via ClassificationManager and sends out prediction via UDP.
+    Background thread that is active during live classification (inference stage). Receives windows from LiveClassifier via a bounded queue, so that acquisition never stalls because of classification or sending out predictions.
+    If the worker falls behind, the latest window wins: older queued windows are dropped (in incremental mode their samples are merged into the latest window to keep the filter state continuous). Dropped and late windows are counted (cf. getStatistics).
+    Every window is classified with the pipeline it was submitted with, so that a swapped model (cf. LiveClassifier.swapPipeline) takes effect exactly at a window boundary.
     '''
-    def __init__(self, connectionInfo, classificationManager, udp_port, usePyLSL, lsl_rand_int):
-        LiveViewThread.__init__(self, connectionInfo)
+    def __init__(self, classificationManager, predictionStream, inferencePipeline, samplingRate, udp_port, usePyLSL, lsl_rand_int, queueSize=1):
+        Thread.__init__(self)
+        self.daemon = True
+        self.running = False
         self.classificationManager = classificationManager
+        self.predictionStream = predictionStream
+        self.samplingRate = samplingRate
+        self.setInferencePipeline(inferencePipeline)
+        self.windows = queue.Queue(maxsize=queueSize)
+        self.submittedWindows = 0
+        self.processedWindows = 0
+        self.droppedWindows = 0
+        self.lateWindows = 0
         self.usePyLSL = usePyLSL
         if not self.usePyLSL:
             self.udp_port = udp_port
@@ -330,68 +665,86 @@ class LiveClassificationThread(LiveViewThread):
             info = StreamInfo('EMBody', 'Markers', 1, 0, 'string', 'EMBody-' + lsl_rand_int)
             self.outlet = StreamOutlet(info)
 
+    def setInferencePipeline(self, inferencePipeline):
+        self.inferencePipeline = inferencePipeline
+        windowSize = inferencePipeline.windowSize
+        if self.predictionStream is not None:
+            self.predictionStream.setPipeline(inferencePipeline, self.classificationManager.getVoteLength(windowSize))
+        #a window is late if its prediction is not available before the next window is due
+        self.hopDuration = self.classificationManager.getHopSize(windowSize) / self.samplingRate
+
+    def submit(self, window, inferencePipeline):
+        '''
+        queues a window for classification with the given pipeline without blocking; called from the acquisition thread
+        '''
+        self.submittedWindows += 1
+        submitTime = time.time()
+        while True:
+            try:
+                self.windows.put_nowait((window, inferencePipeline, submitTime))
+                return
+            except queue.Full:
+                pass
+            try:
+                droppedWindow, _, _ = self.windows.get_nowait()
+                self.droppedWindows += 1
+                if self.predictionStream is not None:
+                    window = np.concatenate([droppedWindow, window], axis=1)
+            except queue.Empty:
+                pass
 
     def run(self):
         self.running = True
-        classificationTimer = 0
-        initializationTimer = self.classificationManager.windowSize*3
         while self.running:
             try:
-                self.receiveData()
-                if initializationTimer > 0:
-                    #wait for buffer to fill
-                    initializationTimer -= 1
-                    continue
-
-                classificationTimer += 1
-                #predict every windowsSize samples
-                if classificationTimer >= self.classificationManager.windowSize:
-                    data = [list(itertools.islice(self.ringBuffer[i], 0, self.classificationManager.windowSize*3)) for i in self.connectionInfo.activeChannels]
-                    prediction, _ = self.classificationManager.makePrediction(data)
-                    classificationTimer = 0
-
-                    if not self.usePyLSL:
-                        self.sendSocket.sendto(bytes(str(prediction), "utf-8"), ("<broadcast>", self.udp_port))
-                    else:
-                        self.outlet.push_sample([str(prediction)])
-            except socket.timeout:
-                self.running = False
+                window, inferencePipeline, submitTime = self.windows.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if inferencePipeline is not self.inferencePipeline:
+                self.setInferencePipeline(inferencePipeline)
+            if self.predictionStream is not None:
+                prediction, _ = self.classificationManager.makeIncrementalPrediction(self.predictionStream, window)
+            else:
+                prediction, _ = self.classificationManager.makePrediction(window, self.inferencePipeline)
+
+            if not self.usePyLSL:
+                self.sendSocket.sendto(bytes(str(prediction), "utf-8"), ("<broadcast>", self.udp_port))
+            else:
+                self.outlet.push_sample([str(prediction)])
+            self.processedWindows += 1
+            if time.time() - submitTime > self.hopDuration:
+                self.lateWindows += 1
 
         if not self.usePyLSL:
             self.sendSocket.close()
-        self.classificationManager.currentPrediction = None
-
 
-class TestConnectionThread(Thread):
-    '''
-    Background thread that is active when testing a connection. Tries to connect to the given address for five seconds. Reports connection information if successful.
-    '''
-    def __init__(self, connectionInfo):
-        Thread.__init__(self)
-        self.running=False
-        self.connectionInfo = connectionInfo
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, True)
-        self.sock.settimeout(5)
-        self.sock.bind((self.connectionInfo.udpIP, self.connectionInfo.udpPort))
+    def stop(self):
+        self.running = False
+        self.join()
 
-    def run(self):
-        self.running=True
-        packetCounter=0
-        startTime = time.time()
-        numberOfChannels = -1
-        while self.running:
-            try:
-                data, addr = self.sock.recvfrom(1024)
-                packetCounter +=1
-                if numberOfChannels == -1:
-                    numberOfChannels = len(str(data.decode('utf-8')).split(';'))-1 #assuming one timestamp channel
-            except socket.timeout:
-                self.running = False
-                self.connectionInfo = None
-        if self.connectionInfo is not None:
-            self.connectionInfo.setEstimatedSamplingRate(packetCounter / (time.time()-startTime))
-            self.connectionInfo.setNumberOfChannels(numberOfChannels)
-        self.sock.close()
+    def getStatistics(self):
+        '''
+        :return: dict with the number of submitted, processed, dropped and late windows
+        '''
+        return {'submitted': self.submittedWindows, 'processed': self.processedWindows, 'dropped': self.droppedWindows, 'late': self.lateWindows}
 
 
+class TestConnectionConsumer(StreamConsumer):
+    '''
+    Consumer that is attached when testing a connection. Counts the samples received until the connection test times out (cf. StreamHandler.onTestConnectionTimeout) and reports connection information if successful.
+    '''
+    def __init__(self, acquisitionEngine):
+        self.acquisitionEngine = acquisitionEngine
+        self.sampleCounter = 0
+        self.startTime = time.time()
+
+    def onSamples(self, batch):
+        self.sampleCounter += len(batch)
+
+    def getResult(self):
+        '''
+        :return: estimated sampling rate and number of channels; (None, None) if no data was received
+        '''
+        if self.sampleCounter == 0:
+            return None, None
+        return self.sampleCounter / (time.time()-self.startTime), self.acquisitionEngine.decoder.numberOfFields-1 #assuming one timestamp channel
@@ -0,0 +1,31 @@
+import numpy as np
+from logic.FilterBank import getFilterBank
+
+
+class StreamingFilter:
+    '''
+    Causal multi-channel Butterworth filter (bandpass followed by bandstop, cf. filterRingBuffer) for streamed EMG data.
+    Keeps the filter state (zi) per channel, so that only newly arrived samples have to be filtered. In contrast to the forward-backward filters used for calibration, the output is delayed by the phase response of the filter.
+    '''
+    def __init__(self, numberOfChannels, samplingRate, bandpass=(2.0, 100.0), bandstop=(49.0, 51.0), order=3):
+        self.filterBank = getFilterBank(samplingRate, (bandpass[0], min(bandpass[1], samplingRate * 0.5 - 1.0)), bandstop, order)
+        self.numberOfChannels = numberOfChannels
+        self.zi = None
+
+    def process(self, samples):
+        '''
+        filters a block of new samples and updates the filter state
+        :param samples: 2D array-like (channels x samples)
+        :return: 2D numpy array (channels x samples) of filtered samples
+        '''
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.shape[1] == 0:
+            return samples
+        if self.zi is None:
+            #start in steady state for the first sample to avoid a step response on the DC offset
+            self.zi = self.filterBank.initialState(samples[:, 0])
+        filtered, self.zi = self.filterBank.filter(samples, self.zi, axis=1)
+        return filtered
+
+    def reset(self):
+        self.zi = None
@@ -0,0 +1,72 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from logic.RingBuffer import RingBuffer
+
+
+class StreamingSpectrogram:
+    '''
+    Short-time Fourier transform (STFT) of a multi-channel stream, e.g. for the spectrogram of the LiveView.
+    Only the segments completed by newly arrived samples are transformed (one batched FFT over a strided view for all channels and segments); the samples of the last, incomplete segment are kept until the next update.
+    The power spectral density (in dB) of the most recent frames is kept in a RingBuffer with one row per channel and frequency.
+    '''
+    def __init__(self, numberOfChannels, samplingRate, segmentLength=None, duration=10.0, floor=1e-6):
+        '''
+        :param numberOfChannels: number of channels of the stream
+        :param samplingRate: sampling rate of the stream
+        :param segmentLength: number of samples per FFT, consecutive segments overlap by half; defaults to the power of two closest to a quarter of a second
+        :param duration: time span of the frames that are kept, in seconds
+        :param floor: minimum power spectral density, avoids the logarithm of 0
+        '''
+        if segmentLength is None:
+            segmentLength = 2 ** max(4, int(round(np.log2(samplingRate / 4.0))))
+        self.numberOfChannels = numberOfChannels
+        self.samplingRate = samplingRate
+        self.segmentLength = segmentLength
+        self.hopSize = segmentLength // 2
+        self.taper = np.hanning(segmentLength)
+        #scaling of the periodogram to a one-sided power spectral density; DC and (for even lengths) Nyquist have no negative counterpart
+        self.scale = np.full(segmentLength // 2 + 1, 2.0 / (samplingRate * np.sum(np.square(self.taper))))
+        self.scale[0] /= 2.0
+        if segmentLength % 2 == 0:
+            self.scale[-1] /= 2.0
+        self.floor = floor
+        self.frequencies = np.fft.rfftfreq(segmentLength, 1.0 / samplingRate)
+        self.frames = RingBuffer(numberOfChannels * len(self.frequencies), max(1, int(duration * samplingRate / self.hopSize)))
+        self.frames.buffer[:] = 10.0 * np.log10(floor)
+        self.pending = np.zeros((numberOfChannels, 0))
+        #total number of samples of the source ringbuffer processed so far, cf. updateFromRingBuffer
+        self.sourceSamples = 0
+
+    def update(self, samples):
+        '''
+        transforms all segments completed by the given new samples
+        :param samples: 2D array-like (channels x samples)
+        :return: number of new frames
+        '''
+        data = np.concatenate([self.pending, np.asarray(samples, dtype=np.float64)], axis=1)
+        numberOfFrames = (data.shape[1] - self.segmentLength) // self.hopSize + 1 if data.shape[1] >= self.segmentLength else 0
+        if numberOfFrames > 0:
+            #channels x frames x segmentLength
+            segments = sliding_window_view(data, self.segmentLength, axis=1)[:, :numberOfFrames * self.hopSize:self.hopSize]
+            density = np.square(np.abs(np.fft.rfft(segments * self.taper, axis=2))) * self.scale
+            decibels = 10.0 * np.log10(np.maximum(density, self.floor))
+            self.frames.extend(decibels.transpose(0, 2, 1).reshape(-1, numberOfFrames))
+        self.pending = data[:, numberOfFrames * self.hopSize:].copy()
+        return numberOfFrames
+
+    def updateFromRingBuffer(self, ringBuffer):
+        '''
+        transforms the samples added to the given ringbuffer since the last call; if samples have been overwritten in the meantime, the spectrogram continues with the oldest available sample
+        :return: number of new frames
+        '''
+        samples, totalSamples = ringBuffer.getSince(self.sourceSamples)
+        if totalSamples - self.sourceSamples > samples.shape[1]:
+            self.pending = np.zeros((self.numberOfChannels, 0))
+        self.sourceSamples = totalSamples
+        return self.update(samples)
+
+    def getSpectrogram(self):
+        '''
+        :return: 3D numpy array (channels x frequencies x frames) of the power spectral density in dB, oldest frame first (cf. frequencies)
+        '''
+        return self.frames.getSnapshot().reshape(self.numberOfChannels, len(self.frequencies), -1)
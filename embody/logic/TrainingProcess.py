@@ -0,0 +1,69 @@
+import multiprocessing
+import queue
+import signal
+import sys
+import traceback
+
+
+def runTraining(calibrationData, trainingOptions, messages):
+    '''
+    Entry point of the worker process: trains a classifier model on the given calibration data (cf. ClassificationManager.trainClassifierModel) and reports progress and results via the given queue.
+    Messages are tuples: ("progress", description, progress), ("completed", clf, scaler, clf_stats) or ("failed", message).
+    '''
+    #imported here, so that the worker process does not depend on the state of the parent process
+    from logic.ClassificationManager import ClassificationManager
+    signal.signal(signal.SIGTERM, onTerminate)
+    try:
+        classificationManager = ClassificationManager(**trainingOptions)
+        classificationManager.setCalibrationData(calibrationData)
+        clf_stats = classificationManager.trainClassifierModel(lambda description, progress: messages.put(("progress", description, progress)))
+        messages.put(("completed", classificationManager.clf, classificationManager.scaler, clf_stats))
+    except Exception:
+        messages.put(("failed", traceback.format_exc()))
+
+
+def onTerminate(signalNumber, frame):
+    '''
+    SIGTERM handler of the worker process (cf. TrainingProcess.cancel): the worker processes of the parallel cross-validation would outlive the worker process, hence they are killed before exiting
+    '''
+    from joblib.externals.loky import get_reusable_executor
+    #kill_workers, as resizing the executor to the default number of workers would wait for running folds otherwise
+    get_reusable_executor(kill_workers=True).shutdown(wait=True, kill_workers=True)
+    sys.exit(1)
+
+
+class TrainingProcess:
+    '''
+    Trains a classifier model in a separate worker process, so that training does not compete with the GUI and live streams for the GIL. Training can be cancelled at any time (cf. cancel).
+    The model is trained by a ClassificationManager created from trainingOptions (cf. ClassificationManager.getTrainingOptions); if hyperparameterSearch is set, the worker process distributes the candidates of the search over all cores.
+    '''
+    def __init__(self, calibrationData, trainingOptions):
+        context = multiprocessing.get_context('spawn')
+        self.messages = context.Queue()
+        #not daemonic, as daemonic processes cannot start the worker processes of the parallel cross-validation; terminated via cancel
+        self.process = context.Process(target=runTraining, args=(calibrationData, trainingOptions, self.messages), daemon=False)
+
+    def start(self):
+        self.process.start()
+
+    def getMessage(self, timeout=0.5):
+        '''
+        :return: the next message of the worker process (cf. runTraining) or None if the timeout expired or the worker process ended without a result
+        '''
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            if not self.process.is_alive():
+                return ("failed", "Training process ended unexpectedly (exit code " + str(self.process.exitcode) + ")")
+            return None
+
+    def cancel(self, timeout=5.0):
+        '''
+        terminates the worker process including the worker processes of the parallel cross-validation (cf. onTerminate, POSIX only); the worker process is killed if it does not exit within the timeout
+        '''
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
@@ -0,0 +1,45 @@
+import os
+import sys
+import numpy as np
+
+#the application is run from the embody directory (cf. Main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic.ClassificationManager import ClassificationManager
+
+SAMPLING_RATE = 250.0
+LABELS = ('a', 'b', 'c')
+
+
+def recordCalibration(numberOfChannels=3, secondsPerLabel=5.0, repetitions=2, seed=0):
+    '''
+    synthetic calibration recording: every label raises the amplitude of one channel, each label is followed by a NULL_CLASS segment
+    :return: rawTimestamps, rawData (channels x samples), classLabels, groupIndices
+    '''
+    random = np.random.default_rng(seed)
+    samplesPerLabel = int(SAMPLING_RATE * secondsPerLabel)
+    data, classLabels, groupIndices = [], [], []
+    for repetition in range(repetitions):
+        for i, label in enumerate(LABELS):
+            for segmentLabel, group in ((label, repetition), ('NULL_CLASS', repetition * len(LABELS) + i)):
+                amplitude = np.full(numberOfChannels, 50.0)
+                if segmentLabel != 'NULL_CLASS':
+                    amplitude[i % numberOfChannels] = 600.0
+                data.append(2048.0 + amplitude[:, None] * random.standard_normal((numberOfChannels, samplesPerLabel)))
+                classLabels += [segmentLabel] * samplesPerLabel
+                groupIndices += [group] * samplesPerLabel
+    rawData = np.concatenate(data, axis=1)
+    rawTimestamps = np.arange(rawData.shape[1]) * 1000.0 / SAMPLING_RATE
+    return rawTimestamps, rawData, np.array(classLabels, dtype=object), np.array(groupIndices, dtype=object)
+
+
+def createClassificationManager(**options):
+    '''
+    ClassificationManager with synthetic calibration data (cf. recordCalibration) that runs in this process
+    '''
+    options.setdefault('nJobs', 1)
+    classificationManager = ClassificationManager(**options)
+    classificationManager.currentSamplingRate = SAMPLING_RATE
+    rawTimestamps, rawData, classLabels, groupIndices = recordCalibration()
+    classificationManager.setCalibrationData(classificationManager.preprocessData(rawTimestamps, rawData, SAMPLING_RATE, classLabels, groupIndices))
+    return classificationManager
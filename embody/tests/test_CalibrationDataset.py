@@ -0,0 +1,100 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from logic.CalibrationDataset import CalibrationDataset, EmptyDatasetError, IncompatibleSessionsError, CLASS_LABEL, GROUP_INDEX
+
+
+def createCalibrationData(labels, groups, numberOfChannels=2, seed=0):
+    '''
+    calibrationData DataFrame with random EMG values for the given class labels and groups (one per sample)
+    '''
+    emg = np.random.default_rng(seed).standard_normal((len(labels), numberOfChannels)).astype(np.float32)
+    df = pd.DataFrame(emg.astype(np.float64), columns=['EMG_' + str(i) for i in range(numberOfChannels)])
+    df[CLASS_LABEL] = np.array(labels, dtype=object)
+    df[GROUP_INDEX] = np.array(groups, dtype=object)
+    return df
+
+
+def getValues(column):
+    '''
+    values of the given column with None for missing values (pandas may use None or NaN)
+    '''
+    return [None if pd.isna(value) else value for value in column]
+
+
+def assertSameCalibrationData(df, expected):
+    assert list(df.columns) == list(expected.columns)
+    assert np.array_equal(df.filter(like="EMG").to_numpy(), expected.filter(like="EMG").to_numpy())
+    assert getValues(df[CLASS_LABEL]) == getValues(expected[CLASS_LABEL])
+    assert getValues(df[GROUP_INDEX]) == getValues(expected[GROUP_INDEX])
+
+
+def test_labelsAreRunLengthEncoded(tmp_path):
+    labels = ['a'] * 5 + [None] * 3 + ['a'] * 2 + ['b'] * 4 + ['NULL_CLASS'] * 2
+    groups = [0] * 5 + [None] * 3 + [1] * 2 + [1] * 4 + [2] * 2
+    calibrationData = createCalibrationData(labels, groups)
+    dataset = CalibrationDataset(str(tmp_path))
+    path = dataset.appendSession(calibrationData, 250.0, [0, 2])
+    with np.load(path) as session:
+        assert list(session['segment_lengths']) == [5, 3, 2, 4, 2]
+        assert list(session['segment_labels']) == ['a', '', 'a', 'b', 'NULL_CLASS']
+        assert session['segment_groups'].dtype == np.int64
+    df, samplingRate, channels = dataset.load()
+    assertSameCalibrationData(df, calibrationData)
+    assert samplingRate == 250.0 and channels == [0, 2]
+    #integer groups are restored as python ints
+    assert type(df[GROUP_INDEX][0]) is int
+
+
+def test_integralFloatGroupsAreStoredAsInt(tmp_path):
+    #pandas converts integer columns with missing values to floats
+    calibrationData = createCalibrationData(['a', 'a', None, 'b'], [0.0, 0.0, np.nan, 1.0])
+    dataset = CalibrationDataset(str(tmp_path))
+    dataset.appendSession(calibrationData, 250.0)
+    df, _, channels = dataset.load()
+    assert getValues(df[GROUP_INDEX]) == [0, 0, None, 1] and getValues(df[CLASS_LABEL]) == ['a', 'a', None, 'b']
+    assert channels is None
+
+
+def test_stringGroups(tmp_path):
+    calibrationData = createCalibrationData(['a', 'a', 'b', 'b'], [0, 0, "1", "x"])
+    dataset = CalibrationDataset(str(tmp_path))
+    path = dataset.appendSession(calibrationData, 250.0)
+    with np.load(path) as session:
+        assert session['segment_groups'].dtype.kind == 'U'
+    df, _, _ = dataset.load()
+    assert list(df[GROUP_INDEX]) == ["0", "0", "1", "x"]
+
+
+def test_sessionsAreMergedWithPrefixedGroups(tmp_path):
+    first = createCalibrationData(['a', 'a', 'b'], [0, 0, 1], seed=1)
+    second = createCalibrationData(['a', None, 'b', 'b'], [0, None, 1, 1], seed=2)
+    dataset = CalibrationDataset(str(tmp_path))
+    dataset.appendSession(first, 250.0, [0, 1])
+    dataset.appendSession(second, 250.0, [0, 1])
+    assert [os.path.basename(path) for path in dataset.getSessions()] == ["session_0000.npz", "session_0001.npz"]
+    df, samplingRate, channels = dataset.load()
+    assert np.array_equal(df.filter(like="EMG").to_numpy(), np.vstack([first.filter(like="EMG").to_numpy(), second.filter(like="EMG").to_numpy()]))
+    assert getValues(df[CLASS_LABEL]) == ['a', 'a', 'b', 'a', None, 'b', 'b']
+    #the same group index of different sessions is a different group
+    assert getValues(df[GROUP_INDEX]) == ["session_0000/0", "session_0000/0", "session_0000/1", "session_0001/0", None, "session_0001/1", "session_0001/1"]
+    assert samplingRate == 250.0 and channels == [0, 1]
+
+
+def test_incompatibleSessions(tmp_path):
+    calibrationData = createCalibrationData(['a', 'b'], [0, 1])
+    dataset = CalibrationDataset(str(tmp_path))
+    dataset.appendSession(calibrationData, 250.0, [0, 1])
+    dataset.appendSession(calibrationData, 500.0, [0, 1])
+    with pytest.raises(IncompatibleSessionsError):
+        dataset.load()
+
+
+def test_emptyDataset(tmp_path):
+    dataset = CalibrationDataset(str(tmp_path / "dataset"))
+    with pytest.raises(EmptyDatasetError):
+        dataset.load()
+    with pytest.raises(EmptyDatasetError):
+        dataset.appendSession(createCalibrationData([], []), 250.0)
+    assert dataset.getSessions() == []
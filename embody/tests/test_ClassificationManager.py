@@ -0,0 +1,172 @@
+import threading
+import numpy as np
+import pytest
+from logic.ClassificationManager import ClassificationManager, InvalidModelFileError, MODEL_FILE_EXTENSION, CLASS_LABEL, GROUP_INDEX
+from conftest import SAMPLING_RATE, createClassificationManager, recordCalibration
+
+
+def test_measureInferenceLatencyTimesThePipeline():
+    for incrementalPrediction in (False, True):
+        classificationManager = createClassificationManager(incrementalPrediction=incrementalPrediction)
+        classificationManager.trainClassifierModel()
+        inferencePipeline = classificationManager.getInferencePipeline()
+        calls = []
+        scaleFeatures = inferencePipeline.scaleFeatures
+        inferencePipeline.scaleFeatures = lambda: calls.append(True) or scaleFeatures()
+        latency = classificationManager.measureInferenceLatency(inferencePipeline)
+        assert len(calls) > 0
+        assert 0.0 < latency['latency_p50_ms'] <= latency['latency_p95_ms'] <= latency['latency_p99_ms']
+
+
+def test_trainingOptionsIncludeLiveSettings():
+    options = ClassificationManager(incrementalPrediction=True, hopSize=5, voteLength=7).getTrainingOptions()
+    assert options['incrementalPrediction'] and options['hopSize'] == 5 and options['voteLength'] == 7
+    assert isinstance(ClassificationManager(**options), ClassificationManager)
+
+
+def test_loadingCalibrationDatasetKeepsModelSamplingRate(tmp_path):
+    classificationManager = createClassificationManager()
+    classificationManager.calibrationChannels = [0, 1, 2]
+    classificationManager.trainClassifierModel()
+    inferencePipeline = classificationManager.getInferencePipeline()
+    #a dataset recorded at a different rate and on other channels
+    other = createClassificationManager()
+    other.currentSamplingRate = 500.0
+    other.appendCalibrationSession(str(tmp_path))
+    classificationManager.loadCalibrationDataset(str(tmp_path))
+    assert classificationManager.currentSamplingRate == 500.0
+    assert classificationManager.modelSamplingRate == SAMPLING_RATE
+    assert list(classificationManager.modelChannels) == [0, 1, 2]
+    assert classificationManager.getInferencePipeline() is inferencePipeline
+    classificationManager.saveClassifierModel(str(tmp_path / "model"))
+    model = ClassificationManager.readClassifierModel(str(tmp_path / "model") + MODEL_FILE_EXTENSION)
+    assert model['sampling_rate'] == SAMPLING_RATE and list(model['channels']) == [0, 1, 2]
+
+
+def test_modelFileRoundTrip(tmp_path):
+    for backend, features in (('svm', ('rms', 'rms_ratios')), ('lda', ('mav', 'wl'))):
+        classificationManager = createClassificationManager(backend=backend, features=features, windowSize=40)
+        classificationManager.calibrationChannels = [1, 3, 4]
+        classificationManager.trainClassifierModel()
+        classificationManager.saveClassifierModel(str(tmp_path / backend))
+        model = ClassificationManager.readClassifierModel(str(tmp_path / backend) + MODEL_FILE_EXTENSION)
+        assert model['window_size'] == 40 and list(model['channels']) == [1, 3, 4]
+        #the loaded model replaces the model of another manager, but not its calibration data
+        other = createClassificationManager()
+        other.currentSamplingRate = 500.0
+        other.setClassifierModelFromFile(model)
+        assert other.windowSize == 40 and other.clf_stats['features'] == features
+        assert other.modelSamplingRate == SAMPLING_RATE and list(other.modelChannels) == [1, 3, 4]
+        assert other.currentSamplingRate == 500.0
+        window = np.random.default_rng(5).standard_normal((3, 200)) * 300.0 + 2048.0
+        prediction, predictions = other.makePrediction(window)
+        expectedPrediction, expectedPredictions = classificationManager.makePrediction(window)
+        assert prediction is not None and prediction == expectedPrediction
+        assert np.array_equal(predictions, expectedPredictions)
+
+
+def test_readingInvalidModelFile(tmp_path):
+    (tmp_path / "model").write_bytes(b"no model")
+    with pytest.raises(InvalidModelFileError):
+        ClassificationManager.readClassifierModel(str(tmp_path / "model"))
+    with pytest.raises(InvalidModelFileError):
+        ClassificationManager.readClassifierModel(str(tmp_path / "missing"))
+
+
+def test_savingOverLoadedModelFile(tmp_path):
+    classificationManager = createClassificationManager(backend='svm')
+    classificationManager.trainClassifierModel()
+    pathname = str(tmp_path / "model") + MODEL_FILE_EXTENSION
+    classificationManager.saveClassifierModel(pathname)
+    classificationManager.setClassifierModelFromFile(ClassificationManager.readClassifierModel(pathname))
+    #the support vectors of the loaded model are memory-mapped from the file that is overwritten
+    classificationManager.saveClassifierModel(pathname)
+    window = np.random.default_rng(4).standard_normal((3, 100)) * 50.0 + 2048.0
+    assert classificationManager.makePrediction(window)[0] is not None
+    assert ClassificationManager.readClassifierModel(pathname)['window_size'] == classificationManager.windowSize
+
+
+def test_setClassifierModelPublishesConsistentPipeline():
+    models = []
+    for windowSize, features in ((20, ('rms', 'rms_ratios')), (40, ('mav', 'wl'))):
+        trained = createClassificationManager(windowSize=windowSize, features=features)
+        trained.trainClassifierModel()
+        models.append((trained.clf, trained.scaler, trained.clf_stats))
+    classificationManager = createClassificationManager()
+    windowSizes = {id(clf): clf_stats['window_size'] for clf, scaler, clf_stats in models}
+    inconsistent = []
+    stop = threading.Event()
+
+    def readPipelines():
+        while not stop.is_set():
+            inferencePipeline = classificationManager.getInferencePipeline()
+            if inferencePipeline is not None and inferencePipeline.windowSize != windowSizes[id(inferencePipeline.clf)]:
+                inconsistent.append(inferencePipeline)
+
+    classificationManager.setClassifierModel(*models[0], SAMPLING_RATE, [0, 1, 2])
+    reader = threading.Thread(target=readPipelines)
+    reader.start()
+    for i in range(200):
+        classificationManager.setClassifierModel(*models[i % 2], SAMPLING_RATE, [0, 1, 2])
+    stop.set()
+    reader.join()
+    assert not inconsistent
+
+
+def getFullIndex(classificationManager):
+    calibrationData = classificationManager.calibrationData
+    return {key: count for key, count in calibrationData.groupby([CLASS_LABEL, GROUP_INDEX]).size().items()}
+
+
+def getIndex(classificationManager):
+    return {(label, group): count for label, groups in classificationManager.calibrationIndex.items() for group, count in groups.items()}
+
+
+def test_appendCalibrationDataUpdatesIndex():
+    classificationManager = createClassificationManager()
+    rawTimestamps, rawData, classLabels, groupIndices = recordCalibration(secondsPerLabel=1.0, seed=1)
+    #groups partly overlap with the existing ones
+    classificationManager.appendCalibrationData(classificationManager.preprocessData(rawTimestamps, rawData, SAMPLING_RATE, classLabels, groupIndices))
+    assert getIndex(classificationManager) == getFullIndex(classificationManager)
+
+
+
+def test_deletingUnusedLabelUpdatesIndex():
+    classificationManager = createClassificationManager()
+    classificationManager.onCalibrationInitialized(['a', 'c', 'NULL_CLASS', 'd'])
+    calibrationStatus = classificationManager.getCalibrationStatus()
+    assert calibrationStatus['a'] > 0.0 and calibrationStatus['d'] is None
+    assert 'b' not in set(classificationManager.calibrationData[CLASS_LABEL])
+    assert getIndex(classificationManager) == getFullIndex(classificationManager)
+    #the remaining labels can still be appended to
+    rawTimestamps, rawData, classLabels, groupIndices = recordCalibration(secondsPerLabel=1.0, seed=1)
+    classificationManager.appendCalibrationData(classificationManager.preprocessData(rawTimestamps, rawData, SAMPLING_RATE, classLabels, groupIndices))
+    assert getIndex(classificationManager) == getFullIndex(classificationManager)
+    calibrationStatus = classificationManager.getCalibrationStatus()
+    assert calibrationStatus['a'] == (classificationManager.calibrationData[CLASS_LABEL] == 'a').sum() / SAMPLING_RATE
+
+
+def test_adaptationUpdatesIndex():
+    classificationManager = createClassificationManager(backend='online_linear_svm')
+    classificationManager.calibrationChannels = [0, 1, 2]
+    classificationManager.trainClassifierModel()
+    rawTimestamps, rawData, classLabels, groupIndices = recordCalibration(secondsPerLabel=3.0, seed=2)
+    changes = [0] + [i for i in range(1, len(classLabels)) if classLabels[i] != classLabels[i - 1] or groupIndices[i] != groupIndices[i - 1]]
+    labelSegments = [(rawTimestamps[i], (classLabels[i], groupIndices[i])) for i in changes]
+    for adaptation in range(2):
+        classificationManager.adaptClassifierModel(rawTimestamps, rawData, labelSegments)
+        assert getIndex(classificationManager) == getFullIndex(classificationManager)
+    #groups of the adaptations are kept apart from the calibration groups
+    assert set(classificationManager.calibrationIndex['a']) == {0, 1, "adaptation_1/0", "adaptation_1/1", "adaptation_2/0", "adaptation_2/1"}
+
+def test_failedFeatureCacheWriteIsReported(tmp_path):
+    #the cache directory cannot be created below a regular file
+    (tmp_path / "file").write_bytes(b"")
+    classificationManager = createClassificationManager(featureCacheDirectory=str(tmp_path / "file" / "features"))
+    classificationManager.trainClassifierModel()
+    assert classificationManager.getInferencePipeline() is not None
+    assert 'feature_cache_error' in classificationManager.clf_stats
+    #a working cache does not report the previous error
+    classificationManager.featureStore.directory = str(tmp_path / "features")
+    classificationManager.trainClassifierModel()
+    assert 'feature_cache_error' not in classificationManager.clf_stats
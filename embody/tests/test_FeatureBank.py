@@ -0,0 +1,30 @@
+import numpy as np
+import scipy.signal as signal
+from logic.FeatureBank import FeatureBank
+from conftest import SAMPLING_RATE
+
+
+def getWelchFrequencies(window, segmentLength):
+    '''
+    mean and median frequency per channel of a window (samples x channels) based on scipy.signal.welch
+    '''
+    frequencies, spectrum = signal.welch(window, SAMPLING_RATE, window=np.hanning(segmentLength), nperseg=segmentLength, detrend=False, axis=0)
+    meanFrequency = spectrum.T @ frequencies / spectrum.sum(axis=0)
+    medianFrequency = frequencies[np.argmax(np.cumsum(spectrum, axis=0) >= 0.5 * spectrum.sum(axis=0), axis=0)]
+    return meanFrequency, medianFrequency
+
+
+def test_spectralFeaturesMatchScipyWelch():
+    data = np.random.default_rng(3).standard_normal((200, 3)) * 100.0 + np.arange(3) * 20.0
+    for windowSize, segmentLength in ((20, None), (40, 16), (25, 11), (30, 30)):
+        featureBank = FeatureBank(('mnf', 'mdf'), windowSize, SAMPLING_RATE, segmentLength)
+        features = featureBank.computeFeatures(data)
+        for window in (0, 57, len(features) - 1):
+            meanFrequency, medianFrequency = getWelchFrequencies(data[window:window + windowSize], featureBank.segmentLength)
+            assert np.allclose(features[window, :3], meanFrequency)
+            assert np.allclose(features[window, 3:], medianFrequency)
+
+
+def test_segmentsAreAveragedByDefault():
+    featureBank = FeatureBank(('mnf',), 20, SAMPLING_RATE)
+    assert featureBank.segmentLength < featureBank.windowSize
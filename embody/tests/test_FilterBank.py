@@ -0,0 +1,26 @@
+import numpy as np
+import scipy.signal as signal
+from logic.FilterBank import getFilterBank
+from logic.ClassificationManager import SEARCH_GRID
+from conftest import SAMPLING_RATE, createClassificationManager
+
+
+def test_filtfiltAppliesBandpassThenBandstop():
+    data = np.random.default_rng(0).standard_normal((3, 60)) * 300.0
+    nyquist = SAMPLING_RATE / 2.0
+    bandpass = signal.butter(3, [2.0 / nyquist, (nyquist - 1.0) / nyquist], btype='bandpass', output='sos')
+    bandstop = signal.butter(3, [49.0 / nyquist, 51.0 / nyquist], btype='bandstop', output='sos')
+    expected = signal.sosfiltfilt(bandstop, signal.sosfiltfilt(bandpass, data, axis=1), axis=1)
+    filterBank = getFilterBank(SAMPLING_RATE, (2.0, nyquist - 1.0), (49.0, 51.0))
+    assert np.allclose(filterBank.filtfilt(data, axis=1), expected)
+
+
+def test_makePredictionAtSmallestWindowSize():
+    windowSize = min(SEARCH_GRID['windowSize'])
+    classificationManager = createClassificationManager(windowSize=windowSize)
+    classificationManager.trainClassifierModel()
+    #same length as a live window (cf. LiveClassifier.configureWindows)
+    window = np.random.default_rng(1).standard_normal((3, windowSize + classificationManager.getVoteLength() - 1)) * 50.0 + 2048.0
+    prediction, predictions = classificationManager.makePrediction(window)
+    assert prediction is not None
+    assert len(predictions) == classificationManager.getVoteLength()
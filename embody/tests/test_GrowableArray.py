@@ -0,0 +1,42 @@
+import numpy as np
+from logic.GrowableArray import GrowableArray
+
+
+def test_growsInMemory():
+    growableArray = GrowableArray((3,), np.int32, initialCapacity=4)
+    rows = np.arange(30 * 3).reshape(30, 3)
+    for start in range(0, 30, 7):
+        growableArray.extend(rows[start:start + 7])
+    assert len(growableArray) == 30 and not growableArray.isSpilled()
+    assert growableArray.view().dtype == np.int32 and np.array_equal(growableArray.view(), rows)
+
+
+def test_spillsToDiskWhenCrossingMemoryLimit(tmp_path):
+    #4 rows of 2 int32 values fit into the limit of 40 bytes, growing to 8 rows does not
+    growableArray = GrowableArray((2,), np.int32, initialCapacity=4, memoryLimit=40, spillDirectory=str(tmp_path))
+    rows = np.arange(200 * 2).reshape(200, 2)
+    growableArray.extend(rows[:4])
+    assert not growableArray.isSpilled()
+    growableArray.extend(rows[4:5])
+    assert growableArray.isSpilled() and isinstance(growableArray.data, np.memmap)
+    assert np.array_equal(growableArray.view(), rows[:5])
+    #the memory-mapped file is grown in place
+    for start in range(5, 200, 13):
+        growableArray.extend(rows[start:start + 13])
+    assert len(growableArray) == 200 and np.array_equal(growableArray.view(), rows)
+
+
+def test_viewsStayValidAfterClose():
+    growableArray = GrowableArray((), np.float64, initialCapacity=2, memoryLimit=16)
+    values = np.linspace(0.0, 1.0, 50)
+    growableArray.extend(values)
+    assert growableArray.isSpilled()
+    view = growableArray.view()
+    growableArray.close()
+    assert not growableArray.isSpilled()
+    assert np.array_equal(view, values)
+    #closing an array that was never spilled has no effect
+    growableArray = GrowableArray()
+    growableArray.extend([1, 2, 3])
+    growableArray.close()
+    assert list(growableArray.view()) == [1, 2, 3]
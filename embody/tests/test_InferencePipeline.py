@@ -0,0 +1,39 @@
+import numpy as np
+from conftest import createClassificationManager
+
+
+def trainPipelines(*configurations):
+    pipelines = []
+    for windowSize, features in configurations:
+        classificationManager = createClassificationManager(windowSize=windowSize, features=features)
+        classificationManager.trainClassifierModel()
+        pipelines.append(classificationManager.getInferencePipeline())
+    return classificationManager, pipelines
+
+
+def test_incrementalPredictionMatchesWholeSignal():
+    data = np.random.default_rng(5).standard_normal((3, 300)) * 50.0 + 2048.0
+    for features in (('rms', 'rms_ratios'), ('rms', 'wl', 'zc')):
+        classificationManager, (pipeline,) = trainPipelines((20, features))
+        filtered, _ = pipeline.filterBank.filter(data, pipeline.filterBank.initialState(data[:, 0]), axis=1)
+        expected = pipeline.clf.predict(pipeline.computeFeaturesFromFiltered(filtered))
+        predictionStream = classificationManager.createPredictionStream(3, pipeline)
+        predictions = [predictionStream.update(data[:, start:start + 7])[1] for start in range(0, data.shape[1], 7)]
+        assert np.array_equal(np.concatenate(predictions), expected)
+        assert (predictionStream.incrementalRMS is not None) == (features == ('rms', 'rms_ratios'))
+
+
+def test_swapToLargerWindowKeepsPredicting():
+    classificationManager, pipelines = trainPipelines((20, ('rms', 'rms_ratios')), (40, ('rms', 'rms_ratios')), (30, ('mav', 'wl')), (50, ('rms',)))
+    predictionStream = classificationManager.createPredictionStream(3, pipelines[0])
+    data = np.random.default_rng(2).standard_normal((3, 600)) * 50.0 + 2048.0
+    hopSize = 5
+    #fill the first window
+    predictionStream.update(data[:, :pipelines[0].windowSize])
+    for start in range(pipelines[0].windowSize, data.shape[1], hopSize):
+        if start % 100 == 0:
+            #RMS window resized, RMS to other features and back
+            pipeline = pipelines[start // 100 % len(pipelines)]
+            predictionStream.setPipeline(pipeline, classificationManager.getVoteLength(pipeline.windowSize))
+        prediction, _ = predictionStream.update(data[:, start:start + hopSize])
+        assert prediction is not None
@@ -0,0 +1,109 @@
+import socket
+import numpy as np
+import pytest
+from logic.PacketDecoder import PacketDecoder, encodeBinaryFrame
+
+
+@pytest.fixture
+def sockets():
+    '''
+    receiving and sending UDP socket on the loopback interface
+    '''
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(1.0)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(receiver.getsockname())
+    yield receiver, sender
+    sender.close()
+    receiver.close()
+
+
+def sendText(sender, timestamp, values):
+    sender.send((str(timestamp) + ";" + ";".join(str(value) for value in values)).encode())
+
+
+def test_mixedFormatsKeepOrderOfArrival(sockets):
+    receiver, sender = sockets
+    sendText(sender, 0, (1, 2))
+    sendText(sender, 1, (3, 4))
+    sender.send(encodeBinaryFrame(0, 2, 1000, [[5, 6], [7, 8]]))
+    sendText(sender, 4, (9, 10))
+    data = PacketDecoder().receive(receiver)
+    assert np.array_equal(data[:, 0], [0, 1, 2, 3, 4])
+    assert np.array_equal(data[:, 1:], [[1, 2], [3, 4], [5, 6], [7, 8], [9, 10]])
+
+
+def test_largeBinaryFrameIsNotTruncated(sockets):
+    receiver, sender = sockets
+    samples = np.arange(6000 * 2).reshape(6000, 2) % 1000
+    sender.send(encodeBinaryFrame(0, 0, 1000, samples))
+    packetDecoder = PacketDecoder()
+    data = packetDecoder.receive(receiver)
+    assert np.array_equal(data[:, 1:], samples)
+    assert packetDecoder.transmissionErrors == 0
+
+
+def test_textPackets(sockets):
+    receiver, sender = sockets
+    for i in range(3):
+        sendText(sender, 10 * i, (i, -i, 0.5))
+    packetDecoder = PacketDecoder()
+    data = packetDecoder.receive(receiver)
+    assert np.array_equal(data, [[0, 0, 0, 0.5], [10, 1, -1, 0.5], [20, 2, -2, 0.5]])
+    assert packetDecoder.numberOfFields == 4 and packetDecoder.transmissionErrors == 0
+
+
+def test_binaryFrames(sockets):
+    receiver, sender = sockets
+    sender.send(encodeBinaryFrame(7, 100, 4000, [[1, -1], [2, -2]]))
+    #frame 8 is lost
+    sender.send(encodeBinaryFrame(9, 116, 4000, [[-32768, 32767]]))
+    packetDecoder = PacketDecoder()
+    data = packetDecoder.receive(receiver)
+    assert np.array_equal(data, [[100, 1, -1], [104, 2, -2], [116, -32768, 32767]])
+    assert packetDecoder.lostFrames == 1 and packetDecoder.transmissionErrors == 0
+
+
+def test_malformedPacketsAreCounted(sockets):
+    receiver, sender = sockets
+    sendText(sender, 0, (1, 2))
+    sendText(sender, 1, (3,))
+    sender.send(b"2;x;4")
+    sendText(sender, 3, (5, 6))
+    frame = encodeBinaryFrame(0, 4, 1000, [[7, 8]])
+    #truncated header, truncated samples and an unknown version
+    sender.send(frame[:5])
+    sender.send(frame[:-1])
+    sender.send(frame[:2] + bytes([2]) + frame[3:])
+    #number of channels differs from the text packets
+    sender.send(encodeBinaryFrame(1, 5, 1000, [[7, 8, 9]]))
+    packetDecoder = PacketDecoder()
+    data = packetDecoder.receive(receiver)
+    assert np.array_equal(data, [[0, 1, 2], [3, 5, 6]])
+    assert packetDecoder.transmissionErrors == 6
+
+
+def test_pendingDatagramsAreDrainedInBatches(sockets):
+    receiver, sender = sockets
+    for i in range(10):
+        sendText(sender, i, (i,))
+    packetDecoder = PacketDecoder(maxBatchSize=4)
+    assert np.array_equal(packetDecoder.receive(receiver)[:, 0], range(4))
+    assert np.array_equal(packetDecoder.receive(receiver)[:, 0], range(4, 8))
+    assert np.array_equal(packetDecoder.receive(receiver)[:, 0], range(8, 10))
+    #the timeout of the socket is restored after draining
+    assert receiver.gettimeout() == 1.0
+    receiver.settimeout(0.01)
+    with pytest.raises(socket.timeout):
+        packetDecoder.receive(receiver)
+
+
+def test_smallBufferIsReusedWithinBatch(sockets):
+    receiver, sender = sockets
+    for i in range(20):
+        sendText(sender, i, (2 * i,))
+    #room for about three packets at a time
+    packetDecoder = PacketDecoder(maxPacketSize=16, bufferSize=48)
+    data = packetDecoder.receive(receiver)
+    assert np.array_equal(data, np.column_stack([range(20), range(0, 40, 2)]))
@@ -0,0 +1,71 @@
+import numpy as np
+from logic.RingBuffer import RingBuffer
+
+
+def createSamples(start, numberOfSamples, numberOfChannels=2):
+    '''
+    samples numbered consecutively from start (second channel negated), so that their order can be checked
+    '''
+    values = np.arange(start, start + numberOfSamples, dtype=np.float64)
+    return np.vstack([values, -values])[:numberOfChannels]
+
+
+def test_extendWrapsAround():
+    ringBuffer = RingBuffer(2, 10)
+    written = np.zeros((2, 0))
+    #block sizes that cross the end of the buffer at different offsets
+    for numberOfSamples in (3, 4, 5, 1, 9, 7, 2):
+        samples = createSamples(written.shape[1], numberOfSamples)
+        ringBuffer.extend(samples)
+        written = np.hstack([written, samples])
+        available = min(written.shape[1], 10)
+        assert np.array_equal(ringBuffer.getLatest(available), written[:, -available:])
+        assert np.array_equal(ringBuffer.getSnapshot(available), written[:, -available:])
+    assert ringBuffer.totalSamples == written.shape[1]
+
+
+def test_appendWrapsAround():
+    ringBuffer = RingBuffer(2, 4)
+    samples = createSamples(0, 11)
+    for index in range(samples.shape[1]):
+        ringBuffer.append(samples[:, index])
+    assert np.array_equal(ringBuffer.getLatest(), samples[:, -4:])
+    assert ringBuffer.writeIndex == 11 % 4
+
+
+def test_getSinceAcrossWrapPoint():
+    ringBuffer = RingBuffer(2, 10)
+    ringBuffer.extend(createSamples(0, 8))
+    samples, totalSamples = ringBuffer.getSince(0)
+    assert np.array_equal(samples, createSamples(0, 8)) and totalSamples == 8
+    #the new samples are stored at slots 8, 9, 0, 1 and 2
+    ringBuffer.extend(createSamples(8, 5))
+    samples, totalSamples = ringBuffer.getSince(totalSamples)
+    assert np.array_equal(samples, createSamples(8, 5)) and totalSamples == 13
+    samples, totalSamples = ringBuffer.getSince(totalSamples)
+    assert samples.shape == (2, 0) and totalSamples == 13
+    ringBuffer.extend(createSamples(13, 6))
+    samples, totalSamples = ringBuffer.getSince(totalSamples)
+    #the returned copy is not overwritten by later writes
+    ringBuffer.extend(createSamples(19, 10))
+    assert np.array_equal(samples, createSamples(13, 6)) and totalSamples == 19
+
+
+def test_getSinceReturnsAtMostCapacity():
+    ringBuffer = RingBuffer(2, 10)
+    ringBuffer.extend(createSamples(0, 3))
+    ringBuffer.extend(createSamples(3, 15))
+    samples, totalSamples = ringBuffer.getSince(3)
+    assert np.array_equal(samples, createSamples(8, 10)) and totalSamples == 18
+
+
+def test_requestsLongerThanCapacity():
+    ringBuffer = RingBuffer(2, 10)
+    #blocks longer than the buffer keep only their last capacity samples
+    ringBuffer.extend(createSamples(0, 4))
+    ringBuffer.extend(createSamples(4, 25))
+    assert ringBuffer.totalSamples == 29 and ringBuffer.writeIndex == 0
+    assert np.array_equal(ringBuffer.getLatest(100), createSamples(19, 10))
+    assert np.array_equal(ringBuffer.getSnapshot(100), createSamples(19, 10))
+    ringBuffer.extend(createSamples(29, 3))
+    assert np.array_equal(ringBuffer.getLatest(), createSamples(22, 10))
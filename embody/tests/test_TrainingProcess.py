@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import pytest
+from logic.TrainingProcess import TrainingProcess
+from conftest import createClassificationManager
+
+
+def getDescendants(pid):
+    '''
+    :return: set of the ids of all processes descending from the given process (cf. /proc)
+    '''
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open('/proc/' + entry + '/stat') as stat:
+                    #the name of the process may contain spaces, the parent id follows the state after the name
+                    parents[int(entry)] = int(stat.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                pass
+    descendants = set()
+    found = {pid}
+    while found:
+        found = {child for child, parent in parents.items() if parent in found} - descendants
+        descendants |= found
+    return descendants
+
+
+def isAlive(pid):
+    try:
+        with open('/proc/' + str(pid) + '/stat') as stat:
+            #zombies have terminated already
+            return stat.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inspects the process tree via /proc")
+def test_cancelDuringCrossValidationKillsWorkers():
+    classificationManager = createClassificationManager(hyperparameterSearch=True, nJobs=2)
+    trainingProcess = TrainingProcess(classificationManager.calibrationData, classificationManager.getTrainingOptions())
+    trainingProcess.start()
+    try:
+        #wait for the parallel cross-validation to report its first fold
+        workers = set()
+        deadline = time.time() + 120.0
+        while time.time() < deadline:
+            message = trainingProcess.getMessage()
+            assert message is None or message[0] == "progress", message
+            workers |= getDescendants(trainingProcess.process.pid)
+            if message is not None and message[1].startswith("Cross-validation fold") and workers:
+                break
+        assert workers, "the cross-validation did not start any worker processes"
+    finally:
+        trainingProcess.cancel()
+    deadline = time.time() + 10.0
+    while any(isAlive(pid) for pid in workers) and time.time() < deadline:
+        time.sleep(0.1)
+    assert not [pid for pid in workers if isAlive(pid)]